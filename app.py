@@ -1,10 +1,68 @@
-from flask import Flask, render_template, request, jsonify, send_file
-import csv
-import io
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g
+import json
+import os
+import time
+import tempfile
+import metrics
 from scraper import RosterScraper
+from fetch import Fetcher
+from profiles import SiteProfileStore
+import render
+from photos import PhotoCache, PhotoPipeline
+from search import RosterIndex
+from cache import HTTPCache, ResultCache
+from jobs import JobQueue
+from parallel import ParsePool
+from snapshots import SnapshotStore, diff_rosters, parse_since, format_time
+from export import (
+    content_disposition, iter_arrow_chunks, iter_combined_rows, iter_csv_chunks, iter_csv_rows,
+    iter_ndjson_chunks, iter_parquet_chunks, iter_zip_chunks, record_formats, roster_filename
+)
 
 app = Flask(__name__)
-scraper = RosterScraper()
+
+# Upper bound on URLs accepted by one /scrape/batch request
+MAX_BATCH_URLS = 500
+
+# Upper bound on teams in one /export/bulk request (a full Division I season fits)
+MAX_BULK_TEAMS = 1000
+
+@app.before_request
+def start_timing():
+    g.request_start = time.perf_counter()
+    g.timings, g.timings_token = metrics.start_request()
+
+@app.after_request
+def record_timing(response):
+    endpoint = request.endpoint or 'unknown'
+    if response.is_streamed:
+        # Streamed exports and batches are written after this hook returns, so they
+        # are timed when the server closes the response. Their headers are sent
+        # before that, so they get no X-Timing header.
+        start = g.request_start
+        response.call_on_close(lambda: metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint))
+        return response
+    
+    total = time.perf_counter() - g.request_start
+    metrics.REQUEST_SECONDS.observe(total, endpoint)
+    # Clients opt in to the per-stage breakdown by sending X-Timing: 1
+    if request.headers.get('X-Timing'):
+        response.headers['X-Timing'] = metrics.format_timing_header(g.timings, total)
+    return response
+
+@app.teardown_request
+def stop_timing(exc):
+    token = g.pop('timings_token', None)
+    if token is not None:
+        metrics.end_request(token)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # The registry is per process: with several gunicorn workers each answers with
+    # only its own requests, so scrape every worker or run one worker with threads.
+    # Parse-pool workers send their stage timings back with each result, so those
+    # are included (see parallel.py).
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
@@ -14,22 +72,183 @@ def index():
 def debug():
     return render_template('debug.html')
 
+def run_scrape(data):
+    """Run one /scrape request body (method url, render or html) and return roster_data"""
+    method = data.get('method')
+    if method in ('url', 'render'):
+        url = data.get('url')
+        roster_data = scraper.scrape_rendered(url) if method == 'render' else scraper.scrape_from_url(url)
+        snapshot_store.save(url, roster_data)
+    elif method == 'html':
+        html_content = data.get('html')
+        url = data.get('url', '')
+        roster_data = scraper.scrape_from_html(html_content, url)
+    else:
+        raise ValueError('Invalid method')
+    
+    # "photos": true downloads the headshots and adds their local paths
+    if data.get('photos') and photo_pipeline:
+        with metrics.stage('photos'):
+            photo_pipeline.localize([roster_data])
+    return roster_data
+
+# Stores, thread pools and the browser probe. A parse-pool worker spawned under
+# `python app.py` re-imports this file as __mp_main__; it only needs scraper.py
+# (see parallel.py), so it skips all of this.
+if __name__ != '__mp_main__':
+    # Optional on-disk page cache, enabled by pointing ROSTER_HTTP_CACHE_DIR at a directory
+    http_cache = None
+    if os.environ.get('ROSTER_HTTP_CACHE_DIR'):
+        http_cache = HTTPCache(
+            os.environ['ROSTER_HTTP_CACHE_DIR'],
+            ttl=int(os.environ.get('ROSTER_HTTP_CACHE_TTL', 7 * 24 * 3600)),
+            max_bytes=int(os.environ.get('ROSTER_HTTP_CACHE_MAX_MB', 256)) * 1024 * 1024
+        )
+    
+    # Parsed results are memoized in memory per worker; ROSTER_RESULT_CACHE_DIR adds
+    # a disk tier shared by every worker
+    result_cache = ResultCache(
+        max_entries=int(os.environ.get('ROSTER_RESULT_CACHE_ENTRIES', 128)),
+        directory=os.environ.get('ROSTER_RESULT_CACHE_DIR') or None
+    )
+    
+    # Optional per-page record of the card selectors that worked, so repeat scrapes
+    # of a roster skip the full cascade; enabled by pointing ROSTER_SITE_PROFILES_DB at a file
+    site_profiles_db = os.environ.get('ROSTER_SITE_PROFILES_DB')
+    if site_profiles_db == 'off':
+        site_profiles_db = None
+    site_profiles = SiteProfileStore(site_profiles_db) if site_profiles_db else None
+    
+    # Every roster scraped with a URL is indexed for /search (ROSTER_INDEX_DB=off disables it)
+    index_db = os.environ.get('ROSTER_INDEX_DB') or os.path.join(tempfile.gettempdir(), 'roster_index.sqlite3')
+    roster_index = None
+    if index_db != 'off':
+        roster_index = RosterIndex(index_db, max_teams=int(os.environ.get('ROSTER_INDEX_MAX_TEAMS', 5000)))
+    
+    # Parse in worker processes to use every core (ROSTER_PARSE_PROCESSES=N)
+    parse_pool = None
+    if int(os.environ.get('ROSTER_PARSE_PROCESSES', 0)) > 0:
+        parse_pool = ParsePool(
+            processes=int(os.environ['ROSTER_PARSE_PROCESSES']),
+            parser=os.environ.get('ROSTER_PARSER', 'auto'),
+            site_profiles_db=site_profiles_db
+        )
+    
+    # Fetch timeouts, per-host politeness and retries for slow or throttling athletics sites
+    fetcher = Fetcher(
+        connect_timeout=float(os.environ.get('ROSTER_CONNECT_TIMEOUT', 5)),
+        read_timeout=float(os.environ.get('ROSTER_READ_TIMEOUT', 20)),
+        rate=float(os.environ.get('ROSTER_HOST_RATE', 2)),
+        burst=int(os.environ.get('ROSTER_HOST_BURST', 4)),
+        max_retries=int(os.environ.get('ROSTER_FETCH_RETRIES', 3))
+    )
+    
+    # Headshot downloads for "photos": true scrapes and bulk exports, cached by content
+    # hash on disk (ROSTER_PHOTO_DIR=off disables them)
+    photo_dir = os.environ.get('ROSTER_PHOTO_DIR') or os.path.join(tempfile.gettempdir(), 'roster_photos')
+    photo_pipeline = None
+    if photo_dir != 'off':
+        photo_pipeline = PhotoPipeline(
+            PhotoCache(
+                photo_dir,
+                max_bytes=int(os.environ.get('ROSTER_PHOTO_CACHE_MAX_MB', 512)) * 1024 * 1024,
+                thumbnail_size=int(os.environ.get('ROSTER_THUMBNAIL_SIZE', 256))
+            ),
+            Fetcher(
+                pool_size=int(os.environ.get('ROSTER_PHOTO_WORKERS', 8)),
+                connect_timeout=float(os.environ.get('ROSTER_CONNECT_TIMEOUT', 5)),
+                read_timeout=float(os.environ.get('ROSTER_READ_TIMEOUT', 20)),
+                rate=float(os.environ.get('ROSTER_PHOTO_HOST_RATE', 10)),
+                burst=int(os.environ.get('ROSTER_PHOTO_HOST_BURST', 10)),
+                max_retries=int(os.environ.get('ROSTER_FETCH_RETRIES', 3))
+            ),
+            max_workers=int(os.environ.get('ROSTER_PHOTO_WORKERS', 8))
+        )
+    
+    # Headless Chromium for rosters built by JavaScript (method "render"), when playwright
+    # is installed. Each worker starts its own browser on its first render.
+    renderer = None
+    if render.available() and os.environ.get('ROSTER_RENDER_PAGES') != '0':
+        renderer = render.RendererPool(
+            pages=int(os.environ.get('ROSTER_RENDER_PAGES', 4)),
+            timeout=float(os.environ.get('ROSTER_RENDER_TIMEOUT', 30)),
+            wait_timeout=float(os.environ.get('ROSTER_RENDER_WAIT', 10))
+        )
+    
+    scraper = RosterScraper(
+        http_cache=http_cache,
+        result_cache=result_cache,
+        parser=os.environ.get('ROSTER_PARSER', 'auto'),
+        stream=os.environ.get('ROSTER_STREAM', '') == '1',
+        parse_pool=parse_pool,
+        fetcher=fetcher,
+        site_profiles=site_profiles,
+        renderer=renderer,
+        roster_index=roster_index
+    )
+    
+    # Past rosters per team URL, so repeat scrapes can report only what changed
+    snapshot_store = SnapshotStore(
+        os.environ.get('ROSTER_SNAPSHOTS_DB') or os.path.join(tempfile.gettempdir(), 'roster_snapshots.sqlite3'),
+        keep=int(os.environ.get('ROSTER_SNAPSHOTS_KEEP', 30)),
+        max_urls=int(os.environ.get('ROSTER_SNAPSHOTS_MAX_URLS', 10000))
+    )
+    
+    # Optional background scrapes so slow athletics sites don't tie up request workers.
+    # Job state is in SQLite, so every gunicorn worker on the box can answer polls; it
+    # is enabled by pointing ROSTER_JOBS_DB at a file on a disk that outlives the workers.
+    job_queue = None
+    if os.environ.get('ROSTER_JOBS_DB', 'off') != 'off':
+        job_queue = JobQueue(
+            run_scrape,
+            os.environ['ROSTER_JOBS_DB'],
+            max_workers=int(os.environ.get('ROSTER_JOB_WORKERS', 4))
+        )
+
+# Longest a GET /jobs/<id>?wait= long-poll may block, in seconds
+MAX_JOB_WAIT = 30
+
+def check_method(method):
+    """The reason a /scrape or /jobs method can't be served, or None"""
+    if method not in ('url', 'html', 'render'):
+        return 'Invalid method'
+    if method == 'render' and renderer is None:
+        return 'Rendering is unavailable: install playwright and run "playwright install chromium"'
+    return None
+
+def check_jobs():
+    if job_queue is None:
+        return 'Background jobs are disabled (set ROSTER_JOBS_DB)'
+    return None
+
+def check_photos(data):
+    if data.get('photos') and photo_pipeline is None:
+        return 'Photo downloads are disabled (ROSTER_PHOTO_DIR=off)'
+    return None
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
     data = request.json
     method = data.get('method')
     
+    error = check_method(method) or check_photos(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # "async": true hands the scrape to the job queue instead of running it inline
+    if data.get('async'):
+        error = check_jobs()
+        if error:
+            return jsonify({'error': error}), 400
+        return submit_job(data)
+    
+    # ?since= returns only what changed relative to the snapshot in effect at that time
+    since = request.args.get('since')
+    if since is not None:
+        return scrape_changes(data, since)
+    
     try:
-        if method == 'url':
-            url = data.get('url')
-            roster_data = scraper.scrape_from_url(url)
-        elif method == 'html':
-            html_content = data.get('html')
-            url = data.get('url', '')
-            roster_data = scraper.scrape_from_html(html_content, url)
-        else:
-            return jsonify({'error': 'Invalid method'}), 400
-        
+        roster_data = run_scrape(data)
         return jsonify({
             'success': True,
             'data': roster_data
@@ -40,6 +259,112 @@ def scrape():
             'error': str(e)
         }), 500
 
+def scrape_changes(data, since):
+    if data.get('method') not in ('url', 'render') or not data.get('url'):
+        return jsonify({'error': 'since requires method url or render'}), 400
+    try:
+        before = parse_since(since)
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO-8601 time, unix seconds or "last"'}), 400
+    
+    url = data['url']
+    baseline = snapshot_store.latest(url, before=before)
+    try:
+        roster_data = run_scrape(data)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    delta = diff_rosters(baseline['roster_data'] if baseline else None, roster_data)
+    return jsonify({
+        'success': True,
+        'url': url,
+        'since': format_time(baseline['taken_at']) if baseline else None,
+        'changed': delta.pop('changed'),
+        'delta': delta
+    })
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    data = request.json or {}
+    error = check_jobs() or check_method(data.get('method')) or check_photos(data)
+    if error:
+        return jsonify({'error': error}), 400
+    return submit_job(data)
+
+def submit_job(data):
+    job_id = job_queue.submit(data)
+    response = jsonify({'success': True, 'job_id': job_id, 'status': 'queued'})
+    response.status_code = 202
+    response.headers['Location'] = f'/jobs/{job_id}'
+    return response
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    if job_queue is None:
+        return jsonify({'error': check_jobs()}), 404
+    wait = min(request.args.get('wait', 0, type=float), MAX_JOB_WAIT)
+    job = job_queue.wait(job_id, wait) if wait > 0 else job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@app.route('/scrape/batch', methods=['POST'])
+def scrape_batch():
+    data = request.json or {}
+    urls = data.get('urls')
+    
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'error': 'urls must be a non-empty list'}), 400
+    if len(urls) > MAX_BATCH_URLS:
+        return jsonify({'error': f'At most {MAX_BATCH_URLS} urls per batch'}), 400
+    # Checked up front: once the stream has started, a bad entry can only break it
+    if not all(isinstance(url, str) and url.strip() for url in urls):
+        return jsonify({'error': 'Every entry in urls must be a non-empty string'}), 400
+    
+    # Stream one JSON line per URL as soon as its scrape finishes
+    def generate():
+        for result in scraper.scrape_many(urls):
+            if result['success']:
+                snapshot_store.save(result['url'], result['data'])
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/search', methods=['GET'])
+def search_athletes():
+    if roster_index is None:
+        return jsonify({'error': 'The roster index is disabled (ROSTER_INDEX_DB=off)'}), 404
+    results = roster_index.search(
+        request.args.get('q', ''),
+        number=request.args.get('number'),
+        position=request.args.get('position'),
+        year=request.args.get('year'),
+        team=request.args.get('team'),
+        role=request.args.get('role'),
+        limit=request.args.get('limit', 50, type=int)
+    )
+    return jsonify({'success': True, 'count': len(results), 'results': results})
+
+@app.route('/teams', methods=['GET'])
+def list_teams():
+    if roster_index is None:
+        return jsonify({'error': 'The roster index is disabled (ROSTER_INDEX_DB=off)'}), 404
+    url = request.args.get('url')
+    if url:
+        # A team's last indexed roster, without fetching or parsing the page again
+        entry = roster_index.get(url)
+        if entry is None:
+            return jsonify({'error': 'Team not indexed'}), 404
+        return jsonify({'success': True, 'url': url, 'indexed_at': format_time(entry['indexed_at']),
+                        'data': entry['roster_data']})
+    teams = roster_index.teams(request.args.get('q', ''))
+    for team in teams:
+        team['indexed_at'] = format_time(team['indexed_at'])
+    return jsonify({'success': True, 'count': len(teams), 'teams': teams})
+
 @app.route('/export/csv', methods=['POST'])
 def export_csv():
     data = request.json
@@ -47,137 +372,97 @@ def export_csv():
     sport = data.get('sport', 'basketball')  # Default to basketball
     export_options = data.get('export_options', {})
     
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    if sport in ['baseball', 'softball']:
-        # Baseball/Softball format - combined names, no season
-        # Team info section
-        writer.writerow(['Team Name', '', '', 'Record:', '', '', '', ''])
-        writer.writerow(['Mascot:', '', '', 'Rank:', '', '', '', ''])
-        writer.writerow(['Color 1:', '', '', 'Location:', '', '', '', ''])
-        writer.writerow(['Color 2:', '', '', 'Logo:', '', '', '', ''])
-        writer.writerow(['Color 3:', '', '', '', '', '', '', ''])
-        writer.writerow(['', '', '', '', '', '', '', ''])
-        
-        # Coaches section (first 3 only) - combined names
-        writer.writerow(['', 'Coaches', '', '', '', '', ''])
-        writer.writerow(['Name', 'Title', 'Dropline 1', '', 'Dropline 2', '', ''])
-        for coach in roster_data.get('coaches', [])[:3]:  # Limit to first 3
-            full_name = coach.get('full_name', '') or f"{coach.get('first_name', '')} {coach.get('last_name', '')}".strip()
-            writer.writerow([
-                full_name,
-                coach.get('title', ''),
-                coach.get('dropline1', ''),
-                '',
-                coach.get('dropline2', ''),
-                '', ''
-            ])
-        
-        writer.writerow(['', '', '', '', '', '', ''])
-        
-        # Players section - Name in column A, Number in column B
-        writer.writerow(['', 'PLAYERS', '', '', '', '', ''])
-        
-        # Simple header - no empty column between Name and #
-        header = ['Name', '#', '', '', '', '', '']
-        writer.writerow(header)
-        
-        for player in roster_data.get('players', []):
-            full_name = player.get('full_name', '') or f"{player.get('first_name', '')} {player.get('last_name', '')}".strip()
-            row = [
-                full_name,
-                player.get('number', '') if export_options.get('number', True) else '',
-                '',
-                '',
-                '',
-                '',
-                ''
-            ]
-            writer.writerow(row)
+    # Checked up front: the sport names the file, and the stream can't fail cleanly
+    if not isinstance(sport, str):
+        return jsonify({'error': 'sport must be a string'}), 400
     
-    else:
-        # Basketball format (original)
-        writer.writerow(['Team Name', roster_data.get('team_name', ''), '', 'Location:', '', '', '', '', ''])
-        writer.writerow(['Rank:', '', '', 'Logo:', '', '', '', '', ''])
-        writer.writerow(['Color:', '', '', '', '', '', '', '', ''])
-        writer.writerow(['', '', '', '', '', '', '', '', ''])
-        
-        # Write coaches (first 3 only)
-        writer.writerow(['', 'Coaches', '', '', '', '', '', '', ''])
-        writer.writerow(['Last Name', 'First Name', 'Title', 'Dropline 1', '', 'Dropline 2', '', '', ''])
-        for coach in roster_data.get('coaches', [])[:3]:  # Limit to first 3
-            writer.writerow([
-                coach.get('last_name', ''),
-                coach.get('first_name', ''),
-                coach.get('title', ''),
-                coach.get('dropline1', ''),
-                '',
-                coach.get('dropline2', ''),
-                '', '', ''
-            ])
-        
-        writer.writerow(['', '', '', '', '', '', '', '', ''])
-        
-        # Write players
-        writer.writerow(['', 'PLAYERS', '', '', '', '', '', '', ''])
-        
-        header = []
-        if export_options.get('number', True):
-            header.append('#')
-        header.extend(['First Name', 'Last Name'])
-        if export_options.get('position', True):
-            header.append('Pos')
-        if export_options.get('year', True):
-            header.append('Year')
-        if export_options.get('height', True):
-            header.append('Ht')
-        if export_options.get('weight', True):
-            header.append('Wt')
-        if export_options.get('photo', True):
-            header.append('Photo')
-        
-        while len(header) < 9:
-            header.append('')
-        
-        writer.writerow(header)
-        
-        for player in roster_data.get('players', []):
-            row = []
-            if export_options.get('number', True):
-                row.append(player.get('number', ''))
-            row.extend([
-                player.get('first_name', ''),
-                player.get('last_name', '')
-            ])
-            if export_options.get('position', True):
-                row.append(player.get('position', ''))
-            if export_options.get('year', True):
-                row.append(player.get('year', ''))
-            if export_options.get('height', True):
-                row.append(player.get('height', ''))
-            if export_options.get('weight', True):
-                row.append(player.get('weight', ''))
-            if export_options.get('photo', True):
-                row.append(player.get('photo', ''))
-            
-            while len(row) < 9:
-                row.append('')
-            
-            writer.writerow(row)
-    
-    # Convert to bytes for download
-    output.seek(0)
-    csv_bytes = io.BytesIO(output.getvalue().encode('utf-8'))
-    csv_bytes.seek(0)
-    
-    sport_name = sport.capitalize()
-    return send_file(
-        csv_bytes,
+    def generate():
+        with metrics.stage('csv'):
+            yield from iter_csv_chunks(iter_csv_rows(roster_data, sport, export_options))
+    
+    return Response(
+        stream_with_context(generate()),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=f"{roster_data.get('team_name', 'roster')}_{sport_name}_roster.csv"
+        headers={'Content-Disposition': content_disposition(roster_filename(roster_data, sport))}
+    )
+
+# Response type per /export/bulk format
+BULK_MIMETYPES = {
+    'csv': 'text/csv',
+    'zip': 'application/zip',
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+@app.route('/export/bulk', methods=['POST'])
+def export_bulk():
+    data = request.json or {}
+    export_format = data.get('format', 'zip')
+    sport = data.get('sport', 'basketball')
+    export_options = data.get('export_options', {})
+    rosters = data.get('rosters', [])
+    job_ids = data.get('job_ids', [])
+    
+    if export_format not in BULK_MIMETYPES:
+        return jsonify({'error': f"format must be one of {', '.join(BULK_MIMETYPES)}"}), 400
+    if export_format in ('arrow', 'parquet') and export_format not in record_formats():
+        return jsonify({'error': f'{export_format} export needs pyarrow installed'}), 400
+    if not isinstance(rosters, list) or not isinstance(job_ids, list):
+        return jsonify({'error': 'rosters and job_ids must be lists'}), 400
+    if not rosters and not job_ids:
+        return jsonify({'error': 'Provide rosters and/or job_ids'}), 400
+    if len(rosters) + len(job_ids) > MAX_BULK_TEAMS:
+        return jsonify({'error': f'At most {MAX_BULK_TEAMS} teams per export'}), 400
+    if not isinstance(sport, str):
+        return jsonify({'error': 'sport must be a string'}), 400
+    error = check_photos(data) or (check_jobs() if job_ids else None)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Each team may override the request-wide sport and export options
+    teams = []
+    urls = []
+    for entry in rosters:
+        if not isinstance(entry, dict) or not isinstance(entry.get('roster_data'), dict):
+            return jsonify({'error': 'Each rosters entry needs a roster_data object'}), 400
+        if not isinstance(entry.get('sport', sport), str):
+            return jsonify({'error': 'sport must be a string'}), 400
+        teams.append((entry['roster_data'], entry.get('sport', sport), entry.get('export_options', export_options)))
+        urls.append(entry.get('url', ''))
+    for job_id in job_ids:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job {job_id}'}), 404
+        if job['status'] != 'done':
+            return jsonify({'error': f'Job {job_id} is {job["status"]}, not done'}), 409
+        teams.append((job['result'], sport, export_options))
+        urls.append('')
+    
+    # Every team's photos are fetched together, so a whole conference downloads concurrently
+    if data.get('photos'):
+        with metrics.stage('photos'):
+            photo_pipeline.localize([roster_data for roster_data, _, _ in teams])
+    
+    # csv and zip use the spreadsheet layout; the rest are flat per-person records
+    records = [(roster_data, url) for (roster_data, _, _), url in zip(teams, urls)]
+    writers = {
+        'csv': lambda: iter_csv_chunks(iter_combined_rows(teams)),
+        'zip': lambda: iter_zip_chunks(teams, photo_cache=photo_pipeline.cache if photo_pipeline else None),
+        'ndjson': lambda: iter_ndjson_chunks(records),
+        'arrow': lambda: iter_arrow_chunks(records),
+        'parquet': lambda: iter_parquet_chunks(records)
+    }
+    
+    def generate():
+        with metrics.stage('csv' if export_format in ('csv', 'zip') else 'records'):
+            yield from writers[export_format]()
+    
+    filename = f'{sport.capitalize()}_rosters.{export_format}'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=BULK_MIMETYPES[export_format],
+        headers={'Content-Disposition': content_disposition(filename)}
     )
 
 if __name__ == '__main__':
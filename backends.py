@@ -0,0 +1,134 @@
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder, ParserRejectedMarkup
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+
+# Optional fast parsers - the pure-Python html.parser always works as a fallback
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+# Tags that never hold roster data and are stripped before any parser runs
+NOISE_TAGS = ['script', 'style', 'nav', 'header', 'footer']
+
+# Preference order used by 'auto'
+AUTO_ORDER = ['lxml', 'html.parser']
+
+def available_backends():
+    """List the parser backends usable in this environment"""
+    backends = []
+    if SelectolaxParser is not None:
+        backends.append('selectolax')
+    if HAS_LXML:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+def resolve_backend(name='auto'):
+    """Turn a requested backend name into one that is installed"""
+    available = available_backends()
+    if name in (None, '', 'auto'):
+        return next(backend for backend in AUTO_ORDER if backend in available)
+    if name not in ('selectolax', 'lxml', 'html.parser'):
+        raise ValueError(f'Unknown parser backend: {name}')
+    if name not in available:
+        raise ValueError(f'Parser backend {name} is not installed')
+    return name
+
+# Start tag -> (open elements it closes, elements that stop the search). lxml and
+# lexbor close these the way browsers do; plain html.parser nests an unclosed
+# <td> or <li> inside the previous one, so the same page would give a different tree
+IMPLIED_END_TAGS = {
+    'li': ({'li'}, {'ul', 'ol', 'menu', 'table'}),
+    'dt': ({'dt', 'dd'}, {'dl', 'table'}),
+    'dd': ({'dt', 'dd'}, {'dl', 'table'}),
+    'td': ({'td', 'th'}, {'tr', 'table'}),
+    'th': ({'td', 'th'}, {'tr', 'table'}),
+    'tr': ({'tr'}, {'thead', 'tbody', 'tfoot', 'table'}),
+    'thead': ({'thead', 'tbody', 'tfoot'}, {'table'}),
+    'tbody': ({'thead', 'tbody', 'tfoot'}, {'table'}),
+    'tfoot': ({'thead', 'tbody', 'tfoot'}, {'table'}),
+    'option': ({'option'}, {'select', 'datalist', 'optgroup'}),
+    'body': ({'head'}, {'html'})
+}
+
+# Block elements that end an open <p>, which can't contain them
+P_CLOSERS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'details', 'dialog', 'dir', 'div', 'dl',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hgroup', 'hr', 'li', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'ul'
+}
+P_SCOPE = {'button', 'table', 'td', 'th', 'caption', 'object', 'template', 'html'}
+
+class _ImpliedEndParser(BeautifulSoupHTMLParser):
+    """html.parser events, with the end tags HTML leaves implied closed before each start tag"""
+    
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        if tag in P_CLOSERS:
+            self._close_open(tag, {'p'}, P_SCOPE)
+        if tag in IMPLIED_END_TAGS:
+            self._close_open(tag, *IMPLIED_END_TAGS[tag])
+        super().handle_starttag(tag, attrs, handle_empty_element)
+    
+    def _close_open(self, tag, closes, stops):
+        # Most start tags have nothing to close; bs4 counts the open tags by name
+        counts = self.soup.open_tag_counter
+        if not any(counts.get(name) for name in closes):
+            return
+        stack = self.soup.tagStack
+        for index in range(len(stack) - 1, 0, -1):
+            name = stack[index].name
+            if name in closes:
+                # Text read so far belongs to the element being closed
+                self.soup.endData()
+                self.soup._popToTag(name)
+                return
+            if name in stops:
+                return
+
+class ImpliedEndTreeBuilder(HTMLParserTreeBuilder):
+    """The html.parser tree builder with implied end tags, so its trees match lxml's and lexbor's"""
+    
+    def feed(self, markup):
+        args, kwargs = self.parser_args
+        parser = _ImpliedEndParser(self.soup, *args, **kwargs)
+        try:
+            parser.feed(markup)
+            parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        parser.already_closed_empty_element = []
+
+def make_soup(html_content, backend='html.parser'):
+    """Build a BeautifulSoup tree with the noise tags already removed"""
+    # Every backend ends in a bs4 tree, so the platform parsers run unchanged on top
+    if backend == 'selectolax':
+        # Lexbor builds the tree and drops noise tags in C; bs4 then only has
+        # to build the (much smaller) remaining document
+        tree = SelectolaxParser(html_content)
+        tree.strip_tags(NOISE_TAGS)
+        return BeautifulSoup(tree.html or '', 'lxml' if HAS_LXML else 'html.parser')
+    
+    soup = build_soup(html_content, backend)
+    strip_noise(soup)
+    return soup
+
+def build_soup(html_content, backend='html.parser'):
+    """Parse a document with one of the BeautifulSoup tree builders"""
+    if backend == 'html.parser':
+        return BeautifulSoup(html_content, builder=ImpliedEndTreeBuilder())
+    return BeautifulSoup(html_content, backend)
+
+def strip_noise(soup):
+    """Remove script/style/nav/header/footer elements from a soup in place"""
+    for tag in soup.find_all(NOISE_TAGS):
+        tag.decompose()
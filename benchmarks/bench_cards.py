@@ -0,0 +1,213 @@
+"""Micro-benchmark for RosterScraper._extract_player_from_sidearm_card
+
+Run from the repo root:
+
+    python benchmarks/bench_cards.py [--rounds 20] [--parser html.parser]
+
+Times the extractor against the baseline one it replaced (one find()/find_all()
+per field, patterns compiled per call), on the same saved cards in
+benchmarks/fixtures/sidearm_cards.html, and checks they extract the same fields.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import make_soup
+from scraper import RosterScraper, PERSON_CARD_CLASS
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sidearm_cards.html')
+
+BASE_URL = 'https://example.edu/roster'
+
+def baseline_extract(container, base_url):
+    """The extractor as it was before the single-pass rewrite, kept verbatim for comparison"""
+    player = {
+        'number': '',
+        'first_name': '',
+        'last_name': '',
+        'full_name': '',  # Combined name for baseball/softball
+        'position': '',
+        'photo': '',
+        'height': '',
+        'weight': ''
+    }
+    
+    full_text = container.get_text(separator=' ', strip=True)
+    
+    # Find name
+    name_elem = container.find(['h3', 'h4', 'h5', 'a'], class_=re.compile(r'name', re.I))
+    if not name_elem:
+        name_elem = container.find(['h3', 'h4', 'h5', 'strong'])
+    if not name_elem:
+        name_elem = container.find('a', href=re.compile(r'/player/|/athlete/|/roster/', re.I))
+    
+    if name_elem:
+        name_text = name_elem.get_text(strip=True)
+        name_text = re.sub(r'^#?\d{1,3}\s*', '', name_text)
+        name_parts = name_text.split()
+        if len(name_parts) >= 2:
+            player['first_name'] = name_parts[0]
+            player['last_name'] = ' '.join(name_parts[1:])
+            player['full_name'] = f"{player['first_name']} {player['last_name']}"
+    
+    # Find jersey number - try data attributes first
+    if container.has_attr('data-number'):
+        player['number'] = container['data-number']
+    elif container.has_attr('data-jersey'):
+        player['number'] = container['data-jersey']
+    
+    # Look for Sidearm's stamp element (where OK State hides jersey numbers)
+    if not player['number']:
+        stamp_elem = container.find('div', attrs={'data-test-id': 's-stamp__root'})
+        if not stamp_elem:
+            stamp_elem = container.find('div', class_=re.compile(r's-stamp'))
+        
+        if stamp_elem:
+            stamp_text_elem = stamp_elem.find('span', class_=re.compile(r's-stamp__text'))
+            if stamp_text_elem:
+                # Get text, remove "Jersey Number" label
+                stamp_text = stamp_text_elem.get_text(strip=True)
+                stamp_text = re.sub(r'Jersey Number\s*', '', stamp_text, flags=re.I)
+                # Extract just the number
+                number_match = re.search(r'\d{1,3}', stamp_text)
+                if number_match:
+                    player['number'] = number_match.group()
+    
+    # Try finding number in specific elements
+    if not player['number']:
+        number_elem = container.find(class_=re.compile(r'(^|\s)number($|\s)|(^|\s)jersey($|\s)', re.I))
+        if number_elem:
+            number_text = number_elem.get_text(strip=True)
+            number_match = re.search(r'\d{1,3}', number_text)
+            if number_match:
+                player['number'] = number_match.group()
+    
+    # Search in spans with specific classes
+    if not player['number']:
+        spans = container.find_all('span')
+        for span in spans:
+            span_class = ' '.join(span.get('class', []))
+            if 'number' in span_class.lower() or 'jersey' in span_class.lower():
+                num_match = re.search(r'\d{1,3}', span.get_text())
+                if num_match:
+                    player['number'] = num_match.group()
+                    break
+    
+    # Last resort - search in full text
+    if not player['number']:
+        number_patterns = [
+            r'#(\d{1,3})\b',
+            r'No\.?\s*(\d{1,3})\b',
+            r'Jersey\s*(\d{1,3})\b',
+        ]
+        for pattern in number_patterns:
+            match = re.search(pattern, full_text)
+            if match:
+                player['number'] = match.group(1)
+                break
+    
+    # Find position
+    position_patterns = [
+        r'Position\s+([A-Z]{1,3}(?:/[A-Z]{1,3})?)\b',
+        r'\b(G|F|C|PG|SG|SF|PF|G/F|F/G|F/C)\b',
+        r'\b(Guard|Forward|Center)\b'
+    ]
+    
+    for pattern in position_patterns:
+        match = re.search(pattern, full_text)
+        if match:
+            pos = match.group(1)
+            if pos == 'Guard':
+                pos = 'G'
+            elif pos == 'Forward':
+                pos = 'F'
+            elif pos == 'Center':
+                pos = 'C'
+            player['position'] = pos
+            break
+    
+    # Find academic year (Fr, So, Jr, Sr)
+    year_match = re.search(r'Academic Year\s+(Fr\.?|So\.?|Jr\.?|Sr\.?)\b', full_text, re.I)
+    if not year_match:
+        year_match = re.search(r'\b(Freshman|Sophomore|Junior|Senior)\b', full_text, re.I)
+    if not year_match:
+        year_match = re.search(r'\b(Fr\.?|So\.?|Jr\.?|Sr\.?)\b', full_text)
+    
+    if year_match:
+        year = year_match.group(1)
+        # Normalize to abbreviation
+        year_map = {
+            'Freshman': 'Fr', 'Fr.': 'Fr',
+            'Sophomore': 'So', 'So.': 'So',
+            'Junior': 'Jr', 'Jr.': 'Jr',
+            'Senior': 'Sr', 'Sr.': 'Sr'
+        }
+        player['year'] = year_map.get(year, year)
+    
+    # Find height - matches patterns like "6' 1''" or "6-1" or "Height 6' 1''"
+    height_match = re.search(r"Height\s+(\d+['\"]?\s*\d+['\"]?)", full_text)
+    if not height_match:
+        height_match = re.search(r"(\d+['\"]?\s*-?\s*\d+['\"]?)", full_text)
+    
+    if height_match:
+        player['height'] = height_match.group(1).strip()
+    
+    # Find weight - matches patterns like "175 lbs" or "Weight 175"
+    weight_match = re.search(r"Weight\s+(\d+)\s*lbs?", full_text, re.I)
+    if not weight_match:
+        weight_match = re.search(r"(\d{3})\s*lbs?", full_text)
+    
+    if weight_match:
+        player['weight'] = weight_match.group(1)
+    
+    # Find photo
+    img = container.find('img')
+    if img and img.get('src'):
+        src = img['src']
+        if 'placeholder' not in src.lower() and 'default' not in src.lower():
+            player['photo'] = urljoin(base_url, src)
+    
+    return player
+
+def cards_per_second(extract, cards, rounds):
+    # Warm up regex caches and attribute lookups before timing
+    for card in cards:
+        extract(card, BASE_URL)
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for card in cards:
+            extract(card, BASE_URL)
+    return len(cards) * rounds / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--parser', default='html.parser')
+    args = parser.parse_args()
+    
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        soup = make_soup(f.read(), args.parser)
+    cards = soup.find_all(['div', 'li', 'article'], class_=PERSON_CARD_CLASS)
+    scraper = RosterScraper(parser=args.parser)
+    
+    differing = sum(
+        1 for card in cards
+        if scraper._extract_player_from_sidearm_card(card, BASE_URL).to_dict() != baseline_extract(card, BASE_URL)
+    )
+    baseline = cards_per_second(baseline_extract, cards, args.rounds)
+    current = cards_per_second(scraper._extract_player_from_sidearm_card, cards, args.rounds)
+    
+    print(f'{len(cards)} cards x {args.rounds} rounds ({args.parser})')
+    print(f'baseline: {baseline:10,.0f} cards/s')
+    print(f'current:  {current:10,.0f} cards/s ({current / baseline:.2f}x)')
+    if differing:
+        print(f'{differing} cards extracted differently from the baseline')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Memory held per athlete: roster_data dicts vs slotted Roster/Player/Coach records
+
+Run from the repo root:
+
+    python benchmarks/bench_memory.py [--copies 200] [--parser auto]
+
+Parses the corpus once, then keeps --copies independent copies of every roster
+(as a batch run would) in each form and reports the bytes held per athlete.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import Roster
+from scraper import RosterScraper
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+def held_bytes(build):
+    """Bytes still allocated after build() returns, while its result is alive"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return held
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--copies', type=int, default=200)
+    parser.add_argument('--parser', default='auto')
+    args = parser.parse_args()
+    
+    scraper = RosterScraper(parser=args.parser)
+    texts = []
+    athletes = 0
+    for path in sorted(glob.glob(os.path.join(CORPUS, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            roster_data = scraper.scrape_from_html(f.read(), 'https://example.edu/roster')
+        texts.append(json.dumps(roster_data))
+        athletes += len(roster_data['players']) + len(roster_data['coaches'])
+    athletes *= args.copies
+    
+    # Decoding JSON gives every copy its own strings, like separate scrapes would
+    as_dicts = held_bytes(lambda: [json.loads(text) for _ in range(args.copies) for text in texts])
+    as_records = held_bytes(lambda: [Roster.from_dict(json.loads(text)) for _ in range(args.copies) for text in texts])
+    
+    print(f'{athletes:,} athletes ({len(texts)} rosters x {args.copies} copies)')
+    print(f'dicts:   {as_dicts / athletes:7.0f} bytes/athlete')
+    print(f'records: {as_records / athletes:7.0f} bytes/athlete ({as_records / as_dicts:.0%} of dicts)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Roster index search latency with tens of thousands of athletes indexed
+
+Run from the repo root:
+
+    python benchmarks/bench_search.py [--teams 1000] [--repeat 200]
+
+Parses the corpus once and indexes --teams copies of its rosters under distinct
+URLs and team names (a corpus page holds about 40 people, so 1000 teams is
+roughly 40,000 athletes), then times a mix of free-text and filtered searches
+and a rescrape of an unchanged team.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import RosterScraper
+from search import RosterIndex
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+HOMETOWNS = ['Dallas, Texas', 'Austin, Texas', 'Tulsa, Okla.', 'Denver, Colo.', 'Omaha, Neb.', 'Wichita, Kan.']
+
+QUERIES = [
+    ('name prefix', {'text': 'mal'}),
+    ('hometown', {'text': 'texas'}),
+    ('#23 guard from Texas', {'text': 'texas', 'number': '23', 'position': 'G'}),
+    ('one team', {'team': 'Team 17'}),
+    ('position + year', {'position': 'G', 'year': 'Fr'}),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    
+    scraper = RosterScraper()
+    rosters = []
+    for path in sorted(glob.glob(os.path.join(CORPUS, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            rosters.append(json.dumps(scraper.scrape_from_html(f.read(), 'https://example.edu/roster')))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        index = RosterIndex(os.path.join(directory, 'index.sqlite3'))
+        athletes = 0
+        start = time.perf_counter()
+        for team in range(args.teams):
+            roster_data = json.loads(rosters[team % len(rosters)])
+            roster_data['team_name'] = f'Team {team}'
+            # Corpus pages rarely carry hometowns; spread a few so hometown searches have work to do
+            for position, player in enumerate(roster_data['players']):
+                player.setdefault('hometown', HOMETOWNS[(team + position) % len(HOMETOWNS)])
+            index.put(f'https://example.edu/team/{team}/roster', roster_data)
+            athletes += len(roster_data['players']) + len(roster_data['coaches'])
+        build = time.perf_counter() - start
+        
+        print(f'{athletes:,} athletes in {args.teams} teams, indexed in {build:.2f}s '
+              f'({build / args.teams * 1000:.1f}ms per team)')
+        for label, query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = index.search(**query)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f'{label:<22} {elapsed * 1000:7.2f}ms  ({len(results)} results)')
+        
+        roster_data = index.get('https://example.edu/team/0/roster')['roster_data']
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            index.put('https://example.edu/team/0/roster', roster_data)
+        print(f'{"unchanged rescrape":<22} {(time.perf_counter() - start) / args.repeat * 1000:7.2f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""Load test the app under gunicorn against a local stand-in athletics site
+
+Run from the repo root:
+
+    python benchmarks/loadtest.py [--configs 1x8,2x8,4x4] [--duration 20] [--concurrency 16]
+                                  [--mix scrape=6,csv=3,batch=1] [--latency 150] [--jitter 50]
+                                  [--error-rate 0.02] [--throttle-rate 0.02] [--output load.json]
+
+Starts benchmarks/mock_site.py in process, then for every WORKERSxTHREADS config
+boots `gunicorn app:app --worker-class gthread` (as render.yaml does) with its
+stores in a scratch directory. --concurrency client threads then send a weighted
+mix of requests for --duration seconds:
+
+    scrape  POST /scrape of a random team page on the mock site
+    csv     POST /export/csv of a saved roster
+    batch   POST /scrape/batch of --batch-size random team pages
+    search  GET /search over what has been indexed so far
+
+Reports throughput, p50/p95/p99 latency (overall and per request type), errors
+and peak resident memory of each gunicorn worker (read from /proc, so Linux only).
+The per-host rate limiter is off by default because every mock team shares one
+host; pass --host-rate to measure with it on.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_site
+from scraper import RosterScraper
+
+OPERATIONS = ['scrape', 'csv', 'batch', 'search']
+
+def parse_configs(text):
+    """'1x8,2x8' -> [(1, 8), (2, 8)]"""
+    configs = []
+    for item in text.split(','):
+        workers, _, threads = item.strip().partition('x')
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+def parse_mix(text):
+    """'scrape=6,csv=3' -> {'scrape': 6.0, 'csv': 3.0}"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.strip().partition('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f'Unknown operation {name!r}; choose from {", ".join(OPERATIONS)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+def child_pids(parent):
+    """Direct children of a process, from /proc (empty where /proc isn't available)"""
+    children = []
+    try:
+        names = os.listdir('/proc')
+    except OSError:
+        return children
+    for name in names:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after its closing parenthesis
+        fields = stat[stat.rfind(')') + 2:].split()
+        if int(fields[1]) == parent:
+            children.append(int(name))
+    return children
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+class Gunicorn:
+    """One gunicorn app:app under test, with every store in a scratch directory"""
+    
+    def __init__(self, workers, threads, host_rate, scratch):
+        self.port = free_port()
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.log_path = os.path.join(scratch, 'gunicorn.log')
+        env = dict(os.environ)
+        env.update({
+            'ROSTER_JOBS_DB': os.path.join(scratch, 'jobs.sqlite3'),
+            'ROSTER_SNAPSHOTS_DB': os.path.join(scratch, 'snapshots.sqlite3'),
+            'ROSTER_SITE_PROFILES_DB': os.path.join(scratch, 'site_profiles.sqlite3'),
+            'ROSTER_INDEX_DB': os.path.join(scratch, 'index.sqlite3'),
+            'ROSTER_PHOTO_DIR': os.path.join(scratch, 'photos'),
+            'ROSTER_HOST_RATE': str(host_rate)
+        })
+        self.log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', 'app:app',
+                '--worker-class', 'gthread', '--workers', str(workers), '--threads', str(threads),
+                '--timeout', '120', '--bind', f'127.0.0.1:{self.port}'
+            ],
+            cwd=ROOT, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+    
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if requests.get(self.url + '/metrics', timeout=2).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        with open(self.log_path, 'r') as f:
+            raise SystemExit('gunicorn did not start:\n' + f.read()[-2000:])
+    
+    def workers(self):
+        return child_pids(self.process.pid)
+    
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+class Workload:
+    """Picks and sends one request of the mix, returning (operation, seconds, ok)"""
+    
+    def __init__(self, app_url, site_url, pages, teams, mix, roster_data, batch_size):
+        self.app_url = app_url
+        self.site_url = site_url
+        self.pages = pages
+        self.teams = teams
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.roster_data = roster_data
+        self.batch_size = batch_size
+    
+    def team_url(self):
+        return f'{self.site_url}/team/{random.randrange(self.teams)}/{random.choice(self.pages)}'
+    
+    def send(self, session):
+        operation = random.choices(self.operations, self.weights)[0]
+        start = time.perf_counter()
+        try:
+            ok = getattr(self, operation)(session)
+        except requests.RequestException:
+            ok = False
+        return operation, time.perf_counter() - start, ok
+    
+    def scrape(self, session):
+        response = session.post(self.app_url + '/scrape', json={'method': 'url', 'url': self.team_url()}, timeout=120)
+        return response.status_code == 200 and response.json().get('success', False)
+    
+    def csv(self, session):
+        response = session.post(self.app_url + '/export/csv', json={'roster_data': self.roster_data}, timeout=120)
+        return response.status_code == 200 and len(response.content) > 0
+    
+    def batch(self, session):
+        urls = [self.team_url() for _ in range(self.batch_size)]
+        response = session.post(self.app_url + '/scrape/batch', json={'urls': urls}, timeout=300)
+        results = [json.loads(line) for line in response.iter_lines() if line]
+        return response.status_code == 200 and len(results) == len(urls) and all(r['success'] for r in results)
+    
+    def search(self, session):
+        response = session.get(self.app_url + '/search', params={'q': random.choice(['texas', 'jal', 'g'])}, timeout=120)
+        return response.status_code == 200
+
+def run_load(workload, concurrency, duration, warmup):
+    """Drive the workload from `concurrency` threads; returns the samples taken after warmup"""
+    samples = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    
+    def client():
+        session = requests.Session()
+        while True:
+            sent_at = time.monotonic()
+            if sent_at >= deadline:
+                break
+            sample = workload.send(session)
+            if sent_at >= measure_from:
+                with lock:
+                    samples.append(sample)
+        session.close()
+    
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    return threads, samples, measure_from, deadline
+
+def latency_stats(samples, elapsed):
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99)
+    }
+
+def summarize(samples, elapsed):
+    """Overall latency stats, plus the same per request type"""
+    summary = latency_stats(samples, elapsed)
+    summary['operations'] = {}
+    for operation in OPERATIONS:
+        subset = [sample for sample in samples if sample[0] == operation]
+        if subset:
+            summary['operations'][operation] = latency_stats(subset, elapsed)
+    return summary
+
+def run_config(workers, threads, args, site_url, pages, roster_data, mix):
+    with tempfile.TemporaryDirectory() as scratch:
+        server = Gunicorn(workers, threads, args.host_rate, scratch)
+        try:
+            server.wait_ready()
+            workload = Workload(server.url, site_url, pages, args.teams, mix, roster_data, args.batch_size)
+            clients, samples, measure_from, deadline = run_load(workload, args.concurrency, args.duration, args.warmup)
+            
+            # Sample worker memory while the load runs
+            peak_rss = {}
+            while any(client.is_alive() for client in clients):
+                for pid in server.workers():
+                    rss = rss_mb(pid)
+                    if rss is not None:
+                        peak_rss[pid] = max(peak_rss.get(pid, 0.0), rss)
+                time.sleep(0.5)
+            for client in clients:
+                client.join()
+        finally:
+            server.stop()
+    
+    # Requests still in flight at the deadline are counted, so measure to when the last finished
+    summary = summarize(samples, max(deadline, time.monotonic()) - measure_from)
+    summary['config'] = f'{workers}x{threads}'
+    summary['rss_mb'] = [round(rss, 1) for _, rss in sorted(peak_rss.items())]
+    return summary
+
+def print_summary(summary):
+    rss = ', '.join(f'{mb:.0f}' for mb in summary['rss_mb']) or 'n/a'
+    print(f"\n{summary['config']} (workers x threads): {summary['throughput']:.1f} req/s, "
+          f"{summary['requests']} requests, {summary['errors']} errors, peak RSS per worker (MB): {rss}")
+    print(f"{'':<10} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    rows = [('all', summary)] + list(summary['operations'].items())
+    for name, stats in rows:
+        print(f"{name:<10} {stats['throughput']:8.1f} {stats['p50']:7.0f}ms {stats['p95']:7.0f}ms "
+              f"{stats['p99']:7.0f}ms {stats['errors']:7d}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--configs', default='1x8,2x8,4x4', help='WORKERSxTHREADS, comma separated')
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds per config')
+    parser.add_argument('--warmup', type=float, default=3, help='unmeasured seconds before each run')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads')
+    parser.add_argument('--mix', default='scrape=6,csv=3,batch=1')
+    parser.add_argument('--batch-size', type=int, default=5)
+    parser.add_argument('--teams', type=int, default=200, help='distinct team pages per corpus page')
+    parser.add_argument('--host-rate', type=float, default=0, help='ROSTER_HOST_RATE for the app (0 = off)')
+    parser.add_argument('--site-port', type=int, default=0, help='mock site port (default: any free port)')
+    parser.add_argument('--latency', type=float, default=150, help='mock site mean delay in ms')
+    parser.add_argument('--jitter', type=float, default=50, help='mock site delay spread in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of mock 503 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of mock 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    
+    server, site = mock_site.serve(
+        args.site_port or free_port(),
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after
+    )
+    site_url = f'http://127.0.0.1:{server.server_address[1]}'
+    pages = sorted(site.pages)
+    
+    # A typical team for the CSV export requests
+    roster_data = RosterScraper().scrape_from_html(site.pages['sidearm_nextgen_mbb'], site_url + '/')
+    
+    print(f'Mock site {site_url}: {len(pages)} pages x {args.teams} teams, {args.latency:.0f}+/-{args.jitter:.0f}ms, '
+          f'{args.error_rate:.0%} 503s, {args.throttle_rate:.0%} 429s')
+    print(f'{args.concurrency} clients, mix {args.mix}, {args.duration:.0f}s per config after {args.warmup:.0f}s warmup')
+    
+    results = []
+    for workers, threads in parse_configs(args.configs):
+        summary = run_config(workers, threads, args, site_url, pages, roster_data, mix)
+        print_summary(summary)
+        results.append(summary)
+    
+    server.shutdown()
+    print(f'\nMock site served: {json.dumps(site.counts, sort_keys=True)}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Local stand-in athletics site serving the benchmark corpus pages
+
+Run from the repo root:
+
+    python benchmarks/mock_site.py [--port 8800] [--latency 150] [--jitter 50]
+                                   [--error-rate 0.02] [--throttle-rate 0.05] [--retry-after 1]
+
+GET /team/<n>/<page> serves benchmarks/corpus/<page>.html as team n's roster: the
+page is the same, but the team number is written into its <title> and a comment,
+so every team parses like a distinct page (the result cache can't short-circuit
+it). Each response is delayed by --latency +/- --jitter milliseconds. A share of
+them are 503s (--error-rate) or 429s with Retry-After (--throttle-rate), like a
+busy athletics CDN. GET /stats returns counts of what was served.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+TEAM_PATH = re.compile(r'^/team/(\d+)/([\w-]+)/?$')
+TITLE = re.compile(r'<title>', re.I)
+
+def load_pages():
+    """Corpus pages by name (file name without .html)"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+def team_page(html_content, team):
+    """The page as team n's: its number in the title and a comment, so the bytes differ per team"""
+    html_content = TITLE.sub(f'<title>Team {team} ', html_content, count=1)
+    return f'<!-- team {team} -->\n' + html_content
+
+class MockSite:
+    """The server's settings and counters, shared by every handler thread"""
+    
+    def __init__(self, latency=0.15, jitter=0.05, error_rate=0.0, throttle_rate=0.0, retry_after=1):
+        self.pages = load_pages()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.counts = {}
+        self._lock = threading.Lock()
+    
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+    
+    def delay(self):
+        time.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            if self.path == '/stats':
+                with site._lock:
+                    body = json.dumps(site.counts).encode('utf-8')
+                return self._send(200, body, 'application/json')
+            
+            match = TEAM_PATH.match(self.path.split('?')[0])
+            if not match or match.group(2) not in site.pages:
+                site.count('404')
+                return self._send(404, b'Not found', 'text/plain')
+            
+            site.delay()
+            roll = random.random()
+            if roll < site.throttle_rate:
+                site.count('429')
+                return self._send(429, b'Too many requests', 'text/plain', {'Retry-After': str(site.retry_after)})
+            if roll < site.throttle_rate + site.error_rate:
+                site.count('503')
+                return self._send(503, b'Service unavailable', 'text/plain')
+            
+            site.count('200')
+            body = team_page(site.pages[match.group(2)], match.group(1)).encode('utf-8')
+            self._send(200, body, 'text/html; charset=utf-8')
+        
+        def _send(self, status, body, content_type, headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+def serve(port=8800, **settings):
+    """Start the mock site in a background thread, returning (server, site)"""
+    site = MockSite(**settings)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(site))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, site
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=150, help='mean response delay in ms')
+    parser.add_argument('--jitter', type=float, default=50, help='delay spread in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    args = parser.parse_args()
+    
+    server, site = serve(
+        args.port,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after
+    )
+    print(f'Serving {len(site.pages)} pages at http://127.0.0.1:{args.port}/team/<n>/<page>: {", ".join(site.pages)}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
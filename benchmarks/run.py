@@ -0,0 +1,163 @@
+"""Offline benchmark suite over the saved roster pages in benchmarks/corpus/
+
+Run from the repo root:
+
+    python benchmarks/run.py [--parser auto] [--rounds 5] [--output results.json]
+    python benchmarks/run.py --output new.json --compare old.json
+
+Each page is timed end to end through scrape_from_html and per stage (parse,
+decompose, platform detection, embedded-JSON fast path, card extraction, CSV
+export). Every stage calls the scraper and exporter functions directly; the app
+and its stores are never loaded. Timings are the median over --rounds in
+milliseconds. With --compare, stages that got slower than --threshold are
+listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backends import build_soup, make_soup, strip_noise
+from export import iter_csv_chunks, iter_csv_rows
+from scraper import RosterScraper
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus')
+STAGES = ['parse', 'decompose', 'detect', 'embedded', 'extract', 'csv', 'end_to_end']
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+def export_csv(roster_data, sport):
+    """Build a roster's whole CSV as /export/csv streams it"""
+    return b''.join(iter_csv_chunks(iter_csv_rows(roster_data, sport)))
+
+def bench_page(scraper, page, rounds):
+    """Time every stage of one corpus page, returning medians in milliseconds"""
+    with open(os.path.join(CORPUS, page['file']), 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    url = page['url']
+    samples = {stage: [] for stage in STAGES}
+    
+    for _ in range(rounds):
+        # selectolax strips the noise tags while it parses, so decompose is folded into parse
+        if scraper.parser == 'selectolax':
+            soup, elapsed = timed(make_soup, html_content, scraper.parser)
+            samples['parse'].append(elapsed)
+            samples['decompose'].append(0.0)
+        else:
+            soup, elapsed = timed(build_soup, html_content, scraper.parser)
+            samples['parse'].append(elapsed)
+            _, elapsed = timed(strip_noise, soup)
+            samples['decompose'].append(elapsed)
+        
+        detected, elapsed = timed(scraper._detect_platform, html_content)
+        samples['detect'].append(elapsed)
+        
+        # The embedded-JSON fast path, which end_to_end takes instead of parse/extract when it finds a roster
+        if detected == 'sidearm':
+            _, elapsed = timed(scraper._parse_embedded, html_content, url)
+        else:
+            elapsed = 0.0
+        samples['embedded'].append(elapsed)
+        
+        roster, elapsed = timed(scraper._run_parser, detected, soup, url)
+        samples['extract'].append(elapsed)
+        roster_data = roster.to_dict()
+        
+        _, elapsed = timed(export_csv, roster_data, page.get('sport', 'basketball'))
+        samples['csv'].append(elapsed)
+        
+        _, elapsed = timed(scraper.scrape_from_html, html_content, url)
+        samples['end_to_end'].append(elapsed)
+    
+    result = {stage: round(statistics.median(values), 3) for stage, values in samples.items()}
+    result['bytes'] = len(html_content.encode('utf-8'))
+    result['platform'] = roster_data['platform']
+    result['players'] = len(roster_data['players'])
+    result['coaches'] = len(roster_data['coaches'])
+    # Guard against "faster" results that come from extracting less
+    result['counts_match'] = (
+        result['platform'] == page['platform']
+        and result['players'] == page['players']
+        and result['coaches'] == page['coaches']
+    )
+    return result
+
+def compare(current, baseline, threshold):
+    """Print per-stage ratios against a baseline run, returning the regressions"""
+    regressions = []
+    print(f"\n{'page':34} {'stage':11} {'old ms':>9} {'new ms':>9} {'ratio':>7}")
+    for name, stages in current['pages'].items():
+        old = baseline['pages'].get(name)
+        if not old:
+            continue
+        for stage in STAGES:
+            if not old.get(stage):
+                continue
+            ratio = stages[stage] / old[stage]
+            flag = ''
+            # Sub-millisecond stages are too noisy to gate on
+            if ratio > threshold and stages[stage] - old[stage] > 0.5:
+                flag = '  <-- slower'
+                regressions.append((name, stage, ratio))
+            print(f'{name:34} {stage:11} {old[stage]:9.3f} {stages[stage]:9.3f} {ratio:7.2f}{flag}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--parser', default='auto', help='Parser backend (auto, lxml, selectolax, html.parser)')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file from an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.15, help='Slowdown ratio treated as a regression')
+    args = parser.parse_args()
+    
+    with open(os.path.join(CORPUS, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    scraper = RosterScraper(parser=args.parser)
+    
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'parser': scraper.parser,
+            'rounds': args.rounds
+        },
+        'pages': {}
+    }
+    
+    print(f"{'page':34} " + ' '.join(f'{stage:>10}' for stage in STAGES) + '  counts')
+    for page in manifest['pages']:
+        result = bench_page(scraper, page, args.rounds)
+        results['pages'][page['file']] = result
+        print(f"{page['file']:34} " + ' '.join(f'{result[stage]:10.3f}' for stage in STAGES)
+              + ('  ok' if result['counts_match'] else '  CHANGED'))
+    
+    results['totals'] = {
+        stage: round(sum(page[stage] for page in results['pages'].values()), 3) for stage in STAGES
+    }
+    print(f"{'total':34} " + ' '.join(f"{results['totals'][stage]:10.3f}" for stage in STAGES))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} stage(s) slower than {args.threshold:.2f}x baseline')
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+def _write_atomic(path, text):
+    """Write a file via rename so concurrent readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class HTTPCache:
+    """On-disk cache of fetched roster pages, revalidated with conditional GETs"""
+    
+    # Each URL is stored as <sha256(url)>.html (page body) plus <sha256(url)>.json
+    # (ETag / Last-Modified). Entries older than ttl are dropped rather than
+    # revalidated, and least recently used ones are evicted past max_bytes.
+    def __init__(self, directory, ttl=7 * 24 * 3600, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.html'
+    
+    def get(self, url):
+        """Return the cached entry for a URL (metadata plus 'body'), or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry.get('stored_at', 0) > self.ttl:
+                _remove(meta_path, body_path)
+                return None
+            with open(body_path, 'r', encoding='utf-8') as f:
+                entry['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        
+        # Bump mtime so eviction treats this entry as recently used
+        _touch(meta_path)
+        return entry
+    
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def put(self, url, body, etag='', last_modified=''):
+        """Store a freshly downloaded page and its validators"""
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': etag or '',
+            'last_modified': last_modified or '',
+            'stored_at': time.time()
+        }
+        # Body first, so a reader never sees metadata without its page
+        _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(entry))
+        self._evict()
+    
+    def revalidated(self, url, entry):
+        """Restart an entry's TTL after the server answered 304 Not Modified"""
+        meta_path, _ = self._paths(url)
+        entry = {key: value for key, value in entry.items() if key != 'body'}
+        entry['stored_at'] = time.time()
+        _write_atomic(meta_path, json.dumps(entry))
+    
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                meta_path = os.path.join(self.directory, name)
+                body_path = meta_path[:-len('.json')] + '.html'
+                try:
+                    meta_stat = os.stat(meta_path)
+                    size = meta_stat.st_size + os.path.getsize(body_path)
+                except OSError:
+                    continue
+                # mtime is bumped on every write or hit, so an entry untouched
+                # for longer than ttl was also stored longer than ttl ago
+                if now - meta_stat.st_mtime > self.ttl:
+                    _remove(meta_path, body_path)
+                    continue
+                entries.append((meta_stat.st_mtime, size, meta_path, body_path))
+                total += size
+            
+            entries.sort()
+            for _, size, meta_path, body_path in entries:
+                if total <= self.max_bytes:
+                    break
+                _remove(meta_path, body_path)
+                total -= size
+
+class ResultCache:
+    """Memoizes parsed roster_data by a hash of the page, its URL and the parser version"""
+    
+    # Results are held as JSON text, so every hit hands back a fresh copy the
+    # caller can edit freely. The optional disk tier is shared by all gunicorn
+    # workers pointed at the same directory.
+    def __init__(self, max_entries=128, directory=None, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def key(self, html_content, url, parser_version):
+        """Hash everything that determines the parse result"""
+        digest = hashlib.sha256()
+        digest.update(f'{parser_version}\0{url}\0'.encode('utf-8'))
+        digest.update(html_content.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Return a copy of the cached roster_data for a key, or None"""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+        
+        if text is None and self.directory:
+            path = os.path.join(self.directory, key + '.json')
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError:
+                return None
+            _touch(path)
+            self._remember(key, text)
+        
+        return json.loads(text) if text is not None else None
+    
+    def put(self, key, roster_data):
+        """Cache roster_data under a key in memory and, if configured, on disk"""
+        text = json.dumps(roster_data)
+        self._remember(key, text)
+        if self.directory:
+            _write_atomic(os.path.join(self.directory, key + '.json'), text)
+            self._evict()
+    
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+    
+    def _evict(self):
+        """Trim the disk tier to max_bytes, least recently used first"""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                _remove(path)
+                total -= size
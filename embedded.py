@@ -0,0 +1,193 @@
+import json
+import re
+from records import parse_height_inches
+
+# Structured roster data that Sidearm pages ship alongside the visible cards:
+# JSON-LD (schema.org SportsTeam/Person), JSON data islands and state blobs
+# assigned to window. Everything here works on the raw HTML - no soup is built.
+
+JSON_SCRIPT_TYPE = re.compile(r'''type\s*=\s*["']?application/(?:ld\+)?json''', re.I)
+# window.__INITIAL_STATE__ = {...}; and similar, when the value is plain JSON
+ASSIGNED_JSON = re.compile(r'^\s*(?:var\s+|window\.)?[\w$.]+\s*=\s*([\[{].*[\]}])\s*;?\s*$', re.S)
+
+# Field name -> keys it goes by in the payloads seen in the wild, in priority order
+FIELD_KEYS = {
+    'number': ('jerseyNumber', 'jersey_number', 'jersey', 'uniformNumber', 'number'),
+    'first_name': ('firstName', 'first_name', 'givenName'),
+    'last_name': ('lastName', 'last_name', 'familyName'),
+    'name': ('fullName', 'full_name', 'displayName', 'name'),
+    'position': ('positionShort', 'position_short', 'positionAbbreviation', 'position', 'positionLong'),
+    'year': ('academicYearShort', 'academic_year_short', 'classYear', 'academicYear', 'academicYearLong', 'year'),
+    'height': ('height', 'displayHeight'),
+    'weight': ('weight', 'displayWeight'),
+    'hometown': ('hometown', 'homeTown', 'homeLocation', 'birthPlace'),
+    'photo': ('image', 'photo', 'headshot', 'imageUrl', 'photoUrl', 'thumbnail'),
+    'title': ('jobTitle', 'title', 'staffTitle')
+}
+
+# Keys whose list holds players or coaches
+PLAYER_LIST_KEYS = {'athlete', 'athletes', 'players', 'roster', 'rosterPlayers', 'roster_players'}
+COACH_LIST_KEYS = {'coach', 'coaches', 'staff', 'coachingStaff', 'coaching_staff', 'rosterStaff'}
+
+WEIGHT_DIGITS = re.compile(r'\d{2,3}')
+
+# Deeply nested state blobs are cut off here rather than walked in full
+MAX_DEPTH = 12
+
+# Case-insensitive scans over the original string: lowercasing a 1 MB page just to
+# find its script tags cost more than everything else done here
+SCRIPT_OPEN = re.compile(r'<script', re.I)
+SCRIPT_CLOSE = re.compile(r'</script', re.I)
+# The start of ASSIGNED_JSON, cheap to try on every inline script
+ASSIGNMENT_START = re.compile(r'\s*(?:var\s+|window\.)?[\w$.]+\s*=\s*[\[{]')
+
+def _iter_scripts(html_content):
+    """Yield (attributes, body start, body end) for each script tag"""
+    open_tag = SCRIPT_OPEN.search(html_content)
+    while open_tag:
+        open_end = html_content.find('>', open_tag.end())
+        if open_end == -1:
+            return
+        close = SCRIPT_CLOSE.search(html_content, open_end)
+        if close is None:
+            return
+        yield html_content[open_tag.end():open_end], open_end + 1, close.start()
+        open_tag = SCRIPT_OPEN.search(html_content, close.end())
+
+def has_json_scripts(html_content):
+    """Whether the HTML has an application/json or ld+json script, without decoding anything"""
+    return JSON_SCRIPT_TYPE.search(html_content) is not None
+
+def iter_json_payloads(html_content):
+    """Yield every decodable JSON payload in the page's script tags"""
+    for attrs, start, end in _iter_scripts(html_content):
+        if JSON_SCRIPT_TYPE.search(attrs):
+            text = html_content[start:end]
+        elif ASSIGNMENT_START.match(html_content, start, end):
+            # Only state blobs that mention a roster are worth decoding
+            body = html_content[start:end]
+            if 'roster' not in body.lower():
+                continue
+            assigned = ASSIGNED_JSON.match(body)
+            if not assigned:
+                continue
+            text = assigned.group(1)
+        else:
+            continue
+        try:
+            yield json.loads(text)
+        except ValueError:
+            continue
+
+def _text(value):
+    """Flatten a payload value (string, number, schema.org object) to display text"""
+    if value is None or isinstance(value, bool):
+        return ''
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else str(value)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        for key in ('abbreviation', 'short', 'value', 'name', 'url', 'contentUrl', 'src', 'title'):
+            if key in value:
+                return _text(value[key])
+        return ''
+    if isinstance(value, list) and value:
+        return _text(value[0])
+    return ''
+
+def _first(person, field):
+    for key in FIELD_KEYS[field]:
+        if key in person:
+            text = _text(person[key])
+            if text:
+                return text
+    return ''
+
+def _height(person):
+    # Sidearm's roster JSON splits height into feet and inches
+    feet = _text(person.get('heightFeet') or person.get('height_feet'))
+    inches = _text(person.get('heightInches') or person.get('height_inches'))
+    if feet:
+        return f'{feet}-{inches or 0}'
+    height = person.get('height')
+    # schema.org QuantitativeValue in inches
+    if isinstance(height, dict) and str(height.get('unitCode', '')).upper() in ('INH', 'IN'):
+        try:
+            total = int(float(height.get('value', 0) or 0))
+        except (TypeError, ValueError, OverflowError):
+            # Some sites put the displayed height ("6-2", "6' 2\"") in the value
+            total = parse_height_inches(_text(height.get('value'))) or 0
+        return f'{total // 12}-{total % 12}' if total else ''
+    return _first(person, 'height')
+
+def _looks_like_person(item):
+    if not isinstance(item, dict):
+        return False
+    if item.get('@type') == 'Person':
+        return True
+    has_name = any(key in item for key in FIELD_KEYS['first_name'] + FIELD_KEYS['last_name'])
+    return has_name or ('name' in item and any(
+        key in item for key in FIELD_KEYS['number'] + FIELD_KEYS['position'] + FIELD_KEYS['title']
+    ))
+
+def person_fields(person):
+    """Normalize one person object to the scraper's field names (all strings)"""
+    first_name = _first(person, 'first_name')
+    last_name = _first(person, 'last_name')
+    if not (first_name and last_name):
+        name_parts = _first(person, 'name').split()
+        if len(name_parts) >= 2:
+            first_name = name_parts[0]
+            last_name = ' '.join(name_parts[1:])
+    # Weight is kept as bare pounds, like the card parser reads it
+    weight = WEIGHT_DIGITS.search(_first(person, 'weight'))
+    return {
+        'number': _first(person, 'number').lstrip('#'),
+        'first_name': first_name,
+        'last_name': last_name,
+        'position': _first(person, 'position'),
+        'year': _first(person, 'year'),
+        'height': _height(person),
+        'weight': weight.group() if weight else '',
+        'hometown': _first(person, 'hometown'),
+        'photo': _first(person, 'photo'),
+        'title': _first(person, 'title')
+    }
+
+def iter_people(payload, role=None, depth=0):
+    """Yield (role, person object) for every person found in a payload.
+
+    role is 'player' or 'coach' when the list holding the person says which,
+    otherwise None and the caller decides from the person's fields.
+    """
+    if depth > MAX_DEPTH:
+        return
+    if isinstance(payload, list):
+        for item in payload:
+            if _looks_like_person(item):
+                yield role, item
+            else:
+                yield from iter_people(item, role, depth + 1)
+    elif isinstance(payload, dict):
+        # JSON-LD documents may bundle several nodes under @graph
+        for key, value in payload.items():
+            if key in PLAYER_LIST_KEYS:
+                child_role = 'player'
+            elif key in COACH_LIST_KEYS:
+                child_role = 'coach'
+            else:
+                child_role = role
+            if _looks_like_person(value):
+                yield child_role, value
+            elif isinstance(value, (list, dict)):
+                yield from iter_people(value, child_role, depth + 1)
+
+def find_team_name(payloads):
+    """Team name from a schema.org SportsTeam node, if any payload has one"""
+    for payload in payloads:
+        nodes = payload.get('@graph', [payload]) if isinstance(payload, dict) else payload
+        for node in nodes if isinstance(nodes, list) else []:
+            if isinstance(node, dict) and node.get('@type') == 'SportsTeam' and node.get('name'):
+                return _text(node['name'])
+    return ''
@@ -0,0 +1,356 @@
+import csv
+import io
+import json
+import os
+import re
+import unicodedata
+import zipfile
+from urllib.parse import quote
+
+from werkzeug.http import dump_options_header
+
+from records import RECORD_FIELDS, flatten_roster
+
+# Optional columnar output - CSV and NDJSON always work without it
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Bytes of CSV text gathered before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+# Records per Arrow batch / Parquet row group; a team is only a few dozen rows
+BATCH_ROWS = 10000
+
+def iter_csv_rows(roster_data, sport='basketball', export_options=None):
+    """Yield the rows of one team's CSV in the basketball or baseball/softball layout"""
+    export_options = export_options or {}
+    
+    if sport in ['baseball', 'softball']:
+        # Baseball/Softball format - combined names, no season
+        # Team info section
+        yield ['Team Name', '', '', 'Record:', '', '', '', '']
+        yield ['Mascot:', '', '', 'Rank:', '', '', '', '']
+        yield ['Color 1:', '', '', 'Location:', '', '', '', '']
+        yield ['Color 2:', '', '', 'Logo:', '', '', '', '']
+        yield ['Color 3:', '', '', '', '', '', '', '']
+        yield ['', '', '', '', '', '', '', '']
+        
+        # Coaches section (first 3 only) - combined names
+        yield ['', 'Coaches', '', '', '', '', '']
+        yield ['Name', 'Title', 'Dropline 1', '', 'Dropline 2', '', '']
+        for coach in roster_data.get('coaches', [])[:3]:  # Limit to first 3
+            full_name = coach.get('full_name', '') or f"{coach.get('first_name', '')} {coach.get('last_name', '')}".strip()
+            yield [
+                full_name,
+                coach.get('title', ''),
+                coach.get('dropline1', ''),
+                '',
+                coach.get('dropline2', ''),
+                '', ''
+            ]
+        
+        yield ['', '', '', '', '', '', '']
+        
+        # Players section - Name in column A, Number in column B
+        yield ['', 'PLAYERS', '', '', '', '', '']
+        
+        # Simple header - no empty column between Name and #
+        header = ['Name', '#', '', '', '', '', '']
+        yield header
+        
+        for player in roster_data.get('players', []):
+            full_name = player.get('full_name', '') or f"{player.get('first_name', '')} {player.get('last_name', '')}".strip()
+            row = [
+                full_name,
+                player.get('number', '') if export_options.get('number', True) else '',
+                '',
+                '',
+                '',
+                '',
+                ''
+            ]
+            yield row
+    
+    else:
+        # Basketball format (original)
+        yield ['Team Name', roster_data.get('team_name', ''), '', 'Location:', '', '', '', '', '']
+        yield ['Rank:', '', '', 'Logo:', '', '', '', '', '']
+        yield ['Color:', '', '', '', '', '', '', '', '']
+        yield ['', '', '', '', '', '', '', '', '']
+        
+        # Write coaches (first 3 only)
+        yield ['', 'Coaches', '', '', '', '', '', '', '']
+        yield ['Last Name', 'First Name', 'Title', 'Dropline 1', '', 'Dropline 2', '', '', '']
+        for coach in roster_data.get('coaches', [])[:3]:  # Limit to first 3
+            yield [
+                coach.get('last_name', ''),
+                coach.get('first_name', ''),
+                coach.get('title', ''),
+                coach.get('dropline1', ''),
+                '',
+                coach.get('dropline2', ''),
+                '', '', ''
+            ]
+        
+        yield ['', '', '', '', '', '', '', '', '']
+        
+        # Write players
+        yield ['', 'PLAYERS', '', '', '', '', '', '', '']
+        
+        header = []
+        if export_options.get('number', True):
+            header.append('#')
+        header.extend(['First Name', 'Last Name'])
+        if export_options.get('position', True):
+            header.append('Pos')
+        if export_options.get('year', True):
+            header.append('Year')
+        if export_options.get('height', True):
+            header.append('Ht')
+        if export_options.get('weight', True):
+            header.append('Wt')
+        if export_options.get('photo', True):
+            header.append('Photo')
+        
+        while len(header) < 9:
+            header.append('')
+        
+        yield header
+        
+        for player in roster_data.get('players', []):
+            row = []
+            if export_options.get('number', True):
+                row.append(player.get('number', ''))
+            row.extend([
+                player.get('first_name', ''),
+                player.get('last_name', '')
+            ])
+            if export_options.get('position', True):
+                row.append(player.get('position', ''))
+            if export_options.get('year', True):
+                row.append(player.get('year', ''))
+            if export_options.get('height', True):
+                row.append(player.get('height', ''))
+            if export_options.get('weight', True):
+                row.append(player.get('weight', ''))
+            if export_options.get('photo', True):
+                row.append(photo_value(player, export_options))
+            
+            while len(row) < 9:
+                row.append('')
+            
+            yield row
+
+def photo_value(person, export_options):
+    """The Photo column: the image URL, or the downloaded copy export_options['photo_source'] asks for"""
+    # 'local' and 'thumbnail' need photos.PhotoPipeline.localize to have run; until then the URL is kept
+    source = export_options.get('photo_source', 'url')
+    if source == 'thumbnail':
+        return person.get('thumbnail_local') or person.get('photo_local') or person.get('photo', '')
+    if source == 'local':
+        return person.get('photo_local') or person.get('photo', '')
+    return person.get('photo', '')
+
+def iter_csv_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Encode CSV rows as UTF-8 chunks, reusing one small buffer instead of building the whole file"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def iter_combined_rows(teams):
+    """Rows for several (roster_data, sport, export_options) teams in one CSV, a blank row apart"""
+    for index, (roster_data, sport, export_options) in enumerate(teams):
+        if index:
+            yield []
+        yield from iter_csv_rows(roster_data, sport, export_options)
+
+def roster_filename(roster_data, sport):
+    return f"{roster_data.get('team_name', 'roster')}_{sport.capitalize()}_roster.csv"
+
+def content_disposition(filename):
+    """Attachment header matching Flask's send_file: an ASCII fallback plus filename* for anything else"""
+    simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+    options = {'filename': simple}
+    if simple != filename:
+        options['filename*'] = f"UTF-8''{quote(filename, safe='!#$&+^`|~')}"
+    return dump_options_header('attachment', options)
+
+class _ChunkSink:
+    """Write-only, unseekable file that lets zipfile's output be drained as it is produced"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _member_name(filename, used):
+    # Team names come from scraped pages, so keep path separators out of member names
+    name = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', '_', filename).strip(' .') or 'roster.csv'
+    stem, dot, extension = name.rpartition('.')
+    candidate = name
+    suffix = 2
+    while candidate.lower() in used:
+        candidate = f'{stem} ({suffix}){dot}{extension}'
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+def _localize_for_zip(roster_data, export_options, written, photo_cache):
+    """Point a team's Photo column at photos/ in the archive, returning it and the files to add"""
+    # Files are only ever found by looking the photo URL up in the server's cache:
+    # photo_local / thumbnail_local in posted roster data are never read from disk
+    files = []
+    players = []
+    for player in roster_data.get('players', []):
+        player = {field: value for field, value in player.items() if field not in ('photo_local', 'thumbnail_local')}
+        asset = photo_cache.lookup(player['photo']) if photo_cache and player.get('photo') else None
+        if asset:
+            # Evicted or never-downloaded photos keep their URL
+            path = asset['thumbnail'] if export_options.get('photo_source') == 'thumbnail' else None
+            path = path or asset['path']
+            # Files are named by content hash, so a photo shared by several teams is added once
+            name = 'photos/' + os.path.basename(path)
+            if name not in written:
+                files.append((path, name))
+                written.add(name)
+            player['photo_local'] = player['thumbnail_local'] = name
+        players.append(player)
+    return dict(roster_data, players=players), files
+
+def iter_zip_chunks(teams, chunk_size=CHUNK_SIZE, photo_cache=None):
+    """Stream a ZIP with one CSV per (roster_data, sport, export_options) team.
+
+    Teams exported with a local photo_source also get their photo files under photos/,
+    referenced by relative path from the CSV. The files come from photo_cache (a
+    photos.PhotoCache), found by each player's photo URL.
+    """
+    # zipfile writes data descriptors after each member when the file can't
+    # seek, so the archive never has to be held in memory
+    sink = _ChunkSink()
+    used = set()
+    written = set()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for roster_data, sport, export_options in teams:
+            if export_options.get('photo_source') in ('local', 'thumbnail'):
+                roster_data, files = _localize_for_zip(roster_data, export_options, written, photo_cache)
+                for path, name in files:
+                    # Images are already compressed; deflating them again only costs CPU
+                    archive.write(path, name, compress_type=zipfile.ZIP_STORED)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            name = _member_name(roster_filename(roster_data, sport), used)
+            with archive.open(name, 'w') as member:
+                for chunk in iter_csv_chunks(iter_csv_rows(roster_data, sport, export_options), chunk_size):
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
+
+def record_formats():
+    """List the machine-readable record formats usable in this environment"""
+    return ['ndjson', 'arrow', 'parquet'] if pa is not None else ['ndjson']
+
+def iter_records(rosters):
+    """Flatten (roster_data, url) pairs into typed person records"""
+    for roster_data, url in rosters:
+        yield from flatten_roster(roster_data, url)
+
+def iter_ndjson_chunks(rosters, chunk_size=CHUNK_SIZE):
+    """Stream person records as newline-delimited JSON"""
+    lines = []
+    size = 0
+    for record in iter_records(rosters):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(lines).encode('utf-8')
+            lines = []
+            size = 0
+    if lines:
+        yield ''.join(lines).encode('utf-8')
+
+def arrow_schema():
+    """The person record schema as a pyarrow schema"""
+    types = {str: pa.string(), int: pa.int32()}
+    return pa.schema([pa.field(name, types[kind], nullable=kind is not str) for name, kind in RECORD_FIELDS])
+
+def _iter_batches(rosters, schema):
+    batch = []
+    for record in iter_records(rosters):
+        batch.append(record)
+        if len(batch) >= BATCH_ROWS:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+def _iter_columnar_chunks(rosters, columnar_format):
+    if pa is None:
+        raise RuntimeError('pyarrow is not installed')
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    target = pa.PythonFile(sink, mode='w')
+    if columnar_format == 'parquet':
+        writer = pq.ParquetWriter(target, schema)
+    else:
+        writer = pa.ipc.new_stream(target, schema)
+    
+    # Parquet's footer is written on close, so close before the last drain
+    try:
+        for batch in _iter_batches(rosters, schema):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+def iter_arrow_chunks(rosters):
+    """Stream person records in the Arrow IPC streaming format"""
+    return _iter_columnar_chunks(rosters, 'arrow')
+
+def iter_parquet_chunks(rosters):
+    """Stream person records as a Parquet file, one row group per BATCH_ROWS records"""
+    return _iter_columnar_chunks(rosters, 'parquet')
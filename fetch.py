@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Statuses worth another try: throttling and transient server trouble
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of up to `burst`"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self):
+        """Take a token, returning how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: each waiter reserves its own future slot
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+    
+    def acquire(self):
+        """Block until a request may be sent, returning the seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def pause(self, seconds):
+        """Hold every request to this host for `seconds`, e.g. after a 429 with Retry-After"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+class Fetcher:
+    """GETs with timeouts, a per-host rate limit and jittered exponential backoff"""
+    
+    # Sleeps are capped at max_backoff and attempts at 1 + max_retries, so the
+    # worst case for one URL stays bounded even when a site keeps answering 503
+    def __init__(self, headers=None, pool_size=8, connect_timeout=5.0, read_timeout=20.0, rate=2.0, burst=4,
+                 max_retries=3, backoff=0.5, max_backoff=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate = rate  # Requests per second per host; 0 disables the limiter
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff  # First retry waits up to this long, doubling each time
+        self.max_backoff = max_backoff
+        
+        # One pooled session for every fetch so keep-alive connections get reused
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+    
+    def _bucket(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+        return bucket
+    
+    def _backoff_delay(self, attempt):
+        # Full jitter keeps retries from many workers from arriving in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+    
+    def _sleep(self, seconds, reason):
+        metrics.FETCH_RETRIES.inc(1, reason)
+        with metrics.stage('backoff'):
+            time.sleep(seconds)
+    
+    def get(self, url, headers=None, stream=False):
+        """GET a URL, retrying 429/5xx and connection failures; the final response is returned as is"""
+        bucket = self._bucket(url) if self.rate > 0 else None
+        attempt = 0
+        while True:
+            if bucket:
+                waited = bucket.acquire()
+                if waited > 0:
+                    metrics.THROTTLE_WAITS.inc(1)
+                    metrics.THROTTLE_SECONDS.inc(waited)
+            
+            try:
+                response = self.session.get(url, headers=headers, stream=stream, timeout=self.timeout)
+            except requests.ConnectionError:
+                # Includes connect timeouts. Read timeouts are not retried: the site is
+                # up but slow, and another try would only stretch the tail further
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep(self._backoff_delay(attempt), 'connection')
+                attempt += 1
+                continue
+            
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            
+            reason = '429' if response.status_code == 429 else '5xx'
+            delay = retry_after_seconds(response.headers.get('Retry-After'))
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            else:
+                # Honor the server's wait (plus a little jitter), up to max_backoff
+                delay = min(delay, self.max_backoff) + random.uniform(0, self.backoff)
+                if bucket and response.status_code == 429:
+                    bucket.pause(delay)
+                    delay = 0.0  # The bucket now holds this and every other request to the host
+            response.close()
+            self._sleep(delay, reason)
+            attempt += 1
@@ -0,0 +1,141 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states, in the order a job moves through them
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+class JobQueue:
+    """Runs scrapes on a local worker pool, keeping job state in SQLite"""
+    
+    # State lives in SQLite so any gunicorn worker can answer GET /jobs/<id>,
+    # whichever worker's pool is running the job. The file must be on a disk
+    # that outlives the workers; jobs are only checked for a dead worker process
+    # on the host that ran them, since PIDs mean nothing elsewhere.
+    def __init__(self, handler, db_path, max_workers=4, retention=24 * 3600):
+        self.handler = handler  # Callable taking the job's request data, returning a result dict
+        self.db_path = db_path
+        self.retention = retention
+        self.host = socket.gethostname()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='roster-job')
+        self._finished = threading.Condition()
+        
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    worker_host TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            columns = {row[1] for row in db.execute('PRAGMA table_info(jobs)')}
+            if 'worker_host' not in columns:
+                # Job files written before the host was recorded
+                db.execute('ALTER TABLE jobs ADD COLUMN worker_host TEXT')
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def submit(self, request_data):
+        """Queue a scrape and return its job id immediately"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                'INSERT INTO jobs (id, status, request, worker_pid, worker_host, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, QUEUED, json.dumps(request_data), os.getpid(), self.host, time.time())
+            )
+            # Old finished jobs are pruned as new ones arrive
+            db.execute(
+                'DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?',
+                (DONE, FAILED, time.time() - self.retention)
+            )
+        self.executor.submit(self._run, job_id, request_data)
+        return job_id
+    
+    def _run(self, job_id, request_data):
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        try:
+            result = self.handler(request_data)
+            self._update(job_id, status=DONE, result=json.dumps(result), finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        
+        with self._finished:
+            self._finished.notify_all()
+    
+    def _update(self, job_id, **fields):
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as db:
+            db.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+    
+    def get(self, job_id):
+        """Return a job's status (and result once finished), or None if unknown"""
+        with self._connect() as db:
+            row = db.execute(
+                'SELECT id, status, result, error, worker_pid, created_at, started_at, finished_at, worker_host '
+                'FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        job = {
+            'job_id': row[0],
+            'status': row[1],
+            'created_at': row[5],
+            'started_at': row[6],
+            'finished_at': row[7]
+        }
+        
+        # A job whose worker process died will never finish, so report it as failed
+        local = row[8] in (None, self.host)
+        if job['status'] not in FINISHED and local and not _pid_alive(row[4]):
+            self._update(job_id, status=FAILED, error='Worker exited before the job finished',
+                         finished_at=time.time())
+            return self.get(job_id)
+        
+        if job['status'] == DONE:
+            job['result'] = json.loads(row[2])
+        elif job['status'] == FAILED:
+            job['error'] = row[3]
+        return job
+    
+    def wait(self, job_id, timeout):
+        """Long-poll: return the job once it finishes or after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in FINISHED or remaining <= 0:
+                return job
+            # Jobs run by this process wake us directly; others are seen on the next poll
+            with self._finished:
+                self._finished.wait(min(remaining, 0.5))
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
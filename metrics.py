@@ -0,0 +1,177 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from a cached parse up to a slow athletics site
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Histogram:
+    """Prometheus-style cumulative histogram with a fixed set of label names"""
+    
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._series[label_values] = series
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {values[-1]}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {values[-2]}')
+            lines.append(f'{self.name}_count{labels} {values[-1]}')
+        return lines
+
+class Counter:
+    """Prometheus-style monotonically increasing counter"""
+    
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, value in series:
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value}')
+        return lines
+
+STAGE_SECONDS = Histogram(
+    'roster_stage_seconds', 'Time spent in each scrape stage', labels=('stage',)
+)
+REQUEST_SECONDS = Histogram(
+    'roster_request_seconds', 'Flask request latency by endpoint', labels=('endpoint',)
+)
+CARDS = Counter(
+    'roster_cards_total', 'Person cards and table rows scanned vs accepted', labels=('result',)
+)
+RESULT_CACHE = Counter(
+    'roster_result_cache_total', 'Parsed-result cache lookups', labels=('result',)
+)
+
+FETCH_RETRIES = Counter(
+    'roster_fetch_retries_total', 'Page fetches retried, by cause (429, 5xx, connection)', labels=('reason',)
+)
+THROTTLE_WAITS = Counter(
+    'roster_throttle_waits_total', 'Fetches delayed by the per-host rate limiter'
+)
+THROTTLE_SECONDS = Counter(
+    'roster_throttle_wait_seconds_total', 'Time fetches spent waiting on the per-host rate limiter'
+)
+SITE_PROFILES = Counter(
+    'roster_site_profiles_total', 'Sidearm scrapes by site-profile outcome (hit, miss, learned)', labels=('result',)
+)
+RENDER_BLOCKED = Counter(
+    'roster_render_blocked_total', 'Requests from rendered pages that were aborted, by kind (image, font, media, ad)',
+    labels=('kind',)
+)
+PHOTOS = Counter(
+    'roster_photos_total', 'Headshots by outcome (downloaded, duplicate, cached, failed)', labels=('result',)
+)
+
+METRICS = [
+    STAGE_SECONDS, REQUEST_SECONDS, CARDS, RESULT_CACHE, FETCH_RETRIES, THROTTLE_WAITS, THROTTLE_SECONDS,
+    SITE_PROFILES, RENDER_BLOCKED, PHOTOS
+]
+
+# Timings for the request being handled on this thread, or None outside a request
+_request_timings = contextvars.ContextVar('roster_request_timings', default=None)
+
+def render():
+    """Render every metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def start_request():
+    """Begin collecting per-stage timings for the current request"""
+    timings = {}
+    return timings, _request_timings.set(timings)
+
+def end_request(token):
+    _request_timings.reset(token)
+
+@contextmanager
+def stage(name):
+    """Time a block as one scrape stage, both globally and for the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+def count_cards(scanned, accepted):
+    """Record how many cards/rows a parser looked at and how many became people"""
+    CARDS.inc(scanned, 'scanned')
+    CARDS.inc(accepted, 'accepted')
+    timings = _request_timings.get()
+    if timings is not None:
+        timings['cards_scanned'] = timings.get('cards_scanned', 0) + scanned
+        timings['cards_accepted'] = timings.get('cards_accepted', 0) + accepted
+
+def record_timings(timings):
+    """Record stage timings and card counts collected in another process (a parse worker)"""
+    if 'cards_scanned' in timings:
+        count_cards(timings['cards_scanned'], timings.get('cards_accepted', 0))
+    request_timings = _request_timings.get()
+    for name, elapsed in timings.items():
+        if name.startswith('cards_'):
+            continue
+        STAGE_SECONDS.observe(elapsed, name)
+        if request_timings is not None:
+            request_timings[name] = request_timings.get(name, 0.0) + elapsed
+
+def format_timing_header(timings, total):
+    """Render a request's timings as an X-Timing header value (milliseconds)"""
+    parts = []
+    for name, value in timings.items():
+        if name.startswith('cards_'):
+            parts.append(f'{name}={value}')
+        else:
+            parts.append(f'{name}={value * 1000:.1f}ms')
+    parts.append(f'total={total * 1000:.1f}ms')
+    return ', '.join(parts)
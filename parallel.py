@@ -0,0 +1,78 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+
+# The scraper each worker process builds once and reuses for every document
+_worker_scraper = None
+
+# A small page that walks the Sidearm, Presto and generic code paths to warm a worker up
+_WARMUP_HTML = (
+    '<html><head><title>Warmup Roster</title></head><body>'
+    '<div class="sidearm-roster-player"><h3>Warm Up</h3><span class="number">1</span></div>'
+    '<table class="roster"><tr><th>#</th><th>Name</th><th>Pos</th></tr>'
+    '<tr><td>1</td><td>Warm Up</td><td>G</td></tr></table>'
+    '</body></html>'
+)
+
+def _init_worker(parser, site_profiles_db):
+    global _worker_scraper
+    # Import inside the worker so a spawned process pays for bs4/lxml only once
+    from scraper import RosterScraper
+    from profiles import SiteProfileStore
+    site_profiles = SiteProfileStore(site_profiles_db) if site_profiles_db else None
+    _worker_scraper = RosterScraper(parser=parser, site_profiles=site_profiles)
+    for platform in ('sidearm', 'presto', 'generic'):
+        _worker_scraper.scrape_from_html(_WARMUP_HTML, '', platform)
+
+def _parse_in_worker(html_content, url, platform):
+    # Nothing scrapes a worker's own metrics, so its stage timings and card counts
+    # go back with the result for the parent to record
+    timings, token = metrics.start_request()
+    try:
+        roster_data = _worker_scraper.scrape_from_html(html_content, url, platform)
+    finally:
+        metrics.end_request(token)
+    return roster_data, timings
+
+class ParsePool:
+    """Parses HTML documents in worker processes so extraction can use every core"""
+    
+    # Workers are spawned rather than forked: the app runs threads (gthread
+    # workers, the job queue, batch fetches) and forking a threaded process
+    # can deadlock on locks held at fork time
+    def __init__(self, processes=None, parser='auto', site_profiles_db=None):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(parser, site_profiles_db)
+        )
+    
+    def submit(self, html_content, url='', platform=None):
+        """Queue a document for parsing, returning a future of (roster_data, worker timings)
+
+        Pass the timings to metrics.record_timings() once the result is in;
+        parse() and map() do.
+        """
+        return self.executor.submit(_parse_in_worker, html_content, url, platform)
+    
+    def parse(self, html_content, url='', platform=None):
+        """Parse a document in a worker process and wait for its roster_data"""
+        roster_data, timings = self.submit(html_content, url, platform).result()
+        metrics.record_timings(timings)
+        return roster_data
+    
+    def map(self, documents):
+        """Parse (html_content, url) pairs across all workers, preserving order"""
+        futures = [self.submit(html_content, url) for html_content, url in documents]
+        results = []
+        for future in futures:
+            roster_data, timings = future.result()
+            metrics.record_timings(timings)
+            results.append(roster_data)
+        return results
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
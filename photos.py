@@ -0,0 +1,256 @@
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import metrics
+from cache import _remove, _touch
+from fetch import Fetcher
+
+# Optional thumbnails - originals are cached and exported without it
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Headshots are a few hundred KB at most; anything bigger isn't one
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+
+THUMBNAIL_SIZE = 256
+
+def _sniff_extension(data, content_type):
+    """Extension for an image's bytes, or None when it isn't one (e.g. an error page sent as image/jpeg)"""
+    if data.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return '.gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp'
+    if data[4:12] in (b'ftypavif', b'ftypavis'):
+        return '.avif'
+    if content_type == 'image/svg+xml' and b'<svg' in data[:4096].lower():
+        return '.svg'
+    return None
+
+def _write_bytes_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+class PhotoCache:
+    """Content-addressed store of downloaded headshots and their thumbnails"""
+    
+    # Images live at originals/<sha256[:2]>/<sha256><ext>, so one picture reached
+    # through several URLs (the shared silhouette, CDN resizes of the same file) is
+    # stored once. A SQLite index maps URLs to hashes for every gunicorn worker, and
+    # least recently used files are evicted past max_bytes.
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, ttl=30 * 24 * 3600, thumbnail_size=THUMBNAIL_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl  # URLs are downloaded again after this long, in case the headshot changed
+        self.thumbnail_size = thumbnail_size  # Longest side in pixels
+        self._lock = threading.Lock()
+        for subdirectory in ('originals', 'thumbnails'):
+            os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+        
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS photos (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            ''')
+    
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'), timeout=30)
+    
+    def _original_path(self, sha256, extension):
+        return os.path.join(self.directory, 'originals', sha256[:2], sha256 + extension)
+    
+    def _thumbnail_path(self, sha256, extension):
+        return os.path.join(self.directory, 'thumbnails', sha256[:2], f'{sha256}_{self.thumbnail_size}{extension}')
+    
+    def lookup(self, url):
+        """The cached asset for a URL, or None if it was never fetched, has expired or was evicted"""
+        with self._connect() as db:
+            row = db.execute('SELECT sha256, extension, fetched_at FROM photos WHERE url = ?', (url,)).fetchone()
+        if row is None or time.time() - row[2] > self.ttl:
+            return None
+        sha256, extension, _ = row
+        path = self._original_path(sha256, extension)
+        if not os.path.exists(path):
+            return None
+        # Bump mtime so eviction treats this image as recently used
+        _touch(path)
+        return self._asset(sha256, path)
+    
+    def store(self, url, data, extension):
+        """Add downloaded bytes under their hash, returning (asset, already_stored)"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._original_path(sha256, extension)
+        already_stored = os.path.exists(path)
+        if already_stored:
+            _touch(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_bytes_atomic(path, data)
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO photos (url, sha256, extension, fetched_at) VALUES (?, ?, ?, ?)',
+                (url, sha256, extension, time.time())
+            )
+        return self._asset(sha256, path), already_stored
+    
+    def _asset(self, sha256, path):
+        return {
+            'sha256': sha256,
+            'path': path,
+            'thumbnail': self._thumbnail(sha256, path),
+            'bytes': os.path.getsize(path)
+        }
+    
+    def _thumbnail(self, sha256, source):
+        """Path of the image's thumbnail, made on first use; None without Pillow or for unreadable images"""
+        if Image is None:
+            return None
+        for extension in ('.jpg', '.png'):
+            path = self._thumbnail_path(sha256, extension)
+            if os.path.exists(path):
+                _touch(path)
+                return path
+        try:
+            with Image.open(source) as image:
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                # Cut-out headshots keep their transparency; everything else becomes a JPEG
+                if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+                    image, extension, options = image.convert('RGBA'), '.png', {'format': 'PNG', 'optimize': True}
+                else:
+                    image, extension, options = image.convert('RGB'), '.jpg', {'format': 'JPEG', 'quality': 85}
+                buffer = io.BytesIO()
+                image.save(buffer, **options)
+            path = self._thumbnail_path(sha256, extension)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_bytes_atomic(path, buffer.getvalue())
+            return path
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # SVGs, truncated downloads and the like still have their original
+            return None
+    
+    def evict(self):
+        """Trim the cache to max_bytes, dropping least recently used images together with their thumbnails"""
+        with self._lock:
+            # sha256 -> [last used, bytes, paths]
+            images = {}
+            for subdirectory in ('originals', 'thumbnails'):
+                for root, _, names in os.walk(os.path.join(self.directory, subdirectory)):
+                    for name in names:
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        entry = images.setdefault(name[:64], [0.0, 0, []])
+                        entry[0] = max(entry[0], stat.st_mtime)
+                        entry[1] += stat.st_size
+                        entry[2].append(path)
+            
+            # URLs whose image is evicted are simply downloaded again on their next lookup
+            total = sum(size for _, size, _ in images.values())
+            for _, size, paths in sorted(images.values()):
+                if total <= self.max_bytes:
+                    break
+                _remove(*paths)
+                total -= size
+
+class PhotoPipeline:
+    """Downloads roster headshots concurrently into a PhotoCache"""
+    
+    # Photos usually come from one image CDN per site, so the fetcher's per-host
+    # rate limit can be far looser than the one for roster pages
+    def __init__(self, cache, fetcher=None, max_workers=8):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.fetcher = fetcher or Fetcher(pool_size=max_workers, rate=10.0, burst=10)
+    
+    def fetch(self, urls):
+        """Cache every photo URL (each downloaded at most once), returning {url: asset or None}"""
+        unique = [url for url in dict.fromkeys(urls) if url and url.startswith(('http://', 'https://'))]
+        assets = {}
+        missing = []
+        for url in unique:
+            asset = self.cache.lookup(url)
+            if asset is None:
+                missing.append(url)
+            else:
+                metrics.PHOTOS.inc(1, 'cached')
+                assets[url] = asset
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                assets.update(zip(missing, executor.map(self._download, missing)))
+            self.cache.evict()
+        return assets
+    
+    def _download(self, url):
+        try:
+            response = self.fetcher.get(url, stream=True)
+            try:
+                response.raise_for_status()
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data.extend(chunk)
+                    if len(data) > MAX_PHOTO_BYTES:
+                        raise ValueError('Photo too large')
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            finally:
+                response.close()
+        except (requests.RequestException, ValueError):
+            metrics.PHOTOS.inc(1, 'failed')
+            return None
+        
+        data = bytes(data)
+        extension = _sniff_extension(data, content_type)
+        if extension is None:
+            metrics.PHOTOS.inc(1, 'failed')
+            return None
+        asset, already_stored = self.cache.store(url, data, extension)
+        metrics.PHOTOS.inc(1, 'duplicate' if already_stored else 'downloaded')
+        return asset
+    
+    def localize(self, rosters):
+        """Download the photos of every roster_data at once and add photo_local / thumbnail_local names.
+
+        The names are where a ZIP export puts the files (photos/<sha256><ext>), not
+        paths on this server. Returns how many people got a local photo.
+        """
+        people = [
+            person for roster_data in rosters
+            for person in roster_data.get('players', []) + roster_data.get('coaches', [])
+            if person.get('photo')
+        ]
+        assets = self.fetch(person['photo'] for person in people)
+        localized = 0
+        for person in people:
+            asset = assets.get(person['photo'])
+            if asset:
+                person['photo_local'] = 'photos/' + os.path.basename(asset['path'])
+                if asset['thumbnail']:
+                    person['thumbnail_local'] = 'photos/' + os.path.basename(asset['thumbnail'])
+                localized += 1
+        return localized
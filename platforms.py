@@ -0,0 +1,99 @@
+import re
+from urllib.parse import urlparse
+
+# Only the head and top of the body are looked at: generator tags, stylesheet
+# and script hosts all appear well before the roster itself
+PREFIX_CHARS = 64 * 1024
+
+META_GENERATOR = re.compile(
+    r'''<meta\s[^>]*name\s*=\s*["']?generator["']?[^>]*content\s*=\s*["']([^"']*)''', re.I
+)
+META_GENERATOR_REVERSED = re.compile(
+    r'''<meta\s[^>]*content\s*=\s*["']([^"']*)["'][^>]*name\s*=\s*["']?generator''', re.I
+)
+
+class Platform:
+    """A site platform's signature and the parser that handles its pages"""
+    
+    # All signature strings are matched lowercase
+    def __init__(self, name, parser, generators=(), asset_hosts=(), url_hosts=(), markers=(), fast_path=None):
+        self.name = name
+        self.parser = parser  # 'sidearm', 'presto' or 'generic'
+        self.generators = generators  # Substrings of <meta name="generator"> content
+        self.asset_hosts = asset_hosts  # Hosts its CSS/JS/images are served from
+        self.url_hosts = url_hosts  # Hosts (or host suffixes) of its sites
+        self.markers = markers  # Class names or other text unique to its markup
+        self.fast_path = fast_path  # Extraction to try before building a soup, if any
+    
+    def __repr__(self):
+        return f'Platform({self.name!r}, parser={self.parser!r})'
+
+GENERIC = Platform('generic', 'generic')
+
+# Checked in order within each kind of signal, so list the more specific
+# variant of a vendor first
+PLATFORMS = [
+    Platform(
+        'sidearm-nextgen', 'sidearm',
+        generators=('sidearm',),
+        asset_hosts=('sidearm.nextgen.sites', 'images.sidearmdev.com'),
+        markers=('s-person-card', 's-stamp', 'sidearm-nextgen'),
+        fast_path='embedded'
+    ),
+    Platform(
+        'sidearm', 'sidearm',
+        asset_hosts=('sidearmsports.com', 'sidearmstats.com', 'sidearmdev.com'),
+        url_hosts=('sidearmsports.com',),
+        markers=('sidearm-roster', 'sidearmdev', 'sidearm'),
+        fast_path='embedded'
+    ),
+    Platform(
+        'presto', 'presto',
+        generators=('presto',),
+        asset_hosts=('prestosports.com', 'presto-sports', 'prestosports-downloads'),
+        url_hosts=('prestosports.com',),
+        markers=('prestosports',)
+    ),
+    # WMT Digital sites have no dedicated parser yet; their roster tables suit the generic one
+    Platform(
+        'wmt', 'generic',
+        generators=('wmt',),
+        asset_hosts=('wmt.digital', 'wmt.games', 'wmtdigital.com', 'wmt-digital'),
+        url_hosts=('wmt.digital',),
+        markers=('wmt-roster', 'wmt-digital')
+    ),
+]
+
+def register(platform, first=False):
+    """Add a platform signature; first=True lets it win over the built-in ones"""
+    if first:
+        PLATFORMS.insert(0, platform)
+    else:
+        PLATFORMS.append(platform)
+
+def for_parser(parser):
+    """The first registered platform handled by a parser, for callers that name only the parser"""
+    return next((platform for platform in PLATFORMS if platform.parser == parser), GENERIC)
+
+def _generator(prefix):
+    match = META_GENERATOR.search(prefix) or META_GENERATOR_REVERSED.search(prefix)
+    return match.group(1) if match else ''
+
+def detect(html_content, url=''):
+    """Identify a page's platform from the first PREFIX_CHARS of its HTML and its URL"""
+    prefix = html_content[:PREFIX_CHARS].lower()
+    generator = _generator(prefix)
+    host = (urlparse(url).hostname or '').lower() if url else ''
+    
+    # Strongest signal first: a generator tag outranks a stray asset link or class name
+    checks = [
+        lambda platform: any(name in generator for name in platform.generators),
+        lambda platform: any(asset_host in prefix for asset_host in platform.asset_hosts),
+        lambda platform: any(host == suffix or host.endswith('.' + suffix) for suffix in platform.url_hosts),
+        lambda platform: any(marker in prefix for marker in platform.markers),
+    ]
+    for check in checks:
+        for platform in PLATFORMS:
+            if check(platform):
+                return platform
+    return GENERIC
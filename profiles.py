@@ -0,0 +1,99 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+# Fields whose winning strategy is remembered per roster page
+PROFILE_FIELDS = ('container', 'name', 'number', 'position', 'photo')
+
+# A profile is trusted while it finds at least this share of the people it found when learned
+MIN_PEOPLE_RATIO = 0.5
+
+def page_key(url):
+    """What a profile is remembered under: the host plus the roster page's path
+
+    Pages on one host can lay their cards out differently (one sport's roster
+    puts coaches in another card type than the next), so a profile learned on
+    one roster is never applied to another.
+    """
+    parts = urlparse(url)
+    return parts.netloc.lower() + (parts.path.rstrip('/').lower() or '/')
+
+class SiteProfileStore:
+    """Remembers, per roster page, which selector strategies found a Sidearm site's people"""
+    
+    # Profiles are kept in SQLite so every gunicorn worker benefits from what
+    # one of them learned, with a per-process copy in front of it
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._memory = {}
+        self._lock = threading.Lock()
+        
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS page_profiles (
+                    page TEXT PRIMARY KEY,
+                    profile TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def get(self, page):
+        """The stored profile for a page_key(), or None"""
+        with self._lock:
+            if page in self._memory:
+                return self._memory[page]
+        with self._connect() as db:
+            row = db.execute('SELECT profile FROM page_profiles WHERE page = ?', (page,)).fetchone()
+        if row is None:
+            # Not remembered, so a profile another worker learns later is still picked up
+            return None
+        profile = json.loads(row[0])
+        with self._lock:
+            self._memory[page] = profile
+        return profile
+    
+    def put(self, page, profile):
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO page_profiles (page, profile, updated_at) VALUES (?, ?, ?)',
+                (page, json.dumps(profile), time.time())
+            )
+        with self._lock:
+            self._memory[page] = profile
+    
+    def forget(self, page):
+        """Drop a page's profile, e.g. after it stopped validating"""
+        with self._connect() as db:
+            db.execute('DELETE FROM page_profiles WHERE page = ?', (page,))
+        with self._lock:
+            self._memory.pop(page, None)
+
+def new_wins():
+    """Per-field tallies of the strategies that produced accepted people during a full scrape"""
+    return {field: Counter() for field in PROFILE_FIELDS}
+
+def learn_profile(wins, people, version):
+    """Turn a full scrape's tallies into a profile, or None if the page can't be profiled"""
+    containers = wins['container']
+    # Only a single container selector that covered everybody can replace the cascade
+    if people == 0 or len(containers) != 1:
+        return None
+    profile = {'version': version, 'people': people}
+    for field in PROFILE_FIELDS:
+        if wins[field]:
+            strategy = wins[field].most_common(1)[0][0]
+            profile[field] = list(strategy) if isinstance(strategy, tuple) else strategy
+        else:
+            profile[field] = None
+    return profile
+
+def profile_holds(profile, players, coaches):
+    """Whether a profile-directed scrape found enough people to be trusted"""
+    return players > 0 and players + coaches >= profile['people'] * MIN_PEOPLE_RATIO
@@ -0,0 +1,192 @@
+import re
+import sys
+
+# Flattened, typed view of roster_data for analytics: one record per person.
+# (field, type) in column order; every field is a string unless typed otherwise.
+RECORD_FIELDS = [
+    ('team', str),
+    ('platform', str),
+    ('source_url', str),
+    ('role', str),  # 'player' or 'coach'
+    ('number', str),  # Kept as text: "00" and "0" are different jerseys
+    ('first_name', str),
+    ('last_name', str),
+    ('full_name', str),
+    ('position', str),
+    ('year', str),
+    ('hometown', str),
+    ('height', str),  # As shown on the site
+    ('height_inches', int),
+    ('weight', int),  # Pounds
+    ('title', str),
+    ('photo', str),
+]
+FIELD_NAMES = [name for name, _ in RECORD_FIELDS]
+
+FEET_INCHES = re.compile(r"(\d)\s*(?:'|’|-|ft\.?)\s*(\d{1,2})")
+BARE_INCHES = re.compile(r'^(\d{2})\s*(?:"|in\.?)?$')
+POUNDS = re.compile(r'(\d{2,3})')
+
+def parse_height_inches(height):
+    """Turn a displayed height like 6-5, 6' 5" or 77 into inches, or None"""
+    if not height:
+        return None
+    match = FEET_INCHES.search(height)
+    if match:
+        feet, inches = int(match.group(1)), int(match.group(2))
+        return feet * 12 + inches if inches < 12 else None
+    match = BARE_INCHES.match(height.strip())
+    # A bare number is only a height if it is plausibly one in inches
+    if match and 48 <= int(match.group(1)) <= 96:
+        return int(match.group(1))
+    return None
+
+def parse_weight(weight):
+    """Turn a displayed weight like 185 or 185 lbs into pounds, or None"""
+    if not weight:
+        return None
+    match = POUNDS.search(str(weight))
+    return int(match.group(1)) if match else None
+
+def _full_name(person):
+    return person.get('full_name', '') or f"{person.get('first_name', '')} {person.get('last_name', '')}".strip()
+
+def flatten_roster(roster_data, url=''):
+    """Yield one typed record (dict of RECORD_FIELDS) per player and coach in roster_data"""
+    team = roster_data.get('team_name', '')
+    platform = roster_data.get('platform', '')
+    for role, people in (('player', roster_data.get('players', [])), ('coach', roster_data.get('coaches', []))):
+        for person in people:
+            height = person.get('height', '') or ''
+            yield {
+                'team': team,
+                'platform': platform,
+                'source_url': url,
+                'role': role,
+                'number': person.get('number', '') or '',
+                'first_name': person.get('first_name', '') or '',
+                'last_name': person.get('last_name', '') or '',
+                'full_name': _full_name(person),
+                'position': person.get('position', '') or '',
+                'year': person.get('year', '') or '',
+                'hometown': person.get('hometown', '') or '',
+                'height': height,
+                'height_inches': parse_height_inches(height),
+                'weight': parse_weight(person.get('weight')),
+                'title': person.get('title', '') or '',
+                'photo': person.get('photo', '') or '',
+            }
+
+class _Record:
+    """Base for slotted person records; a field left as None is absent from to_dict()"""
+    
+    __slots__ = ()
+    
+    def get(self, name, default=None):
+        # Lets a record stand in wherever the old person dicts were read
+        value = getattr(self, name, None)
+        return default if value is None else value
+    
+    def to_dict(self):
+        """The person in the JSON shape /scrape has always returned"""
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+    
+    # Short values repeated across a roster (G, Fr, 6-5, HEAD COACH) share one string
+    _interned = ()
+    
+    @classmethod
+    def from_dict(cls, person):
+        record = cls()
+        for name in cls.__slots__:
+            if name in person:
+                value = person[name]
+                if name in cls._interned and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(record, name, value)
+        return record
+    
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+    
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+class Player(_Record):
+    """One athlete. full_name, height, weight, year and hometown are only set by parsers that read them"""
+    
+    __slots__ = ('number', 'first_name', 'last_name', 'full_name', 'position', 'photo', 'height', 'weight', 'year',
+                 'hometown')
+    _interned = ('number', 'position', 'height', 'weight', 'year')
+    
+    def __init__(self, number='', first_name='', last_name='', full_name=None, position='', photo='',
+                 height=None, weight=None, year=None, hometown=None):
+        self.number = number
+        self.first_name = first_name
+        self.last_name = last_name
+        self.full_name = full_name
+        self.position = position
+        self.photo = photo
+        self.height = height
+        self.weight = weight
+        self.year = year
+        self.hometown = hometown
+    
+    @property
+    def height_inches(self):
+        return parse_height_inches(self.height)
+    
+    @property
+    def weight_lbs(self):
+        return parse_weight(self.weight)
+
+class Coach(_Record):
+    """One coach; only the first three per roster are kept by the parsers"""
+    
+    __slots__ = ('first_name', 'last_name', 'full_name', 'title', 'photo', 'dropline1', 'dropline2')
+    _interned = ('title', 'dropline1', 'dropline2')
+    
+    def __init__(self, first_name='', last_name='', full_name=None, title='', photo=None,
+                 dropline1='', dropline2=''):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.full_name = full_name
+        self.title = title
+        self.photo = photo
+        self.dropline1 = dropline1
+        self.dropline2 = dropline2
+
+class Roster:
+    """A parsed team page: team name, platform and its Player/Coach records"""
+    
+    __slots__ = ('team_name', 'coaches', 'players', 'platform')
+    
+    def __init__(self, platform, team_name='', coaches=None, players=None):
+        self.team_name = team_name
+        self.coaches = coaches if coaches is not None else []
+        self.players = players if players is not None else []
+        self.platform = platform
+    
+    def to_dict(self):
+        """The roster_data dict /scrape, the cache and the exporters work with"""
+        return {
+            'team_name': self.team_name,
+            'coaches': [coach.to_dict() for coach in self.coaches],
+            'players': [player.to_dict() for player in self.players],
+            'platform': self.platform
+        }
+    
+    @classmethod
+    def from_dict(cls, roster_data):
+        return cls(
+            roster_data.get('platform', ''),
+            team_name=roster_data.get('team_name', ''),
+            coaches=[Coach.from_dict(coach) for coach in roster_data.get('coaches', [])],
+            players=[Player.from_dict(player) for player in roster_data.get('players', [])]
+        )
+    
+    def __eq__(self, other):
+        return isinstance(other, Roster) and self.to_dict() == other.to_dict()
+    
+    def __repr__(self):
+        return (f'Roster(team_name={self.team_name!r}, platform={self.platform!r}, '
+                f'players={len(self.players)}, coaches={len(self.coaches)})')
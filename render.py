@@ -0,0 +1,179 @@
+import asyncio
+import concurrent.futures
+import threading
+from urllib.parse import urlparse
+
+import metrics
+
+try:
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+except ImportError:
+    async_playwright = None
+
+# Resource types a roster never needs; skipping them is most of a render's time and bandwidth
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# Ad, analytics and tag-manager hosts athletics sites load, matched as host suffixes
+BLOCKED_HOSTS = (
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'googletagmanager.com',
+    'googletagservices.com', 'google-analytics.com', 'amazon-adsystem.com', 'adnxs.com', 'facebook.net',
+    'scorecardresearch.com', 'taboola.com', 'outbrain.com', 'quantserve.com', 'moatads.com', 'criteo.com',
+    'pubmatic.com', 'rubiconproject.com', 'hotjar.com'
+)
+
+# Elements that only appear once the roster itself is on the page: PERSON_CARD_CLASS's
+# cards, the cascade's data attributes, or a roster table. Not any <table>: a layout or
+# schedule table is often there before the JavaScript adds the cards. A page with none
+# of these is handed over after wait_timeout for the generic table parser to try.
+ROSTER_SELECTOR = ', '.join([
+    '[class*="roster-player"]', '[class*="roster_player"]', '[class*="athlete-card"]', '[class*="player-card"]',
+    '[class*="roster-card"]', '[class*="person-card"]', '[data-player]', '[data-athlete]', 'table[class*="roster"]'
+])
+
+def available():
+    """Whether headless rendering can be used (the optional playwright package is installed)"""
+    return async_playwright is not None
+
+def _blocked_host(url):
+    host = (urlparse(url).hostname or '').lower()
+    return any(host == suffix or host.endswith('.' + suffix) for suffix in BLOCKED_HOSTS)
+
+def blocked_kind(resource_type, url):
+    """Why a request made while rendering is aborted ('image', 'font', 'media' or 'ad'), or None to let it through"""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return resource_type
+    if _blocked_host(url):
+        return 'ad'
+    return None
+
+class RendererPool:
+    """Renders JavaScript-built roster pages in a headless Chromium shared by the worker"""
+    
+    # Playwright objects belong to the event loop that created them, so the browser
+    # lives on one background thread and request threads hand it URLs. The browser
+    # starts on the first render, not at import, so each gunicorn worker gets its own.
+    def __init__(self, pages=4, timeout=30.0, wait_timeout=10.0, user_agent=None):
+        if async_playwright is None:
+            raise RuntimeError('Rendering needs playwright: pip install playwright && playwright install chromium')
+        self.pages = pages  # Pages open at once; also the number of reusable browser contexts
+        self.timeout = timeout  # Longest one render may take, in seconds
+        self.wait_timeout = wait_timeout  # How long to wait for roster cards once the page has loaded
+        self.user_agent = user_agent
+        
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+        self._start_lock = threading.Lock()
+        self._restart_lock = None
+    
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='roster-renderer', daemon=True)
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._start(), loop).result(self.timeout)
+            except BaseException:
+                loop.call_soon_threadsafe(loop.stop)
+                raise
+            self._loop = loop
+            self._thread = thread
+    
+    async def _start(self):
+        self._restart_lock = self._restart_lock or asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=True)
+        except Exception:
+            # e.g. the browser was never downloaded; don't leave the driver process behind
+            await self._playwright.stop()
+            raise
+        # Contexts are reused across renders; taking one from the queue is the page limit
+        self._contexts = asyncio.Queue()
+        for _ in range(self.pages):
+            context = await self._browser.new_context(user_agent=self.user_agent, service_workers='block')
+            await context.route('**/*', self._route)
+            self._contexts.put_nowait(context)
+    
+    async def _route(self, route):
+        kind = blocked_kind(route.request.resource_type, route.request.url)
+        if kind:
+            metrics.RENDER_BLOCKED.inc(1, kind)
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _restart_if_crashed(self):
+        """Start a new browser when the old one has died, instead of failing every later render"""
+        async with self._restart_lock:
+            if self._browser.is_connected():
+                return
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            await self._start()
+    
+    async def _render(self, url):
+        if not self._browser.is_connected():
+            await self._restart_if_crashed()
+        # Contexts go back to the queue they came from, so a restart never receives dead ones
+        contexts = self._contexts
+        context = await contexts.get()
+        page = None
+        try:
+            page = await context.new_page()
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+            try:
+                await page.wait_for_selector(ROSTER_SELECTOR, state='attached', timeout=self.wait_timeout * 1000)
+            except PlaywrightTimeout:
+                # Hand over whatever rendered; the parsers decide whether it holds a roster
+                pass
+            return await page.content()
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    # The browser went away mid-render; the next render restarts it
+                    pass
+            contexts.put_nowait(context)
+    
+    def render(self, url):
+        """Load a URL in the headless browser and return its HTML once roster cards are on the page"""
+        self._ensure_started()
+        # One deadline covers waiting for a free context as well as the load and the
+        # card wait, so a busy pool fails the request instead of queueing it past
+        # gunicorn's worker timeout
+        deadline = self.timeout + self.wait_timeout
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._render(url), deadline), self._loop)
+        try:
+            return future.result(deadline + 5)
+        except (asyncio.TimeoutError, concurrent.futures.TimeoutError):
+            future.cancel()
+            raise TimeoutError(f'Rendering {url} took longer than {deadline:g}s')
+    
+    def close(self):
+        with self._start_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result(self.timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(self.timeout)
+            self._loop = None
+    
+    async def _stop(self):
+        # After a browser crash the contexts and browser are already gone
+        while not self._contexts.empty():
+            try:
+                await self._contexts.get_nowait().close()
+            except Exception:
+                pass
+        try:
+            await self._browser.close()
+        finally:
+            await self._playwright.stop()
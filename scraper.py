@@ -1,62 +1,429 @@
-import requests
-from bs4 import BeautifulSoup
+import html
 import re
 from urllib.parse import urlparse, urljoin
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fetch import DEFAULT_HEADERS, Fetcher
+from backends import build_soup, make_soup, resolve_backend, strip_noise
+import metrics
+from streaming import read_roster_stream
+from records import Coach, Player, Roster
+from embedded import find_team_name, has_json_scripts, iter_json_payloads, iter_people, person_fields
+import platforms
+from profiles import learn_profile, new_wins, page_key, profile_holds
+from tables import read_table, row_fields
+
+# Bump whenever parser output changes so memoized results are invalidated
+PARSER_VERSION = 5
+
+# Precompiled patterns for _extract_player_from_sidearm_card, evaluated in priority order.
+# The card-text patterns are searched one by one rather than as one alternation: they
+# overlap (BARE_HEIGHT also matches inside "185 lbs" and "#23"), and a single finditer
+# would consume those spans and change which pattern wins.
+LEADING_NUMBER = re.compile(r'^#?\d{1,3}\s*')
+PROFILE_LINK = re.compile(r'/player/|/athlete/|/roster/', re.I)
+STAMP_TEXT_CLASS = re.compile(r's-stamp__text')
+JERSEY_LABEL = re.compile(r'Jersey Number\s*', re.I)
+DIGITS = re.compile(r'\d{1,3}')
+
+# Where a card's name and jersey number can come from, in cascade order
+NAME_SOURCES = ['name', 'heading', 'profile_link']
+NUMBER_STRATEGIES = ['data-number', 'data-jersey', 'stamp', 'number_class', 'number_span', 'text']
+
+# (literal that must appear for the pattern to match, pattern)
+TEXT_NUMBER_PATTERNS = [
+    ('#', re.compile(r'#(\d{1,3})\b')),
+    ('No', re.compile(r'No\.?\s*(\d{1,3})\b')),
+    ('Jersey', re.compile(r'Jersey\s*(\d{1,3})\b')),
+]
+POSITION_PATTERNS = [
+    ('Position', re.compile(r'Position\s+([A-Z]{1,3}(?:/[A-Z]{1,3})?)\b')),
+    ('', re.compile(r'\b(G|F|C|PG|SG|SF|PF|G/F|F/G|F/C)\b')),
+    ('', re.compile(r'\b(Guard|Forward|Center)\b')),
+]
+POSITION_WORDS = {'Guard': 'G', 'Forward': 'F', 'Center': 'C'}
+
+# Column map for Presto roster tables whose header row isn't recognized
+PRESTO_COLUMNS = {'number': 0, 'name': 1, 'position': -1}
+
+YEAR_PATTERNS = [
+    re.compile(r'Academic Year\s+(Fr\.?|So\.?|Jr\.?|Sr\.?)\b', re.I),
+    re.compile(r'\b(Freshman|Sophomore|Junior|Senior)\b', re.I),
+    re.compile(r'\b(Fr\.?|So\.?|Jr\.?|Sr\.?)\b'),
+]
+YEAR_ABBREVIATIONS = {
+    'Freshman': 'Fr', 'Fr.': 'Fr',
+    'Sophomore': 'So', 'So.': 'So',
+    'Junior': 'Jr', 'Jr.': 'Jr',
+    'Senior': 'Sr', 'Sr.': 'Sr'
+}
+
+LABELLED_HEIGHT = re.compile(r"Height\s+(\d+['\"]?\s*\d+['\"]?)")
+BARE_HEIGHT = re.compile(r"(\d+['\"]?\s*-?\s*\d+['\"]?)")
+LABELLED_WEIGHT = re.compile(r"Weight\s+(\d+)\s*lbs?", re.I)
+BARE_WEIGHT = re.compile(r"(\d{3})\s*lbs?")
+
+TITLE_TAG = re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S)
+
+# Class names of the per-person cards on Sidearm-style roster pages
+PERSON_CARD_CLASS = re.compile(
+    r'(roster[-_]?player|athlete[-_]?card|player[-_]?card|roster[-_]?card|s-person-card|person[-_]?card)',
+    re.I
+)
+
+def clean_team_name(title_text):
+    """Strip the roster/athletics/season noise from a page <title>, leaving the team name"""
+    title_text = re.sub(r'\s*-\s*Roster.*', '', title_text, flags=re.I)
+    title_text = re.sub(r'\s*-.*Athletics.*', '', title_text, flags=re.I)
+    title_text = re.sub(r'\s*Roster.*', '', title_text, flags=re.I)
+    title_text = re.sub(r'\s*\d{4}-?\d{0,2}\s*', '', title_text)  # Remove years like "2025-26"
+    return title_text.strip()
+
+def person_key(person):
+    """Identity of a player or coach across scrapes: first_name_last_name, lowercased"""
+    return f"{person.get('first_name', '').lower()}_{person.get('last_name', '').lower()}"
 
 class RosterScraper:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    def __init__(self, max_workers=8, per_host_limit=4, http_cache=None, result_cache=None, parser='auto',
+                 stream=False, parse_pool=None, fetcher=None, site_profiles=None,
+                 renderer=None, roster_index=None):
+        self.headers = dict(DEFAULT_HEADERS)
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.http_cache = http_cache  # Optional cache.HTTPCache for conditional GETs
+        self.result_cache = result_cache  # Optional cache.ResultCache for parsed rosters
+        self.parser = resolve_backend(parser)  # 'selectolax', 'lxml' or 'html.parser'
+        self.stream = stream  # Stop downloading Sidearm pages once the person cards end
+        self.parse_pool = parse_pool  # Optional parallel.ParsePool to parse in worker processes
+        self.site_profiles = site_profiles  # Optional profiles.SiteProfileStore of per-host selectors
+        self.renderer = renderer  # Optional render.RendererPool for pages that build their roster in JavaScript
+        self.roster_index = roster_index  # Optional search.RosterIndex every roster with a URL is added to
+        
+        # Timeouts, per-host rate limiting and retries; its pooled session is shared by every fetch
+        self.fetcher = fetcher or Fetcher(headers=self.headers, pool_size=max_workers)
+        self.session = self.fetcher.session
+        
+        # Per-host semaphores are shared across batches so concurrent requests
+        # to the same athletics site never exceed per_host_limit
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
     
     def scrape_from_url(self, url):
         """Scrape roster data directly from URL"""
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return self.scrape_from_html(response.text, url)
+        if self.stream:
+            return self._scrape_streaming(url)
+        html_content = self._fetch_html(url)
+        return self.scrape_from_html(html_content, url)
     
-    def scrape_from_html(self, html_content, url=''):
-        """Parse HTML content and extract roster data"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove common non-roster elements first
-        for tag in soup.find_all(['script', 'style', 'nav', 'header', 'footer']):
-            tag.decompose()
+    def scrape_rendered(self, url):
+        """Scrape a page that only has its roster after JavaScript runs, via the headless renderer"""
+        if not self.renderer:
+            raise RuntimeError('Rendering is not enabled')
+        with metrics.stage('render'), self._host_slot(url):
+            html_content = self.renderer.render(url)
+        return self.scrape_from_html(html_content, url)
+    
+    def _scrape_streaming(self, url):
+        """Read the page incrementally and parse only the roster container once it is complete"""
+        cached = self.http_cache.get(url) if self.http_cache else None
+        headers = self.http_cache.conditional_headers(cached) if cached else {}
+        
+        with metrics.stage('fetch'), self._host_slot(url):
+            response = self.fetcher.get(url, headers=headers, stream=True)
+            try:
+                if cached and response.status_code == 304:
+                    self.http_cache.revalidated(url, cached)
+                    return self.scrape_from_html(cached['body'], url)
+                response.raise_for_status()
+                page = read_roster_stream(response, PERSON_CARD_CLASS, lambda prefix: self._may_cut_off(prefix, url))
+            finally:
+                response.close()
+        
+        # A cut-off page still holds the whole roster, so it is safe to cache as is
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+        if self.http_cache and (etag or last_modified):
+            self.http_cache.put(url, page['html'], etag, last_modified)
+        
+        if page['roster_html'] is None:
+            return self.scrape_from_html(page['html'], url)
+        
+        # Embedded JSON / JSON-LD wins over the cards, as it does for whole pages. It
+        # sits in the prefix that was read, which the trimmed roster_html has dropped
+        with metrics.stage('embedded'):
+            roster = self._parse_embedded(page['html'], url)
+        if roster:
+            return self._indexed(url, roster.to_dict())
+        return self.scrape_from_html(page['roster_html'], url, platform='sidearm')
+    
+    def _may_cut_off(self, prefix, url):
+        """Whether a streamed page can stop downloading after its person cards"""
+        # Pages with JSON / JSON-LD scripts often put the whole roster in a data island
+        # after the cards, so they are read in full and take the embedded fast path
+        return self._detect_platform(prefix, url) == 'sidearm' and not has_json_scripts(prefix)
+    
+    def _fetch_html(self, url):
+        """Download a page, revalidating against the HTTP cache when one is configured"""
+        cached = self.http_cache.get(url) if self.http_cache else None
+        headers = self.http_cache.conditional_headers(cached) if cached else {}
+        
+        with metrics.stage('fetch'), self._host_slot(url):
+            response = self.fetcher.get(url, headers=headers)
+            if cached and response.status_code == 304:
+                self.http_cache.revalidated(url, cached)
+                return cached['body']
+            response.raise_for_status()
+            html_content = response.text
+        
+        # Only pages with validators can be revalidated later, so skip the rest
+        etag = response.headers.get('ETag', '')
+        last_modified = response.headers.get('Last-Modified', '')
+        if self.http_cache and (etag or last_modified):
+            self.http_cache.put(url, html_content, etag, last_modified)
+        return html_content
+    
+    def scrape_many(self, urls):
+        """Scrape many roster URLs concurrently, yielding a result per URL as each finishes"""
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [executor.submit(self._scrape_one, url) for url in self._interleave_by_host(urls)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stop queued work if the consumer goes away mid-batch
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _scrape_one(self, url):
+        """Scrape a single URL for a batch, reporting errors instead of raising"""
+        if not isinstance(url, str) or not url.strip():
+            return {'url': url, 'success': False, 'error': 'Not a URL'}
+        try:
+            return {'url': url, 'success': True, 'data': self.scrape_from_url(url)}
+        except Exception as e:
+            return {'url': url, 'success': False, 'error': str(e)}
+    
+    def _host_slot(self, url):
+        """Get the semaphore limiting concurrent fetches to this URL's host"""
+        host = urlparse(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+        return slot
+    
+    def _interleave_by_host(self, urls):
+        """Order URLs round-robin by host so one slow site doesn't hog the worker pool"""
+        by_host = OrderedDict()
+        for url in urls:
+            # Anything that isn't a URL string is grouped on its own and fails in _scrape_one
+            host = urlparse(url).netloc.lower() if isinstance(url, str) else ''
+            by_host.setdefault(host, []).append(url)
+        
+        ordered = []
+        queues = list(by_host.values())
+        while queues:
+            for queue in queues:
+                ordered.append(queue.pop(0))
+            queues = [queue for queue in queues if queue]
+        return ordered
+    
+    def scrape_from_html(self, html_content, url='', platform=None):
+        """Parse HTML content and extract roster data (platform skips detection when given)"""
+        if not self.result_cache:
+            roster_data = self._parse(html_content, url, platform)
+        else:
+            # Identical page + URL + parser version always parses the same, so skip the soup
+            key = self.result_cache.key(html_content, url, f"{PARSER_VERSION}:{self.parser}:{platform or ''}")
+            roster_data = self.result_cache.get(key)
+            if roster_data is None:
+                metrics.RESULT_CACHE.inc(1, 'miss')
+                roster_data = self._parse(html_content, url, platform)
+                self.result_cache.put(key, roster_data)
+            else:
+                metrics.RESULT_CACHE.inc(1, 'hit')
+        return self._indexed(url, roster_data)
+    
+    def _indexed(self, url, roster_data):
+        """Add a scraped roster to the search index (when there is one and a URL), returning it"""
+        if self.roster_index and url:
+            with metrics.stage('index'):
+                self.roster_index.put(url, roster_data)
+        return roster_data
+    
+    def scrape_roster(self, html_content, url='', platform=None):
+        """Like scrape_from_html, but returns a compact Roster of Player/Coach records"""
+        # Batch callers holding thousands of rosters keep these instead of dicts
+        if not self.result_cache and not self.parse_pool:
+            return self._parse_html(html_content, url, platform)
+        return Roster.from_dict(self.scrape_from_html(html_content, url, platform))
+    
+    def _parse(self, html_content, url, platform=None):
+        """Parse here, or in a worker process when a parse pool is configured"""
+        if self.parse_pool:
+            # The worker's own stage timings come back with the result; this covers the round trip
+            with metrics.stage('parse_pool'):
+                return self.parse_pool.parse(html_content, url, platform)
+        return self._parse_html(html_content, url, platform).to_dict()
+    
+    def _parse_html(self, html_content, url, platform=None):
+        """Detect the platform, build the soup and run its parser, returning a Roster"""
+        # Detection reads only a prefix of the raw HTML, so it runs before any parsing
+        if platform:
+            detected = platforms.for_parser(platform)
+        else:
+            with metrics.stage('detect'):
+                detected = platforms.detect(html_content, url)
+            platform = detected.parser
+        
+        # A platform with a fast path may not need a soup at all
+        if detected.fast_path == 'embedded':
+            with metrics.stage('embedded'):
+                roster = self._parse_embedded(html_content, url)
+            if roster:
+                return roster
+        
+        # Remove common non-roster elements (script/style/nav/header/footer)
+        if self.parser == 'selectolax':
+            # selectolax strips them while it parses
+            with metrics.stage('parse'):
+                soup = make_soup(html_content, self.parser)
+        else:
+            with metrics.stage('parse'):
+                soup = build_soup(html_content, self.parser)
+            with metrics.stage('decompose'):
+                strip_noise(soup)
         
-        # Detect platform and use appropriate parser
-        if 'sidearmdev' in html_content or 'sidearm' in html_content.lower():
+        with metrics.stage(f'extract_{platform}'):
+            return self._run_parser(platform, soup, url)
+    
+    def _run_parser(self, platform, soup, url):
+        """Dispatch a soup to the parser for its platform"""
+        if platform == 'sidearm':
             return self._parse_sidearm(soup, url)
-        elif 'prestosports' in html_content.lower():
+        elif platform == 'presto':
             return self._parse_presto(soup, url)
         else:
             # Generic parser
             return self._parse_generic(soup, url)
     
+    def _detect_platform(self, html_content, url=''):
+        """Work out which parser handles a page (see platforms.py for the signatures)"""
+        return platforms.detect(html_content, url).parser
+    
+    def _parse_embedded(self, html_content, url):
+        """Build a Sidearm roster from embedded JSON / JSON-LD, or None when the page has none"""
+        payloads = list(iter_json_payloads(html_content))
+        if not payloads:
+            return None
+        
+        roster = Roster('sidearm')
+        seen_players = {}
+        seen_coaches = {}
+        found = 0
+        
+        for payload in payloads:
+            for role, person in iter_people(payload):
+                found += 1
+                fields = person_fields(person)
+                if not fields['last_name']:
+                    continue
+                
+                # Same rule as the card parser when the payload doesn't say who is who
+                if role is None:
+                    if fields['number'] or fields['position']:
+                        role = 'player'
+                    elif 'COACH' in fields['title'].upper():
+                        role = 'coach'
+                    else:
+                        continue
+                
+                full_name = f"{fields['first_name']} {fields['last_name']}"
+                photo = urljoin(url, fields['photo']) if fields['photo'] else ''
+                if role == 'player':
+                    player = Player(
+                        number=fields['number'],
+                        first_name=fields['first_name'],
+                        last_name=fields['last_name'],
+                        full_name=full_name,
+                        position=POSITION_WORDS.get(fields['position'], fields['position']),
+                        photo=photo,
+                        height=fields['height'],
+                        weight=fields['weight'],
+                        year=YEAR_ABBREVIATIONS.get(fields['year'], fields['year']) or None,
+                        hometown=fields['hometown'] or None
+                    )
+                    self._add_embedded_person(roster.players, seen_players, player)
+                elif 'COACH' in fields['title'].upper() and len(roster.coaches) < 3:
+                    coach = Coach(
+                        first_name=fields['first_name'],
+                        last_name=fields['last_name'],
+                        full_name=full_name,
+                        title=fields['title'].upper(),
+                        photo=photo
+                    )
+                    self._add_embedded_person(roster.coaches, seen_coaches, coach)
+        
+        metrics.count_cards(found, len(roster.players) + len(roster.coaches))
+        
+        # Staff-only payloads (a coaches widget, say) leave the players to the card parser
+        if not roster.players:
+            return None
+        
+        roster.team_name = find_team_name(payloads)
+        if not roster.team_name:
+            # The title is in the <head>, so only the prefix detection reads is searched
+            title = TITLE_TAG.search(html_content, 0, platforms.PREFIX_CHARS)
+            if title:
+                roster.team_name = clean_team_name(html.unescape(title.group(1)))
+        return roster
+    
+    def _add_embedded_person(self, people, seen, person):
+        """Append a person, or fill the gaps of an earlier payload's copy of them"""
+        # The same person often appears twice, e.g. a JSON-LD coach and the roster JSON's staff entry
+        key = person_key(person)
+        earlier = seen.get(key)
+        if earlier is None:
+            seen[key] = person
+            people.append(person)
+            return
+        for name in person.__slots__:
+            if not getattr(earlier, name) and getattr(person, name):
+                setattr(earlier, name, getattr(person, name))
+    
     def _parse_sidearm(self, soup, url):
         """Parse Sidearm Sports platform sites (like OK State)"""
-        roster_data = {
-            'team_name': '',
-            'coaches': [],
-            'players': [],
-            'platform': 'sidearm'
-        }
+        roster = Roster('sidearm')
         
         # Extract team name from title
         title = soup.find('title')
         if title:
-            title_text = title.text
-            title_text = re.sub(r'\s*-\s*Roster.*', '', title_text, flags=re.I)
-            title_text = re.sub(r'\s*-.*Athletics.*', '', title_text, flags=re.I)
-            title_text = re.sub(r'\s*Roster.*', '', title_text, flags=re.I)
-            title_text = re.sub(r'\s*\d{4}-?\d{0,2}\s*', '', title_text)  # Remove years like "2025-26"
-            roster_data['team_name'] = title_text.strip()
+            roster.team_name = clean_team_name(title.text)
         
         # Look for ALL person containers (both players and coaches)
-        person_containers = soup.find_all(['div', 'li', 'article'], class_=re.compile(
-            r'(roster[-_]?player|athlete[-_]?card|player[-_]?card|roster[-_]?card|s-person-card|person[-_]?card)',
-            re.I
-        ))
+        person_containers = soup.find_all(['div', 'li', 'article'], class_=PERSON_CARD_CLASS)
+        
+        # On a roster page seen before, read its cards with the selectors that worked last time
+        page = page_key(url) if url and self.site_profiles else ''
+        profile = self.site_profiles.get(page) if page else None
+        if profile and profile.get('version') != PARSER_VERSION:
+            profile = None
+        if profile:
+            profiled = self._find_containers(soup, profile['container'], person_containers)
+            # Cards the profile's selector doesn't cover (coaches in a second card
+            # type, say) would be silently dropped, so only the cascade may read them
+            if not self._has_stray_cards(person_containers, profiled):
+                self._add_sidearm_people(roster, profiled, url, profile=profile)
+                if profile_holds(profile, len(roster.players), len(roster.coaches)):
+                    metrics.SITE_PROFILES.inc(1, 'hit')
+                    metrics.count_cards(len(profiled), len(roster.players) + len(roster.coaches))
+                    return roster
+            # The page changed its markup: rerun the full cascade and relearn
+            metrics.SITE_PROFILES.inc(1, 'miss')
+            roster.players = []
+            roster.coaches = []
         
         if not person_containers:
             person_containers = soup.find_all(['div', 'li', 'article'], attrs={
@@ -65,18 +432,73 @@ class RosterScraper:
                 'data-athlete': True
             })
         
+        wins = new_wins() if page else None
+        self._add_sidearm_people(roster, person_containers, url, wins=wins)
+        
+        metrics.count_cards(len(person_containers), len(roster.players) + len(roster.coaches))
+        
+        if wins is not None:
+            learned = learn_profile(wins, len(roster.players) + len(roster.coaches), PARSER_VERSION)
+            if learned and roster.players:
+                self.site_profiles.put(page, learned)
+                metrics.SITE_PROFILES.inc(1, 'learned')
+            elif profile:
+                self.site_profiles.forget(page)
+        
+        # Fallback to generic parser if no people found
+        if not roster.players and not roster.coaches:
+            roster = self._parse_generic(soup, url)
+            roster.platform = 'sidearm-fallback'
+        
+        return roster
+    
+    def _find_containers(self, soup, signature, cards):
+        """Person cards matching a profile's container selector"""
+        tag, kind, value = signature
+        if kind == 'class':
+            # A learned card class always matches PERSON_CARD_CLASS, so it is among the cards already found
+            return [card for card in cards if card.name == tag and value in (card.get('class') or ())]
+        return soup.find_all(tag, attrs={value: True})
+    
+    def _has_stray_cards(self, cards, containers):
+        """Whether any person card is neither one of a profile's containers nor inside one"""
+        selected = {id(container) for container in containers}
+        for card in cards:
+            if id(card) in selected:
+                continue
+            if not any(id(parent) in selected for parent in card.parents):
+                return True
+        return False
+    
+    def _container_signature(self, container):
+        """The tag plus card class (or data attribute) that made an element a person card"""
+        for token in container.get('class') or ():
+            if PERSON_CARD_CLASS.search(token):
+                return (container.name, 'class', token)
+        for attr in ('data-player', 'data-athlete'):
+            if container.has_attr(attr):
+                return (container.name, 'attr', attr)
+        return None
+    
+    def _add_sidearm_people(self, roster, person_containers, url, profile=None, wins=None):
+        """Extract each card and sort the people into roster.players / roster.coaches
+
+        With a profile, cards are read with its strategies first. With wins, the
+        strategies behind every accepted person are tallied for learn_profile().
+        """
         # Extract all people, then separate based on whether they have a position
         seen_players = set()
         seen_coaches = set()
         
         for container in person_containers:
-            person = self._extract_player_from_sidearm_card(container, url)
+            used = {} if wins is not None else None
+            person = self._extract_player_from_sidearm_card(container, url, profile, used)
             
-            if not person or not person.get('last_name'):
+            if not person or not person.last_name:
                 continue
             
             # Filter out navigation/junk
-            name_check = f"{person.get('first_name', '')} {person.get('last_name', '')}".lower()
+            name_check = f"{person.first_name} {person.last_name}".lower()
             skip_keywords = ['news', 'schedule', 'stats', 'roster', 'jersey', 'number',
                            'related', 'more', 'view', 'profile', 'bio', 'back', 'forward',
                            'previous', 'next', 'game', 'media', 'social']
@@ -84,36 +506,36 @@ class RosterScraper:
             if any(keyword in name_check for keyword in skip_keywords):
                 continue
             
-            if person.get('last_name', '').replace('#', '').strip().isdigit():
+            if person.last_name.replace('#', '').strip().isdigit():
                 continue
             
             # Decide if this is a player or coach based on position/number
             # For basketball: G/F/C positions indicate player
             # For baseball/softball: Having a jersey number indicates player
-            has_basketball_position = person.get('position', '') in ['G', 'F', 'C', 'PG', 'SG', 'SF', 'PF', 'G/F', 'F/G', 'F/C']
-            has_number = person.get('number', '').strip() != ''
+            has_basketball_position = person.position in ['G', 'F', 'C', 'PG', 'SG', 'SF', 'PF', 'G/F', 'F/G', 'F/C']
+            has_number = person.number.strip() != ''
             
             # Someone is a player if they have a basketball position OR a jersey number
             is_player = has_basketball_position or has_number
             
             if is_player:
                 # This is a player
-                player_key = f"{person.get('first_name', '').lower()}_{person.get('last_name', '').lower()}"
+                player_key = person_key(person)
                 if player_key not in seen_players:
                     seen_players.add(player_key)
-                    roster_data['players'].append(person)
+                    roster.players.append(person)
+                    if wins is not None:
+                        self._tally(wins, container, used)
             else:
                 # No player position = likely a coach/staff member
                 # Convert to coach format and use their title/byline as position
-                coach = {
-                    'first_name': person.get('first_name', ''),
-                    'last_name': person.get('last_name', ''),
-                    'full_name': person.get('full_name', ''),
-                    'title': person.get('position', ''),
-                    'photo': person.get('photo', ''),
-                    'dropline1': '',
-                    'dropline2': ''
-                }
+                coach = Coach(
+                    first_name=person.first_name,
+                    last_name=person.last_name,
+                    full_name=person.full_name,
+                    title=person.position,
+                    photo=person.photo
+                )
                 
                 # Try to find their actual title in the container
                 full_text = container.get_text()
@@ -127,182 +549,207 @@ class RosterScraper:
                 for pattern in title_patterns:
                     match = re.search(pattern, full_text, re.I)
                     if match:
-                        coach['title'] = match.group(1).upper()
+                        coach.title = match.group(1).upper()
                         break
                 
                 # Only include if "COACH" is in their title and we have less than 3 coaches
-                if 'COACH' in coach['title'].upper() and len(roster_data['coaches']) < 3:
-                    coach_key = f"{coach['first_name'].lower()}_{coach['last_name'].lower()}"
+                if 'COACH' in coach.title.upper() and len(roster.coaches) < 3:
+                    coach_key = person_key(coach)
                     if coach_key not in seen_coaches:
                         seen_coaches.add(coach_key)
-                        roster_data['coaches'].append(coach)
-        
-        # Fallback to generic parser if no people found
-        if not roster_data['players'] and not roster_data['coaches']:
-            roster_data = self._parse_generic(soup, url)
-            roster_data['platform'] = 'sidearm-fallback'
-        
-        return roster_data
+                        roster.coaches.append(coach)
+                        if wins is not None:
+                            self._tally(wins, container, used)
     
-    def _extract_player_from_sidearm_card(self, container, base_url):
-        """Extract player info from a Sidearm roster card"""
-        player = {
-            'number': '',
-            'first_name': '',
-            'last_name': '',
-            'full_name': '',  # Combined name for baseball/softball
-            'position': '',
-            'photo': '',
-            'height': '',
-            'weight': ''
-        }
-        
+    def _tally(self, wins, container, used):
+        wins['container'][self._container_signature(container)] += 1
+        for field, strategy in used.items():
+            wins[field][strategy] += 1
+    
+    def _extract_player_from_sidearm_card(self, container, base_url, profile=None, used=None):
+        """Extract player info from a Sidearm roster card
+
+        A site profile's strategy for a field is tried first, falling back to the
+        full cascade when it comes up empty. `used`, when given, is filled with
+        the strategy that produced each field.
+        """
+        # full_name is the combined name for baseball/softball
+        player = Player(full_name='', height='', weight='')
+        
+        # One walk over the card collects every element the field cascades below need
+        found = self._scan_card(container)
         full_text = container.get_text(separator=' ', strip=True)
         
         # Find name
-        name_elem = container.find(['h3', 'h4', 'h5', 'a'], class_=re.compile(r'name', re.I))
-        if not name_elem:
-            name_elem = container.find(['h3', 'h4', 'h5', 'strong'])
-        if not name_elem:
-            name_elem = container.find('a', href=re.compile(r'/player/|/athlete/|/roster/', re.I))
-        
-        if name_elem:
-            name_text = name_elem.get_text(strip=True)
-            name_text = re.sub(r'^#?\d{1,3}\s*', '', name_text)
+        name_source = profile['name'] if profile and profile.get('name') and found.get(profile['name']) else None
+        if name_source is None:
+            name_source = next((key for key in NAME_SOURCES if found[key]), None)
+        if name_source:
+            name_text = found[name_source].get_text(strip=True)
+            name_text = LEADING_NUMBER.sub('', name_text)
             name_parts = name_text.split()
             if len(name_parts) >= 2:
-                player['first_name'] = name_parts[0]
-                player['last_name'] = ' '.join(name_parts[1:])
-                player['full_name'] = f"{player['first_name']} {player['last_name']}"
-        
-        # Find jersey number - try data attributes first
-        if container.has_attr('data-number'):
-            player['number'] = container['data-number']
-        elif container.has_attr('data-jersey'):
-            player['number'] = container['data-jersey']
-        
-        # Look for Sidearm's stamp element (where OK State hides jersey numbers)
-        if not player['number']:
-            stamp_elem = container.find('div', attrs={'data-test-id': 's-stamp__root'})
-            if not stamp_elem:
-                stamp_elem = container.find('div', class_=re.compile(r's-stamp'))
-            
-            if stamp_elem:
-                stamp_text_elem = stamp_elem.find('span', class_=re.compile(r's-stamp__text'))
-                if stamp_text_elem:
-                    # Get text, remove "Jersey Number" label
-                    stamp_text = stamp_text_elem.get_text(strip=True)
-                    stamp_text = re.sub(r'Jersey Number\s*', '', stamp_text, flags=re.I)
-                    # Extract just the number
-                    number_match = re.search(r'\d{1,3}', stamp_text)
-                    if number_match:
-                        player['number'] = number_match.group()
-        
-        # Try finding number in specific elements
-        if not player['number']:
-            number_elem = container.find(class_=re.compile(r'(^|\s)number($|\s)|(^|\s)jersey($|\s)', re.I))
-            if number_elem:
-                number_text = number_elem.get_text(strip=True)
-                number_match = re.search(r'\d{1,3}', number_text)
-                if number_match:
-                    player['number'] = number_match.group()
-        
-        # Search in spans with specific classes
-        if not player['number']:
-            spans = container.find_all('span')
-            for span in spans:
-                span_class = ' '.join(span.get('class', []))
-                if 'number' in span_class.lower() or 'jersey' in span_class.lower():
-                    num_match = re.search(r'\d{1,3}', span.get_text())
-                    if num_match:
-                        player['number'] = num_match.group()
-                        break
-        
-        # Last resort - search in full text
-        if not player['number']:
-            number_patterns = [
-                r'#(\d{1,3})\b',
-                r'No\.?\s*(\d{1,3})\b',
-                r'Jersey\s*(\d{1,3})\b',
-            ]
-            for pattern in number_patterns:
-                match = re.search(pattern, full_text)
-                if match:
-                    player['number'] = match.group(1)
-                    break
+                player.first_name = name_parts[0]
+                player.last_name = ' '.join(name_parts[1:])
+                player.full_name = f"{player.first_name} {player.last_name}"
+                if used is not None:
+                    used['name'] = name_source
+        
+        # Find jersey number: data attributes, Sidearm's stamp element, number
+        # classes, number spans, then the card text
+        strategies = NUMBER_STRATEGIES
+        if profile and profile.get('number') in NUMBER_STRATEGIES:
+            strategies = [profile['number']] + [name for name in NUMBER_STRATEGIES if name != profile['number']]
+        for strategy in strategies:
+            player.number = self._card_number(strategy, container, found, full_text)
+            if player.number:
+                if used is not None:
+                    used['number'] = strategy
+                break
         
         # Find position
-        position_patterns = [
-            r'Position\s+([A-Z]{1,3}(?:/[A-Z]{1,3})?)\b',
-            r'\b(G|F|C|PG|SG|SF|PF|G/F|F/G|F/C)\b',
-            r'\b(Guard|Forward|Center)\b'
-        ]
-        
-        for pattern in position_patterns:
-            match = re.search(pattern, full_text)
+        patterns = range(len(POSITION_PATTERNS))
+        if profile and isinstance(profile.get('position'), int) and profile['position'] < len(POSITION_PATTERNS):
+            patterns = [profile['position']] + [index for index in patterns if index != profile['position']]
+        for index in patterns:
+            label, pattern = POSITION_PATTERNS[index]
+            if label and label not in full_text:
+                continue
+            match = pattern.search(full_text)
             if match:
                 pos = match.group(1)
-                if pos == 'Guard':
-                    pos = 'G'
-                elif pos == 'Forward':
-                    pos = 'F'
-                elif pos == 'Center':
-                    pos = 'C'
-                player['position'] = pos
+                player.position = POSITION_WORDS.get(pos, pos)
+                if used is not None:
+                    used['position'] = index
                 break
         
         # Find academic year (Fr, So, Jr, Sr)
-        year_match = re.search(r'Academic Year\s+(Fr\.?|So\.?|Jr\.?|Sr\.?)\b', full_text, re.I)
-        if not year_match:
-            year_match = re.search(r'\b(Freshman|Sophomore|Junior|Senior)\b', full_text, re.I)
-        if not year_match:
-            year_match = re.search(r'\b(Fr\.?|So\.?|Jr\.?|Sr\.?)\b', full_text)
+        year_match = None
+        for pattern in YEAR_PATTERNS:
+            year_match = pattern.search(full_text)
+            if year_match:
+                break
         
         if year_match:
             year = year_match.group(1)
             # Normalize to abbreviation
-            year_map = {
-                'Freshman': 'Fr', 'Fr.': 'Fr',
-                'Sophomore': 'So', 'So.': 'So',
-                'Junior': 'Jr', 'Jr.': 'Jr',
-                'Senior': 'Sr', 'Sr.': 'Sr'
-            }
-            player['year'] = year_map.get(year, year)
+            player.year = YEAR_ABBREVIATIONS.get(year, year)
         
         # Find height - matches patterns like "6' 1''" or "6-1" or "Height 6' 1''"
-        height_match = re.search(r"Height\s+(\d+['\"]?\s*\d+['\"]?)", full_text)
+        height_match = LABELLED_HEIGHT.search(full_text) if 'Height' in full_text else None
         if not height_match:
-            height_match = re.search(r"(\d+['\"]?\s*-?\s*\d+['\"]?)", full_text)
+            height_match = BARE_HEIGHT.search(full_text)
         
         if height_match:
-            player['height'] = height_match.group(1).strip()
+            player.height = height_match.group(1).strip()
         
         # Find weight - matches patterns like "175 lbs" or "Weight 175"
-        weight_match = re.search(r"Weight\s+(\d+)\s*lbs?", full_text, re.I)
+        weight_match = LABELLED_WEIGHT.search(full_text)
         if not weight_match:
-            weight_match = re.search(r"(\d{3})\s*lbs?", full_text)
+            weight_match = BARE_WEIGHT.search(full_text)
         
         if weight_match:
-            player['weight'] = weight_match.group(1)
+            player.weight = weight_match.group(1)
         
         # Find photo
-        img = container.find('img')
+        img = found['img']
         if img and img.get('src'):
             src = img['src']
             if 'placeholder' not in src.lower() and 'default' not in src.lower():
-                player['photo'] = urljoin(base_url, src)
+                player.photo = urljoin(base_url, src)
+                if used is not None:
+                    used['photo'] = 'img'
         
         return player
     
+    def _card_number(self, strategy, container, found, full_text):
+        """Jersey number from one NUMBER_STRATEGIES step, or '' if it finds none"""
+        if strategy == 'data-number':
+            return container.get('data-number', '')
+        if strategy == 'data-jersey':
+            # data-number wins even when empty, as it always has
+            return '' if container.has_attr('data-number') else container.get('data-jersey', '')
+        if strategy == 'stamp':
+            # Sidearm's stamp element (where OK State hides jersey numbers)
+            stamp_elem = found['stamp_root'] or found['stamp']
+            if stamp_elem:
+                stamp_text_elem = stamp_elem.find('span', class_=STAMP_TEXT_CLASS)
+                if stamp_text_elem:
+                    # Get text, remove "Jersey Number" label, extract just the number
+                    stamp_text = JERSEY_LABEL.sub('', stamp_text_elem.get_text(strip=True))
+                    number_match = DIGITS.search(stamp_text)
+                    if number_match:
+                        return number_match.group()
+        elif strategy == 'number_class':
+            if found['number']:
+                number_match = DIGITS.search(found['number'].get_text(strip=True))
+                if number_match:
+                    return number_match.group()
+        elif strategy == 'number_span':
+            for span in found['number_spans']:
+                num_match = DIGITS.search(span.get_text())
+                if num_match:
+                    return num_match.group()
+        elif strategy == 'text':
+            # Last resort - search in full text
+            for label, pattern in TEXT_NUMBER_PATTERNS:
+                if label not in full_text:
+                    continue
+                match = pattern.search(full_text)
+                if match:
+                    return match.group(1)
+        return ''
+    
+    def _scan_card(self, container):
+        """Walk a card's descendants once, keeping the first element of each kind"""
+        found = {
+            'name': None,  # h3/h4/h5/a with a "name" class
+            'heading': None,  # First h3/h4/h5/strong
+            'profile_link': None,  # Link to a player/athlete/roster page
+            'stamp_root': None,  # div[data-test-id=s-stamp__root]
+            'stamp': None,  # div with an s-stamp class
+            'number': None,  # Any element classed exactly "number" or "jersey"
+            'number_spans': [],  # Spans whose class mentions number/jersey
+            'img': None
+        }
+        
+        for elem in container.descendants:
+            name = elem.name
+            if name is None:
+                continue
+            
+            classes = elem.get('class') or ()
+            class_text = ' '.join(classes)
+            class_lower = class_text.lower()
+            
+            if name in ('h3', 'h4', 'h5', 'a', 'strong'):
+                if found['name'] is None and name != 'strong' and 'name' in class_lower:
+                    found['name'] = elem
+                if found['heading'] is None and name != 'a':
+                    found['heading'] = elem
+                if (found['profile_link'] is None and name == 'a'
+                        and PROFILE_LINK.search(elem.get('href') or '')):
+                    found['profile_link'] = elem
+            elif name == 'div':
+                if found['stamp_root'] is None and elem.get('data-test-id') == 's-stamp__root':
+                    found['stamp_root'] = elem
+                if found['stamp'] is None and 's-stamp' in class_text:
+                    found['stamp'] = elem
+            elif name == 'img':
+                if found['img'] is None:
+                    found['img'] = elem
+            
+            if classes:
+                if found['number'] is None and any(c.lower() in ('number', 'jersey') for c in classes):
+                    found['number'] = elem
+                if name == 'span' and ('number' in class_lower or 'jersey' in class_lower):
+                    found['number_spans'].append(elem)
+        
+        return found
+    
     def _extract_coach_from_card(self, container, base_url):
         """Extract coach info from a card"""
-        coach = {
-            'first_name': '',
-            'last_name': '',
-            'title': '',
-            'dropline1': '',
-            'dropline2': ''
-        }
+        coach = Coach()
         
         # Find name
         name_elem = container.find(['h3', 'h4', 'h5', 'a', 'strong'])
@@ -310,13 +757,13 @@ class RosterScraper:
             name_text = name_elem.get_text(strip=True)
             name_parts = name_text.split()
             if len(name_parts) >= 2:
-                coach['first_name'] = name_parts[0]
-                coach['last_name'] = ' '.join(name_parts[1:])
+                coach.first_name = name_parts[0]
+                coach.last_name = ' '.join(name_parts[1:])
         
         # Find title
         title_elem = container.find(class_=re.compile(r'title|position|role', re.I))
         if title_elem:
-            coach['title'] = title_elem.get_text(strip=True).upper()
+            coach.title = title_elem.get_text(strip=True).upper()
         else:
             text = container.get_text()
             title_patterns = [
@@ -328,85 +775,50 @@ class RosterScraper:
             for pattern in title_patterns:
                 match = re.search(pattern, text, re.I)
                 if match:
-                    coach['title'] = match.group(1).upper()
+                    coach.title = match.group(1).upper()
                     break
         
         return coach
     
     def _parse_presto(self, soup, url):
         """Parse Presto Sports platform sites"""
-        roster_data = {
-            'team_name': '',
-            'coaches': [],
-            'players': [],
-            'platform': 'presto'
-        }
-        
-        tables = soup.find_all('table', class_=re.compile(r'roster', re.I))
-        for table in tables:
-            rows = table.find_all('tr')[1:]
-            for row in rows:
-                cols = row.find_all(['td', 'th'])
-                if len(cols) >= 3:
-                    player = {
-                        'number': cols[0].text.strip() if len(cols) > 0 else '',
-                        'first_name': '',
-                        'last_name': '',
-                        'position': cols[-1].text.strip() if len(cols) > 2 else '',
-                        'photo': ''
-                    }
-                    
-                    name_col = cols[1] if len(cols) > 1 else cols[0]
-                    name = name_col.text.strip()
-                    name_parts = name.split()
-                    if len(name_parts) >= 2:
-                        player['first_name'] = name_parts[0]
-                        player['last_name'] = ' '.join(name_parts[1:])
-                    
-                    img = row.find('img')
-                    if img and img.get('src'):
-                        player['photo'] = urljoin(url, img['src'])
-                    
-                    if player['last_name']:
-                        roster_data['players'].append(player)
-        
-        return roster_data
+        roster = Roster('presto')
+        # Presto's classic layout is #, name, ..., position when the header can't be read
+        self._add_table_players(roster, soup.find_all('table', class_=re.compile(r'roster', re.I)), url, PRESTO_COLUMNS)
+        return roster
     
     def _parse_generic(self, soup, url):
         """Generic parser for unknown platforms"""
-        roster_data = {
-            'team_name': '',
-            'coaches': [],
-            'players': [],
-            'platform': 'generic'
-        }
-        
-        tables = soup.find_all('table')
+        roster = Roster('generic')
+        self._add_table_players(roster, soup.find_all('table'), url)
+        return roster
+    
+    def _add_table_players(self, roster, tables, url, fallback=None):
+        """Add a player per row of every table that reads as a roster (see tables.py)"""
+        rows_scanned = 0
+        min_cells = 3 if fallback else 2
         for table in tables:
-            rows = table.find_all('tr')
-            if len(rows) > 2:
-                for row in rows[1:]:
-                    cols = row.find_all(['td', 'th'])
-                    if len(cols) >= 2:
-                        text_cols = [col.text.strip() for col in cols]
-                        
-                        number = ''
-                        for col in text_cols:
-                            if col.isdigit() and len(col) <= 3:
-                                number = col
-                                break
-                        
-                        name = max(text_cols, key=len) if text_cols else ''
-                        name_parts = name.split()
-                        
-                        if len(name_parts) >= 2:
-                            player = {
-                                'number': number,
-                                'first_name': name_parts[0],
-                                'last_name': ' '.join(name_parts[1:]),
-                                'position': '',
-                                'photo': ''
-                            }
-                            roster_data['players'].append(player)
-        
-        return roster_data
+            layout = read_table(table, fallback)
+            if layout is None:
+                continue
+            columns, rows = layout
+            rows_scanned += len(rows)
+            for row in rows:
+                fields = row_fields(row, columns, min_cells)
+                if fields is None:
+                    continue
+                year = fields.get('year')
+                position = fields.get('position', '')
+                roster.players.append(Player(
+                    number=fields.get('number', ''),
+                    first_name=fields['first_name'],
+                    last_name=fields['last_name'],
+                    position=POSITION_WORDS.get(position, position),
+                    photo=urljoin(url, fields['photo']) if fields['photo'] else '',
+                    height=fields.get('height'),
+                    weight=fields.get('weight'),
+                    year=YEAR_ABBREVIATIONS.get(year, year) if year is not None else None,
+                    hometown=fields.get('hometown')
+                ))
+        
+        metrics.count_cards(rows_scanned, len(roster.players))
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+from records import flatten_roster
+
+# Columns of the athletes table filled from records.flatten_roster
+ATHLETE_COLUMNS = [
+    'role', 'number', 'first_name', 'last_name', 'full_name', 'position', 'year', 'hometown', 'height',
+    'height_inches', 'weight', 'title', 'photo'
+]
+
+# Free-text search covers these; the exact-match filters use the B-tree indexes instead
+FTS_COLUMNS = ['full_name', 'team_name', 'hometown', 'position', 'year', 'title']
+
+MAX_RESULTS = 500
+
+SEARCH_TERM = re.compile(r'\w+', re.U)
+
+def fts_query(text):
+    """Turn user input into an FTS5 query: every word must match, as a prefix"""
+    # Quoting each term keeps FTS5 operators and punctuation in user input inert
+    return ' '.join(f'"{term}"*' for term in SEARCH_TERM.findall(text))
+
+class RosterIndex:
+    """Every scraped roster, indexed in SQLite for cross-team athlete search"""
+    
+    # One row per team (its latest roster_data) plus one per person, with an FTS5
+    # table over names, teams and hometowns kept in sync by triggers. Rescraping a
+    # team replaces its people; an unchanged roster is not rewritten. Past
+    # max_teams, the teams indexed least recently are removed with their people.
+    def __init__(self, db_path, max_teams=5000):
+        self.db_path = db_path
+        self.max_teams = max_teams
+        
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS teams (
+                    url TEXT PRIMARY KEY,
+                    team_name TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    roster TEXT NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+            ''')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS athletes (
+                    id INTEGER PRIMARY KEY,
+                    team_url TEXT NOT NULL,
+                    team_name TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    number TEXT NOT NULL,
+                    first_name TEXT NOT NULL,
+                    last_name TEXT NOT NULL,
+                    full_name TEXT NOT NULL,
+                    position TEXT NOT NULL COLLATE NOCASE,
+                    year TEXT NOT NULL COLLATE NOCASE,
+                    hometown TEXT NOT NULL,
+                    height TEXT NOT NULL,
+                    height_inches INTEGER,
+                    weight INTEGER,
+                    title TEXT NOT NULL,
+                    photo TEXT NOT NULL
+                )
+            ''')
+            db.execute('CREATE INDEX IF NOT EXISTS athletes_team_url ON athletes (team_url)')
+            db.execute('CREATE INDEX IF NOT EXISTS athletes_team_name ON athletes (team_name COLLATE NOCASE)')
+            db.execute('CREATE INDEX IF NOT EXISTS athletes_number ON athletes (number)')
+            db.execute('CREATE INDEX IF NOT EXISTS athletes_position ON athletes (position)')
+            db.execute('CREATE INDEX IF NOT EXISTS athletes_year ON athletes (year)')
+            db.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS athletes_fts USING fts5 (
+                    {', '.join(FTS_COLUMNS)},
+                    content='athletes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+            columns = ', '.join(FTS_COLUMNS)
+            old_values = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+            new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+            db.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS athletes_fts_insert AFTER INSERT ON athletes BEGIN
+                    INSERT INTO athletes_fts (rowid, {columns}) VALUES (new.id, {new_values});
+                END
+            ''')
+            db.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS athletes_fts_delete AFTER DELETE ON athletes BEGIN
+                    INSERT INTO athletes_fts (athletes_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                END
+            ''')
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def put(self, url, roster_data):
+        """Index a team's latest roster, returning True if it changed since it was last indexed"""
+        text = json.dumps(roster_data, sort_keys=True)
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        team_name = roster_data.get('team_name', '') or ''
+        
+        with self._connect() as db:
+            row = db.execute('SELECT content_hash FROM teams WHERE url = ?', (url,)).fetchone()
+            if row and row[0] == content_hash:
+                db.execute('UPDATE teams SET indexed_at = ? WHERE url = ?', (time.time(), url))
+                return False
+            
+            db.execute('DELETE FROM athletes WHERE team_url = ?', (url,))
+            db.executemany(
+                f'INSERT INTO athletes (team_url, team_name, {", ".join(ATHLETE_COLUMNS)}) '
+                f'VALUES (?, ?, {", ".join(["?"] * len(ATHLETE_COLUMNS))})',
+                (
+                    [url, team_name] + [record[column] for column in ATHLETE_COLUMNS]
+                    for record in flatten_roster(roster_data, url)
+                )
+            )
+            db.execute(
+                'INSERT OR REPLACE INTO teams (url, team_name, platform, content_hash, roster, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, team_name, roster_data.get('platform', '') or '', content_hash, text, time.time())
+            )
+            if row is None:
+                self._evict(db)
+        return True
+    
+    def _evict(self, db):
+        """Remove the least recently indexed teams past max_teams, people included"""
+        # Only a new team can take the index past the limit, so put() calls this then
+        stale = [
+            url for (url,) in db.execute(
+                'SELECT url FROM teams ORDER BY indexed_at DESC, rowid DESC LIMIT -1 OFFSET ?', (self.max_teams,)
+            )
+        ]
+        db.executemany('DELETE FROM athletes WHERE team_url = ?', ((url,) for url in stale))
+        db.executemany('DELETE FROM teams WHERE url = ?', ((url,) for url in stale))
+    
+    def get(self, url):
+        """The indexed roster_data for a team URL, or None"""
+        with self._connect() as db:
+            row = db.execute('SELECT roster, indexed_at FROM teams WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return {'roster_data': json.loads(row[0]), 'indexed_at': row[1]}
+    
+    def remove(self, url):
+        with self._connect() as db:
+            db.execute('DELETE FROM athletes WHERE team_url = ?', (url,))
+            db.execute('DELETE FROM teams WHERE url = ?', (url,))
+    
+    def search(self, text='', number=None, position=None, year=None, team=None, role=None, limit=50):
+        """Find people across every indexed team.
+
+        text is free text matched against names, team names, hometowns, positions,
+        years and titles (every word, as a prefix). The other filters are exact and
+        case-insensitive; team matches a team name or URL.
+        """
+        conditions = []
+        params = []
+        query = fts_query(text or '')
+        if query:
+            conditions.append('a.id IN (SELECT rowid FROM athletes_fts WHERE athletes_fts MATCH ?)')
+            params.append(query)
+        if number:
+            conditions.append('a.number = ?')
+            params.append(str(number).lstrip('#'))
+        if position:
+            conditions.append('a.position = ?')
+            params.append(position)
+        if year:
+            conditions.append('a.year = ?')
+            params.append(year)
+        if team:
+            conditions.append('(a.team_name = ? COLLATE NOCASE OR a.team_url = ?)')
+            params.extend([team, team])
+        if role:
+            conditions.append('a.role = ?')
+            params.append(role)
+        
+        columns = ', '.join(f'a.{column}' for column in ATHLETE_COLUMNS)
+        sql = f'SELECT a.team_url, a.team_name, {columns} FROM athletes a'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY a.id LIMIT ?'
+        params.append(max(1, min(int(limit), MAX_RESULTS)))
+        
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        names = ['team_url', 'team_name'] + ATHLETE_COLUMNS
+        return [dict(zip(names, row)) for row in rows]
+    
+    def teams(self, text=''):
+        """Indexed teams whose name contains text, with their athlete counts"""
+        sql = '''
+            SELECT t.url, t.team_name, t.platform, t.indexed_at,
+                   (SELECT COUNT(*) FROM athletes a WHERE a.team_url = t.url AND a.role = 'player')
+            FROM teams t
+        '''
+        params = []
+        if text:
+            sql += ' WHERE t.team_name LIKE ?'
+            params.append(f'%{text}%')
+        sql += ' ORDER BY t.team_name'
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        return [
+            {'url': url, 'team_name': team_name, 'platform': platform, 'indexed_at': indexed_at, 'players': players}
+            for url, team_name, platform, indexed_at, players in rows
+        ]
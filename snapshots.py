@@ -0,0 +1,156 @@
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from scraper import person_key
+
+class SnapshotStore:
+    """Keeps past roster_data per team URL in SQLite for change-only rescrapes"""
+    
+    # A new row is only written when a roster actually changes; an unchanged
+    # rescrape just bumps checked_at on the latest row. Past max_urls, the URLs
+    # scraped least recently lose all their snapshots.
+    def __init__(self, db_path, keep=30, max_urls=10000):
+        self.db_path = db_path
+        self.keep = keep  # Snapshots kept per URL
+        self.max_urls = max_urls
+        
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    roster TEXT NOT NULL,
+                    taken_at REAL NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+            ''')
+            db.execute('CREATE INDEX IF NOT EXISTS snapshots_url_taken ON snapshots (url, taken_at)')
+    
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    def latest(self, url, before=None):
+        """Most recent snapshot for a URL (taken at or before `before`), or None"""
+        query = 'SELECT roster, taken_at, checked_at FROM snapshots WHERE url = ?'
+        params = [url]
+        if before is not None:
+            query += ' AND taken_at <= ?'
+            params.append(before)
+        query += ' ORDER BY taken_at DESC, id DESC LIMIT 1'
+        
+        with self._connect() as db:
+            row = db.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return {'roster_data': json.loads(row[0]), 'taken_at': row[1], 'checked_at': row[2]}
+    
+    def save(self, url, roster_data):
+        """Record a scrape of a URL, returning True if the roster changed"""
+        text = json.dumps(roster_data, sort_keys=True)
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        now = time.time()
+        
+        with self._connect() as db:
+            row = db.execute(
+                'SELECT id, content_hash FROM snapshots WHERE url = ? ORDER BY taken_at DESC, id DESC LIMIT 1',
+                (url,)
+            ).fetchone()
+            if row and row[1] == content_hash:
+                db.execute('UPDATE snapshots SET checked_at = ? WHERE id = ?', (now, row[0]))
+                return False
+            
+            db.execute(
+                'INSERT INTO snapshots (url, content_hash, roster, taken_at, checked_at) VALUES (?, ?, ?, ?, ?)',
+                (url, content_hash, text, now, now)
+            )
+            db.execute(
+                'DELETE FROM snapshots WHERE url = ? AND id NOT IN '
+                '(SELECT id FROM snapshots WHERE url = ? ORDER BY taken_at DESC, id DESC LIMIT ?)',
+                (url, url, self.keep)
+            )
+            if row is None:
+                self._evict(db)
+        return True
+    
+    def _evict(self, db):
+        """Drop every snapshot of the least recently scraped URLs past max_urls"""
+        # Only a URL's first snapshot can take the store past the limit, so save() calls this then
+        db.execute(
+            'DELETE FROM snapshots WHERE url IN '
+            '(SELECT url FROM snapshots GROUP BY url ORDER BY MAX(checked_at) DESC, MAX(id) DESC LIMIT -1 OFFSET ?)',
+            (self.max_urls,)
+        )
+
+def _by_key(people):
+    """Index people by person_key, numbering repeats so none are dropped"""
+    keyed = {}
+    for person in people:
+        key = person_key(person)
+        if key in keyed:
+            suffix = 2
+            while f'{key}#{suffix}' in keyed:
+                suffix += 1
+            key = f'{key}#{suffix}'
+        keyed[key] = person
+    return keyed
+
+def _diff_people(old_people, new_people):
+    old = _by_key(old_people)
+    new = _by_key(new_people)
+    changes = {
+        'added': [new[key] for key in new if key not in old],
+        'removed': [old[key] for key in old if key not in new],
+        'changed': []
+    }
+    for key in new:
+        if key not in old or old[key] == new[key]:
+            continue
+        fields = sorted(
+            field for field in set(old[key]) | set(new[key])
+            if old[key].get(field, '') != new[key].get(field, '')
+        )
+        if fields:
+            changes['changed'].append({
+                'key': key,
+                'fields': fields,
+                'before': {field: old[key].get(field, '') for field in fields},
+                'after': new[key]
+            })
+    return changes
+
+def diff_rosters(old, new):
+    """Compare two roster_data dicts by the first_name_last_name keys of their people"""
+    old = old or {}
+    delta = {
+        'team_name': new.get('team_name', ''),
+        'platform': new.get('platform', ''),
+        'players': _diff_people(old.get('players', []), new.get('players', [])),
+        'coaches': _diff_people(old.get('coaches', []), new.get('coaches', []))
+    }
+    if old.get('team_name', '') != delta['team_name']:
+        delta['team_name_before'] = old.get('team_name', '')
+    delta['changed'] = 'team_name_before' in delta or any(
+        delta[group][kind] for group in ('players', 'coaches') for kind in ('added', 'removed', 'changed')
+    )
+    return delta
+
+def parse_since(value):
+    """Turn a ?since= value (ISO-8601, unix seconds or 'last') into unix seconds or None"""
+    if value in ('', 'last', 'latest'):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
@@ -0,0 +1,133 @@
+import codecs
+from html.parser import HTMLParser
+
+# Elements that never get a closing tag, so they must not be pushed on the stack
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+
+class RosterStreamParser(HTMLParser):
+    """Tracks where the roster's person cards start and end while a page streams in"""
+    
+    def __init__(self, card_class):
+        super().__init__(convert_charrefs=False)
+        self.card_class = card_class
+        self.stack = []  # (tag, (line, col)) for every open element
+        self.common_path = None  # Innermost ancestor chain shared by every card seen
+        self.cards = 0
+        self.left_roster = None  # Position of the end tag that closed the shared ancestor
+        self.title_span = [None, None]
+    
+    def handle_starttag(self, tag, attrs):
+        pos = self.getpos()
+        if tag == 'title' and self.title_span[0] is None:
+            self.title_span[0] = pos
+        if tag in VOID_TAGS:
+            return
+        
+        entry = (tag, pos)
+        self.stack.append(entry)
+        
+        if tag in ('div', 'li', 'article') and self._is_card(attrs):
+            self.cards += 1
+            if self.common_path is None:
+                self.common_path = list(self.stack)
+            else:
+                # The shared ancestor is the longest common prefix of both chains
+                depth = 0
+                for ours, theirs in zip(self.common_path, self.stack):
+                    if ours is not theirs:
+                        break
+                    depth += 1
+                del self.common_path[depth:]
+            self.left_roster = None
+    
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing syntax (<div/>) opens nothing, so never touch the stack
+        if tag == 'title' and self.title_span[0] is None:
+            self.title_span[0] = self.getpos()
+    
+    def handle_endtag(self, tag):
+        if tag == 'title' and self.title_span[0] is not None and self.title_span[1] is None:
+            self.title_span[1] = self.getpos()
+        
+        # Pop up to the matching open tag, tolerating unclosed children
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                del self.stack[index:]
+                break
+        else:
+            return
+        
+        if self.common_path and self.left_roster is None and len(self.stack) < len(self.common_path):
+            self.left_roster = self.getpos()
+    
+    def _is_card(self, attrs):
+        for name, value in attrs:
+            if name == 'class' and value and self.card_class.search(value):
+                return True
+            if name in ('data-player', 'data-athlete'):
+                return True
+        return False
+    
+    def roster_start(self):
+        """Position of the start tag of the element enclosing every card"""
+        return self.common_path[-1][1]
+
+def _offset(text, pos):
+    """Convert an HTMLParser (line, col) position into an index into text"""
+    line, col = pos
+    index = 0
+    for _ in range(line - 1):
+        index = text.index('\n', index) + 1
+    return index + col
+
+def read_roster_stream(response, card_class, is_card_platform, slack=64 * 1024, chunk_size=16 * 1024):
+    """Read a streamed response until the person cards have been consumed"""
+    # Returns {'html': everything read, 'complete': whether the body was read to
+    # the end, 'roster_html': just the title plus the card container, or None}
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    parser = RosterStreamParser(card_class)
+    chunks = []
+    read_since_roster = 0
+    stop_allowed = None
+    complete = True
+    
+    for raw in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(raw)
+        chunks.append(text)
+        parser.feed(text)
+        
+        if parser.left_roster is None:
+            read_since_roster = 0
+            continue
+        
+        # Keep reading a little past the card list - staff cards usually
+        # follow the players in a sibling section
+        read_since_roster += len(text)
+        if read_since_roster < slack:
+            continue
+        
+        # Only card-based platforms are safe to cut off; table layouts need the rest
+        if stop_allowed is None:
+            stop_allowed = is_card_platform(''.join(chunks))
+        if stop_allowed:
+            complete = False
+            break
+    
+    if complete:
+        chunks.append(decoder.decode(b'', final=True))
+    html_content = ''.join(chunks)
+    
+    if complete or parser.left_roster is None:
+        return {'html': html_content, 'complete': complete, 'roster_html': None}
+    
+    start = _offset(html_content, parser.roster_start())
+    end = _offset(html_content, parser.left_roster)
+    title = ''
+    if parser.title_span[0] is not None and parser.title_span[1] is not None:
+        title = html_content[_offset(html_content, parser.title_span[0]):_offset(html_content, parser.title_span[1])] + '</title>'
+    
+    roster_html = f'<html><head>{title}</head><body>{html_content[start:end]}</body></html>'
+    return {'html': html_content, 'complete': complete, 'roster_html': roster_html}
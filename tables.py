@@ -0,0 +1,157 @@
+import re
+
+# Roster tables on Presto and hand-built sites: each table is judged by its header
+# rows before any of its body rows are read, so layout, schedule and stats tables
+# cost a few rows each. Columns are mapped once per table; rows are then read in a
+# single pass touching only the mapped cells.
+
+# Normalized header text -> field
+HEADER_ALIASES = {
+    '#': 'number', 'no': 'number', 'num': 'number', 'number': 'number', 'jersey': 'number', 'jersey number': 'number',
+    'name': 'name', 'player': 'name', 'athlete': 'name', 'full name': 'name', 'player name': 'name',
+    'first': 'first_name', 'first name': 'first_name',
+    'last': 'last_name', 'last name': 'last_name',
+    'pos': 'position', 'position': 'position',
+    'yr': 'year', 'year': 'year', 'cl': 'year', 'class': 'year', 'academic year': 'year', 'elig': 'year',
+    'eligibility': 'year', 'exp': 'year',
+    'ht': 'height', 'height': 'height',
+    'wt': 'weight', 'weight': 'weight',
+    'hometown': 'hometown', 'home town': 'hometown'
+}
+
+# A table is a roster when it has a name column and at least one of these
+DETAIL_FIELDS = ('number', 'position', 'year', 'height', 'weight', 'hometown')
+
+HEADER_NOISE = re.compile(r'[^a-z0-9# ]+')
+SPACES = re.compile(r'\s+')
+WEIGHT_DIGITS = re.compile(r'\d{2,3}')
+
+def normalize_header(text):
+    """'Pos.' -> 'pos', 'Hometown / High School' -> 'hometown high school'"""
+    return SPACES.sub(' ', HEADER_NOISE.sub(' ', text.lower())).strip()
+
+def map_header(texts):
+    """Map header cell texts to {field: column index}, or None if they don't describe a roster"""
+    columns = {}
+    for index, text in enumerate(texts):
+        key = normalize_header(text)
+        field = HEADER_ALIASES.get(key)
+        if field is None and key.startswith('hometown'):
+            # "Hometown / High School", "Hometown (Previous School)" and the like
+            field = 'hometown'
+        if field and field not in columns:
+            columns[field] = index
+    has_name = 'name' in columns or ('first_name' in columns and 'last_name' in columns)
+    if not has_name or not any(field in columns for field in DETAIL_FIELDS):
+        return None
+    return columns
+
+def guess_columns(texts):
+    """Columns for a table without a header, from its first row: a jersey number and a two-word name"""
+    number = next((index for index, text in enumerate(texts) if text.isdigit() and len(text) <= 3), None)
+    if number is None:
+        return None
+    name = next((
+        index for index, text in enumerate(texts)
+        if index != number and len(text.split()) >= 2 and not any(char.isdigit() for char in text)
+    ), None)
+    if name is None:
+        return None
+    return {'number': number, 'name': name}
+
+CELL_TAGS = ('td', 'th')
+
+def _cells(row):
+    # Walking the children directly skips bs4's filter machinery, which dominates
+    # extraction time when it runs for every row
+    return [child for child in row.children if child.name in CELL_TAGS]
+
+def _text(cell):
+    return ' '.join(cell.get_text().split())
+
+def _cell_texts(row):
+    return [_text(cell) for cell in _cells(row)]
+
+def _first_img(row):
+    for node in row.descendants:
+        if node.name == 'img':
+            return node
+    return None
+
+# Rows searched for the header: a title row (<th colspan>, a caption-like <td>)
+# often sits above it
+HEADER_ROWS = 3
+
+def _is_header_row(row):
+    # A lone cell is a title row (<th colspan="6">2025-26 Roster</th>), not a header
+    if len(_cells(row)) < 2:
+        return False
+    return row.find('th') is not None or row.find_parent('thead') is not None
+
+def read_table(table, fallback=None):
+    """(columns, body rows) for a roster table, or None to skip it.
+
+    The header is looked for in the first few rows whatever their cell tag, since
+    hand-built tables often mark it up as <td><b>Name</b></td>. fallback is a column
+    map for tables whose header can't be read (e.g. the fixed Presto layout);
+    without one, tables with no <th> header are judged by a row that looks like a
+    person (a jersey number and a two-word name).
+    """
+    first_rows = table.find_all('tr', limit=HEADER_ROWS)
+    if not first_rows:
+        return None
+    for index, row in enumerate(first_rows):
+        columns = map_header(_cell_texts(row))
+        if columns is not None:
+            return columns, table.find_all('tr')[index + 1:]
+    if fallback is not None:
+        return fallback, table.find_all('tr')[1:]
+    if any(_is_header_row(row) for row in first_rows):
+        # A <th> header that doesn't describe a roster: schedules, stats, layout
+        return None
+    for index, row in enumerate(first_rows):
+        columns = guess_columns(_cell_texts(row))
+        if columns is not None:
+            return columns, table.find_all('tr')[index:]
+    return None
+
+def row_fields(row, columns, min_cells=2):
+    """The mapped fields of one body row as text, or None for rows that can't hold a person"""
+    cells = _cells(row)
+    if len(cells) < min_cells:
+        return None
+    fields = {}
+    for field, index in columns.items():
+        if -len(cells) <= index < len(cells):
+            fields[field] = _text(cells[index])
+    
+    first_name = fields.pop('first_name', '')
+    last_name = fields.pop('last_name', '')
+    name = fields.pop('name', '')
+    if name and not (first_name and last_name):
+        if ',' in name:
+            # "Green, Jalen"
+            last_name, _, first_name = (part.strip() for part in name.partition(','))
+        else:
+            name_parts = name.split()
+            if len(name_parts) >= 2:
+                first_name = name_parts[0]
+                last_name = ' '.join(name_parts[1:])
+    if not (first_name and last_name):
+        return None
+    fields['first_name'] = first_name
+    fields['last_name'] = last_name
+    
+    if 'number' in fields:
+        fields['number'] = fields['number'].lstrip('#')
+    if 'weight' in fields:
+        # Kept as bare pounds, like the card parser reads it
+        weight = WEIGHT_DIGITS.search(fields['weight'])
+        fields['weight'] = weight.group() if weight else ''
+    if 'hometown' in fields:
+        # Combined "Hometown / High School" columns keep just the hometown
+        fields['hometown'] = fields['hometown'].split(' / ')[0].strip()
+    
+    img = _first_img(row)
+    fields['photo'] = img.get('src', '') if img else ''
+    return fields
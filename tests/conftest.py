@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the repo root, next to app.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CORPUS = os.path.join(ROOT, 'benchmarks', 'corpus')
@@ -0,0 +1,100 @@
+"""Every parser backend must give the platform parsers the same tree to work on"""
+import glob
+import os
+
+import pytest
+
+from backends import available_backends
+from conftest import CORPUS
+from scraper import RosterScraper
+
+PLATFORMS = ['sidearm', 'presto', 'generic']
+REFERENCE = 'html.parser'
+OTHER_BACKENDS = [backend for backend in available_backends() if backend != REFERENCE]
+
+URL = 'https://example.edu/sports/mens-basketball/roster'
+
+# Markup where the tree builders disagree: html.parser nests unclosed elements
+# inside each other, lxml and lexbor close them the way browsers do
+MALFORMED = {
+    'unclosed_li': '''
+        <html><head><title>Roster - Test State</title></head><body>
+        <ul>
+          <li class="sidearm-roster-player"><div class="sidearm-roster-player-name">
+            <span class="sidearm-roster-player-jersey-number">3</span><h3><a href="/p/1">Jalen Green</a></h3></div>
+            <div class="sidearm-roster-player-position"><span class="text-bold">G</span>
+            <span class="sidearm-roster-player-height">6-4</span></div>
+          <li class="sidearm-roster-player"><div class="sidearm-roster-player-name">
+            <span class="sidearm-roster-player-jersey-number">11</span><h3><a href="/p/2">Marcus Hale</a></h3></div>
+            <div class="sidearm-roster-player-position"><span class="text-bold">F</span></div>
+          <li class="sidearm-roster-player"><div class="sidearm-roster-player-name">
+            <span class="sidearm-roster-player-jersey-number">24</span><h3><a href="/p/3">Owen Pratt</a></h3></div>
+        </ul>
+        </body></html>
+    ''',
+    'unclosed_p': '''
+        <html><head><title>Roster</title></head><body>
+        <p>2025-26 Roster
+        <table>
+          <tr><th>No.</th><th>Name</th><th>Pos.</th><th>Yr.</th></tr>
+          <tr><td>2<td>Avery Collins<td>OF<td>Fr.
+          <tr><td>11<td><p>Brooke Tanner<td>P<td>Jr.
+          <tr><td>22<td>Kendall Shaw<p><td>1B<td>So.
+        </table>
+        <p>Coaches
+        <div class="s-person-card"><p>Head Coach<p>Dana Reyes</div>
+        </body></html>
+    ''',
+    'stray_tags': '''
+        <html><head><title>Women's Basketball Roster</title><body>
+        <table class="roster">
+          <thead><tr><th>#<th>Name<th>Position<th>Hometown</tr></thead>
+          <tbody>
+          <tr><td>5</td><td><a href="/p/5">Nia Brooks</td><td>G</td><td>Tulsa, Okla.</td></tr></b>
+          <tr><td>14</td><td>Sam Ortiz</i></td><td>F</td><td>Austin, Texas</td>
+          <tr><td>30</td><td>Lee Park</td><td>C</td></tr></span>
+        </table>
+        </body></html>
+    '''
+}
+
+def corpus_pages():
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(CORPUS, '*.html')))
+
+def read_page(name):
+    with open(os.path.join(CORPUS, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def parse(html_content, backend, platform):
+    return RosterScraper(parser=backend).scrape_from_html(html_content, URL, platform=platform)
+
+needs_fast_backend = pytest.mark.skipif(not OTHER_BACKENDS, reason='only html.parser is installed')
+
+@needs_fast_backend
+@pytest.mark.parametrize('backend', OTHER_BACKENDS)
+@pytest.mark.parametrize('platform', PLATFORMS)
+@pytest.mark.parametrize('page', corpus_pages())
+def test_corpus_parity(page, platform, backend):
+    html_content = read_page(page)
+    assert parse(html_content, backend, platform) == parse(html_content, REFERENCE, platform)
+
+@needs_fast_backend
+@pytest.mark.parametrize('backend', OTHER_BACKENDS)
+@pytest.mark.parametrize('platform', PLATFORMS)
+@pytest.mark.parametrize('name', sorted(MALFORMED))
+def test_malformed_parity(name, platform, backend):
+    html_content = MALFORMED[name]
+    assert parse(html_content, backend, platform) == parse(html_content, REFERENCE, platform)
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('page', corpus_pages())
+def test_detected_platform(page, backend):
+    # Detection runs on the raw HTML, so it can't depend on the backend either
+    roster_data = RosterScraper(parser=backend).scrape_from_html(read_page(page), URL)
+    assert roster_data['platform'] == RosterScraper().scrape_from_html(read_page(page), URL)['platform']
+
+def test_malformed_rosters_are_read():
+    # Parity alone would pass if every backend dropped the same people
+    assert len(parse(MALFORMED['unclosed_li'], REFERENCE, 'sidearm')['players']) == 3
+    assert len(parse(MALFORMED['unclosed_p'], REFERENCE, 'generic')['players']) == 3
+    assert len(parse(MALFORMED['stray_tags'], REFERENCE, 'presto')['players']) == 3
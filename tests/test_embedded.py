@@ -0,0 +1,35 @@
+"""Embedded JSON / JSON-LD roster payloads"""
+import json
+
+from embedded import person_fields
+from scraper import RosterScraper
+
+URL = 'https://teststate.com/sports/mens-basketball/roster'
+
+def json_ld_page(heights):
+    people = [
+        {'@type': 'Person', 'name': name, 'jobTitle': 'Guard', 'height': height}
+        for name, height in heights
+    ]
+    payload = {'@context': 'https://schema.org', '@type': 'SportsTeam', 'name': 'Test State', 'athlete': people}
+    return (f'<html><head><title>Roster - Test State</title>'
+            f'<script type="application/ld+json">{json.dumps(payload)}</script></head><body></body></html>')
+
+def test_quantitative_height_in_inches():
+    assert person_fields({'name': 'Jalen Green', 'height': {'value': 77, 'unitCode': 'INH'}})['height'] == '6-5'
+    assert person_fields({'name': 'Jalen Green', 'height': {'value': '74.0', 'unitCode': 'INH'}})['height'] == '6-2'
+
+def test_non_numeric_quantitative_height():
+    for value, expected in (('6-2', '6-2'), ('6\' 2"', '6-2'), ('tall', ''), (None, ''), ('nan', ''), ('inf', '')):
+        height = {'@type': 'QuantitativeValue', 'value': value, 'unitCode': 'INH'}
+        assert person_fields({'name': 'Jalen Green', 'height': height})['height'] == expected
+
+def test_bad_height_does_not_fail_the_scrape():
+    page = json_ld_page([
+        ('Jalen Green', {'@type': 'QuantitativeValue', 'value': '6-2', 'unitCode': 'INH'}),
+        ('Marcus Hale', {'@type': 'QuantitativeValue', 'value': '6\' 8"', 'unitCode': 'INH'}),
+    ])
+    roster_data = RosterScraper(parser='html.parser').scrape_from_html(page, URL, 'sidearm')
+    assert [(player['last_name'], player['height']) for player in roster_data['players']] == [
+        ('Green', '6-2'), ('Hale', '6-8')
+    ]
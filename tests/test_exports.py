@@ -0,0 +1,35 @@
+"""Export endpoints reject bad input before their stream starts"""
+import pytest
+
+ROSTER = {
+    'team_name': 'Test State',
+    'players': [{'number': '3', 'first_name': 'Jalen', 'last_name': 'Green', 'position': 'G'}],
+    'coaches': []
+}
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    for name in ('ROSTER_JOBS_DB', 'ROSTER_SNAPSHOTS_DB', 'ROSTER_SITE_PROFILES_DB', 'ROSTER_INDEX_DB'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    monkeypatch.setenv('ROSTER_PHOTO_DIR', 'off')
+    import app as app_module
+    return app_module.app.test_client()
+
+@pytest.mark.parametrize('sport', [None, 7, ['baseball'], {'name': 'baseball'}])
+def test_non_string_sport_is_rejected(client, sport):
+    response = client.post('/export/csv', json={'roster_data': ROSTER, 'sport': sport})
+    assert response.status_code == 400
+    for export_format in ('csv', 'zip', 'ndjson'):
+        response = client.post('/export/bulk', json={'format': export_format, 'sport': sport,
+                                                     'rosters': [{'roster_data': ROSTER}]})
+        assert response.status_code == 400
+        response = client.post('/export/bulk', json={'format': export_format,
+                                                     'rosters': [{'roster_data': ROSTER, 'sport': sport}]})
+        assert response.status_code == 400
+
+def test_bulk_filename_names_the_sport(client):
+    response = client.post('/export/bulk', json={'format': 'csv', 'sport': 'softball',
+                                                 'rosters': [{'roster_data': ROSTER}]})
+    assert response.status_code == 200
+    assert 'Softball_rosters.csv' in response.headers['Content-Disposition']
+    assert b'Green' in response.get_data()
@@ -0,0 +1,79 @@
+"""Background job queue: state in SQLite, opt-in through ROSTER_JOBS_DB"""
+import json
+import os
+import runpy
+import sqlite3
+import time
+
+import pytest
+
+from conftest import ROOT
+from jobs import FAILED, RUNNING, JobQueue
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(lambda data: {'echo': data['value']}, str(tmp_path / 'jobs.sqlite3'), max_workers=1)
+    yield queue
+    queue.executor.shutdown(wait=True)
+
+def add_job(queue, job_id, pid, host):
+    with queue._connect() as db:
+        db.execute(
+            'INSERT INTO jobs (id, status, request, worker_pid, worker_host, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (job_id, RUNNING, json.dumps({}), pid, host, time.time())
+        )
+
+def dead_pid():
+    # Far above any default pid_max, so no process has it
+    return 2 ** 30
+
+def test_job_runs_and_finishes(queue):
+    job_id = queue.submit({'value': 7})
+    job = queue.wait(job_id, 10)
+    assert job['status'] == 'done'
+    assert job['result'] == {'echo': 7}
+
+def test_dead_local_worker_fails_the_job(queue):
+    add_job(queue, 'local', dead_pid(), queue.host)
+    job = queue.get('local')
+    assert job['status'] == FAILED
+    assert 'exited' in job['error']
+
+def test_job_from_another_host_is_left_alone(queue):
+    add_job(queue, 'remote', dead_pid(), queue.host + '-elsewhere')
+    assert queue.get('remote')['status'] == RUNNING
+
+def test_old_job_files_gain_the_host_column(tmp_path):
+    path = str(tmp_path / 'old.sqlite3')
+    with sqlite3.connect(path) as db:
+        db.execute('CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, '
+                   'result TEXT, error TEXT, worker_pid INTEGER, created_at REAL NOT NULL, started_at REAL, '
+                   'finished_at REAL)')
+        db.execute('INSERT INTO jobs (id, status, request, worker_pid, created_at) VALUES (?, ?, ?, ?, ?)',
+                   ('old', RUNNING, '{}', dead_pid(), time.time()))
+    queue = JobQueue(lambda data: {}, path, max_workers=1)
+    try:
+        # Written before hosts were recorded, so treated as local
+        assert queue.get('old')['status'] == FAILED
+    finally:
+        queue.executor.shutdown(wait=True)
+
+def test_jobs_are_off_without_a_database(monkeypatch, tmp_path):
+    monkeypatch.delenv('ROSTER_JOBS_DB', raising=False)
+    for name in ('ROSTER_SNAPSHOTS_DB', 'ROSTER_INDEX_DB'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    monkeypatch.setenv('ROSTER_PHOTO_DIR', 'off')
+    namespace = runpy.run_path(os.path.join(ROOT, 'app.py'), run_name='app_without_jobs')
+    assert namespace['job_queue'] is None
+    
+    client = namespace['app'].test_client()
+    scrape = {'method': 'html', 'html': '<html></html>'}
+    assert client.post('/jobs', json=scrape).status_code == 400
+    response = client.post('/scrape', json=dict(scrape, **{'async': True}))
+    assert response.status_code == 400
+    assert 'ROSTER_JOBS_DB' in response.get_json()['error']
+    assert client.get('/jobs/abc').status_code == 404
+    response = client.post('/export/bulk', json={'job_ids': ['abc']})
+    assert response.status_code == 400
+    # Inline scrapes don't need the queue
+    assert client.post('/scrape', json=scrape).status_code == 200
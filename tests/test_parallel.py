@@ -0,0 +1,32 @@
+"""Parse-pool workers: results match in-process parsing, and workers skip the app's setup"""
+import os
+import runpy
+
+from conftest import CORPUS, ROOT
+from parallel import ParsePool
+from scraper import RosterScraper
+
+URL = 'https://example.edu/sports/mens-basketball/roster'
+
+def test_pool_matches_in_process_parsing():
+    documents = []
+    for name in ('sidearm_nextgen_mbb.html', 'presto_wvball.html', 'generic_wbb.html'):
+        with open(os.path.join(CORPUS, name), 'r', encoding='utf-8') as f:
+            documents.append((f.read(), URL))
+    pool = ParsePool(processes=2, parser='html.parser')
+    try:
+        pooled = pool.map(documents)
+    finally:
+        pool.shutdown()
+    scraper = RosterScraper(parser='html.parser')
+    assert pooled == [scraper.scrape_from_html(html_content, url) for html_content, url in documents]
+
+def test_spawned_worker_skips_app_setup(monkeypatch, tmp_path):
+    for name in ('ROSTER_JOBS_DB', 'ROSTER_SNAPSHOTS_DB', 'ROSTER_SITE_PROFILES_DB', 'ROSTER_INDEX_DB'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    monkeypatch.setenv('ROSTER_PHOTO_DIR', str(tmp_path / 'photos'))
+    # What a spawned worker does with the main script under `python app.py`
+    namespace = runpy.run_path(os.path.join(ROOT, 'app.py'), run_name='__mp_main__')
+    assert 'app' in namespace
+    assert 'job_queue' not in namespace and 'scraper' not in namespace
+    assert os.listdir(tmp_path) == []
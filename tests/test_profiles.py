@@ -0,0 +1,70 @@
+"""Learned site profiles must never drop people the full cascade would find"""
+import pytest
+
+import metrics
+from profiles import SiteProfileStore, page_key
+from scraper import RosterScraper
+
+def card(card_class, name, number='', position='', title=''):
+    return f'''
+        <li class="{card_class}">
+          <h3><a href="/roster/{name.replace(' ', '-').lower()}">{name}</a></h3>
+          <span class="s-stamp__text">{number}</span>
+          <div class="s-person-details__bio-stats-item">{position}</div>
+          <div class="s-person-card__title">{title}</div>
+        </li>'''
+
+def page(cards):
+    return f'''<html><head><title>Roster - Test State Athletics</title></head><body>
+        <ul>{''.join(cards)}</ul></body></html>'''
+
+PLAYERS = [card('s-person-card', 'Jalen Green', '3', 'G'), card('s-person-card', 'Marcus Hale', '11', 'F')]
+
+# Every person in one card type
+PAGE_A = page(PLAYERS + [card('s-person-card', 'Dana Reyes', title='Head Coach')])
+
+# Same host, but coaches use a second card type
+PAGE_B = page(PLAYERS + [
+    card('roster-card staff', 'Dana Reyes', title='Head Coach'),
+    card('roster-card staff', 'Chris Lowe', title='Assistant Coach')
+])
+
+URL_A = 'https://teststate.com/sports/mens-basketball/roster'
+URL_B = 'https://teststate.com/sports/womens-basketball/roster'
+
+@pytest.fixture
+def profiled_scraper(tmp_path):
+    return RosterScraper(parser='html.parser', site_profiles=SiteProfileStore(str(tmp_path / 'profiles.sqlite3')))
+
+def names(roster_data, role):
+    return [person['last_name'] for person in roster_data[role]]
+
+def test_page_key_includes_path():
+    assert page_key(URL_A) != page_key(URL_B)
+    assert page_key('https://TestState.com/Sports/MBB/Roster/') == page_key('https://teststate.com/sports/mbb/roster')
+
+def test_profile_is_learned_and_reused(profiled_scraper):
+    cold = profiled_scraper.scrape_from_html(PAGE_A, URL_A, 'sidearm')
+    assert profiled_scraper.site_profiles.get(page_key(URL_A)) is not None
+    hits = metrics.SITE_PROFILES._series.get(('hit',), 0)
+    warm = profiled_scraper.scrape_from_html(PAGE_A, URL_A, 'sidearm')
+    assert warm == cold
+    assert metrics.SITE_PROFILES._series.get(('hit',), 0) == hits + 1
+
+def test_profile_from_another_page_is_not_applied(profiled_scraper):
+    cold = RosterScraper(parser='html.parser').scrape_from_html(PAGE_B, URL_B, 'sidearm')
+    assert names(cold, 'coaches') == ['Reyes', 'Lowe']
+    
+    profiled_scraper.scrape_from_html(PAGE_A, URL_A, 'sidearm')
+    warm = profiled_scraper.scrape_from_html(PAGE_B, URL_B, 'sidearm')
+    assert warm == cold
+
+def test_stray_cards_fall_back_to_the_cascade(profiled_scraper):
+    # The page learned with one card type later adds a second one
+    profiled_scraper.scrape_from_html(PAGE_A, URL_A, 'sidearm')
+    learned = profiled_scraper.site_profiles.get(page_key(URL_A))
+    
+    roster_data = profiled_scraper.scrape_from_html(PAGE_B, URL_A, 'sidearm')
+    assert names(roster_data, 'players') == ['Green', 'Hale']
+    assert names(roster_data, 'coaches') == ['Reyes', 'Lowe']
+    assert profiled_scraper.site_profiles.get(page_key(URL_A)) != learned
@@ -0,0 +1,82 @@
+"""Slotted Player/Coach/Roster records: memory, JSON shape and the dict-style shim"""
+import glob
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from conftest import CORPUS
+from records import Coach, Player, Roster
+from scraper import RosterScraper
+
+PAGES = sorted(glob.glob(os.path.join(CORPUS, '*.html')))
+
+URL = 'https://example.edu/sports/mens-basketball/roster'
+
+# Keys of each person as the dict-building parsers returned them, in order.
+# Fields read since (year, hometown) may only follow them.
+SIDEARM_PLAYER_KEYS = ['number', 'first_name', 'last_name', 'full_name', 'position', 'photo', 'height', 'weight']
+PRESTO_PLAYER_KEYS = ['number', 'first_name', 'last_name', 'position', 'photo']
+COACH_KEYS = ['first_name', 'last_name', 'full_name', 'title', 'photo', 'dropline1', 'dropline2']
+
+def corpus_roster(name):
+    with open(os.path.join(CORPUS, name), 'r', encoding='utf-8') as f:
+        return RosterScraper(parser='html.parser').scrape_from_html(f.read(), URL)
+
+def held_bytes(build):
+    """Bytes still allocated after build() returns, while its result is alive"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+def test_records_hold_less_memory_than_dicts():
+    texts = [json.dumps(corpus_roster(path)) for path in PAGES]
+    # Decoding JSON gives every copy its own strings, like separate scrapes would
+    as_dicts, _ = held_bytes(lambda: [json.loads(text) for _ in range(50) for text in texts])
+    as_records, _ = held_bytes(lambda: [Roster.from_dict(json.loads(text)) for _ in range(50) for text in texts])
+    assert as_records < as_dicts * 0.75
+
+def test_player_is_smaller_than_its_dict():
+    player = Player('3', 'Jalen', 'Green', 'Jalen Green', 'G', '/p/1.jpg', '6-4', '190', 'Jr', 'Tulsa, Okla.')
+    assert not hasattr(player, '__dict__')
+    assert sys.getsizeof(player) < sys.getsizeof(player.to_dict())
+
+@pytest.mark.parametrize('path', PAGES, ids=os.path.basename)
+def test_to_dict_round_trips(path):
+    roster_data = corpus_roster(path)
+    # Same keys, values and order: the JSON text itself is unchanged
+    assert json.dumps(Roster.from_dict(roster_data).to_dict()) == json.dumps(roster_data)
+
+def test_to_dict_keeps_the_baseline_shape():
+    roster_data = corpus_roster('sidearm_nextgen_mbb.html')
+    assert list(roster_data) == ['team_name', 'coaches', 'players', 'platform']
+    for player in roster_data['players']:
+        assert list(player)[:len(SIDEARM_PLAYER_KEYS)] == SIDEARM_PLAYER_KEYS
+    for coach in roster_data['coaches']:
+        assert list(coach) == COACH_KEYS
+    for player in corpus_roster('presto_wvball.html')['players']:
+        assert list(player)[:len(PRESTO_PLAYER_KEYS)] == PRESTO_PLAYER_KEYS
+
+def test_unset_fields_are_left_out():
+    assert Player('3', 'Jalen', 'Green').to_dict() == {
+        'number': '3', 'first_name': 'Jalen', 'last_name': 'Green', 'position': '', 'photo': ''
+    }
+    assert 'photo' not in Coach('Dana', 'Reyes', title='HEAD COACH').to_dict()
+
+def test_get_shim_reads_like_a_dict():
+    player = Player('3', 'Jalen', 'Green', position='G', height='6-4')
+    assert player.get('last_name') == 'Green'
+    assert player.get('height') == '6-4'
+    # Unset and unknown fields fall back to the default, as dict.get would
+    assert player.get('year') is None
+    assert player.get('year', '') == ''
+    assert player.get('title', 'none') == 'none'
+    coach = Coach('Dana', 'Reyes', title='HEAD COACH')
+    assert coach.get('title') == 'HEAD COACH'
+    assert coach.get('photo', '') == ''
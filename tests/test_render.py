@@ -0,0 +1,273 @@
+"""Headless render mode, against a local static server (no network)"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+
+import render
+from scraper import RosterScraper
+
+# Cards are added by JavaScript after load, like the rosters render mode is for
+JS_ROSTER = '''<!DOCTYPE html>
+<html><head><title>Men's Basketball Roster - Test State</title>
+<script src="https://securepubads.g.doubleclick.net/tag/js/gpt.js"></script>
+</head><body>
+<ul id="roster"></ul>
+<script>
+setTimeout(function () {
+    var people = [['3', 'Jalen', 'Green', 'G'], ['11', 'Marcus', 'Hale', 'F'], ['24', 'Owen', 'Pratt', 'C']];
+    var list = document.getElementById('roster');
+    people.forEach(function (person, index) {
+        var card = document.createElement('li');
+        card.className = 'sidearm-roster-player';
+        card.innerHTML = '<div class="sidearm-roster-player-image"><img src="/img/p' + index + '.jpg"></div>' +
+            '<div class="sidearm-roster-player-name"><span class="sidearm-roster-player-jersey-number">' +
+            person[0] + '</span><h3><a href="/p/' + index + '">' + person[1] + ' ' + person[2] + '</a></h3></div>' +
+            '<div class="sidearm-roster-player-position"><span class="text-bold">' + person[3] + '</span></div>';
+        list.appendChild(card);
+    });
+}, 200);
+</script>
+</body></html>
+'''
+
+class SiteHandler(BaseHTTPRequestHandler):
+    requested = []
+    
+    def do_GET(self):
+        SiteHandler.requested.append(self.path)
+        if self.path == '/roster':
+            body, content_type = JS_ROSTER.encode('utf-8'), 'text/html; charset=utf-8'
+        elif self.path.startswith('/img/'):
+            body, content_type = b'\xff\xd8\xff\xe0 not really a jpeg', 'image/jpeg'
+        elif self.path == '/hang':
+            # Never answers within any render's deadline
+            time.sleep(30)
+            return
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+class FakeBrowser:
+    """Just enough of playwright's Browser for RendererPool, with a crash switch"""
+    
+    def __init__(self, html):
+        self.html = html
+        self.connected = True
+        self.crash_on_goto = False
+        self.selectors = []
+    
+    def is_connected(self):
+        return self.connected
+    
+    async def new_context(self, **options):
+        return FakeContext(self)
+    
+    async def close(self):
+        self.connected = False
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+    
+    async def route(self, pattern, handler):
+        pass
+    
+    async def new_page(self):
+        if not self.browser.connected:
+            raise RuntimeError('Target page, context or browser has been closed')
+        return FakePage(self.browser)
+    
+    async def close(self):
+        pass
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+    
+    async def goto(self, url, **options):
+        if self.browser.crash_on_goto:
+            self.browser.connected = False
+        if not self.browser.connected:
+            raise RuntimeError('Target page, context or browser has been closed')
+    
+    async def wait_for_selector(self, selector, **options):
+        self.browser.selectors.append(selector)
+    
+    async def content(self):
+        return self.browser.html
+    
+    async def close(self):
+        if not self.browser.connected:
+            raise RuntimeError('Target page, context or browser has been closed')
+
+class FakePlaywright:
+    """Stands in for async_playwright(): every launch gives a new FakeBrowser"""
+    
+    def __init__(self):
+        self.browsers = []
+        self.stops = 0
+        self.chromium = self
+    
+    def __call__(self):
+        return self
+    
+    async def start(self):
+        return self
+    
+    async def launch(self, **options):
+        self.browsers.append(FakeBrowser('<html><body><ul class="roster"></ul></body></html>'))
+        return self.browsers[-1]
+    
+    async def stop(self):
+        self.stops += 1
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(render, 'async_playwright', playwright)
+    pool = render.RendererPool(pages=2, timeout=5, wait_timeout=1)
+    yield pool, playwright
+    pool.close()
+
+@pytest.fixture(scope='module')
+def site():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+def start_pool(**settings):
+    if not render.available():
+        pytest.skip('playwright is not installed')
+    pool = render.RendererPool(**settings)
+    try:
+        pool._ensure_started()
+    except Exception as e:
+        pytest.skip(f'Chromium is not available ("playwright install chromium"): {e}')
+    return pool
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = start_pool(pages=2, timeout=10, wait_timeout=5)
+    yield pool
+    pool.close()
+
+def test_blocked_hosts_match_as_suffixes():
+    assert render._blocked_host('https://securepubads.g.doubleclick.net/tag/js/gpt.js')
+    assert render._blocked_host('https://www.googletagmanager.com/gtm.js?id=GTM-1')
+    assert render._blocked_host('https://doubleclick.net/')
+    assert not render._blocked_host('https://notdoubleclick.net/')
+    assert not render._blocked_host('https://okstate.com/sports/mens-basketball/roster')
+
+def test_blocked_kinds():
+    assert render.blocked_kind('image', 'https://okstate.com/images/p1.jpg') == 'image'
+    assert render.blocked_kind('font', 'https://okstate.com/fonts/a.woff2') == 'font'
+    assert render.blocked_kind('media', 'https://okstate.com/video.mp4') == 'media'
+    assert render.blocked_kind('script', 'https://www.google-analytics.com/analytics.js') == 'ad'
+    assert render.blocked_kind('document', 'https://okstate.com/sports/roster') is None
+    assert render.blocked_kind('script', 'https://okstate.com/roster.js') is None
+    assert render.blocked_kind('xhr', 'https://okstate.com/api/roster') is None
+
+def test_roster_selector_waits_for_the_roster():
+    def matches(body):
+        return bool(BeautifulSoup(f'<html><body>{body}</body></html>', 'html.parser').select(render.ROSTER_SELECTOR))
+    
+    # Layout and schedule tables are on the page before the JavaScript builds the cards
+    assert not matches('<table class="schedule"><tr><td>Sat</td></tr></table><ul id="roster"></ul>')
+    assert matches('<ul><li class="sidearm-roster-player"></li></ul>')
+    assert matches('<div class="s-person-card"></div>')
+    assert matches('<div data-athlete="12"></div>')
+    assert matches('<table class="sidearm-table roster"><tr><td>3</td></tr></table>')
+
+def test_restarts_crashed_browser_without_chromium(fake_pool):
+    pool, playwright = fake_pool
+    assert 'roster' in pool.render('https://teststate.com/roster')
+    assert len(playwright.browsers) == 1
+    assert playwright.browsers[0].selectors == [render.ROSTER_SELECTOR]
+    
+    # The browser dies between renders: the next render starts a new one
+    playwright.browsers[0].connected = False
+    assert 'roster' in pool.render('https://teststate.com/roster')
+    assert len(playwright.browsers) == 2
+    assert playwright.stops == 1
+    assert pool._browser is playwright.browsers[1]
+    
+    # A healthy browser is left alone
+    pool.render('https://teststate.com/roster')
+    assert len(playwright.browsers) == 2
+
+def test_crash_mid_render_fails_only_that_render(fake_pool):
+    pool, playwright = fake_pool
+    pool.render('https://teststate.com/roster')
+    
+    playwright.browsers[0].crash_on_goto = True
+    with pytest.raises(RuntimeError):
+        pool.render('https://teststate.com/roster')
+    # The dead browser's contexts all went back to its queue
+    assert pool._contexts.qsize() == pool.pages
+    
+    # The next render gets a fresh browser
+    assert 'roster' in pool.render('https://teststate.com/roster')
+    assert len(playwright.browsers) == 2
+
+def test_render_method_needs_playwright(monkeypatch, tmp_path):
+    for name in ('ROSTER_JOBS_DB', 'ROSTER_SNAPSHOTS_DB', 'ROSTER_SITE_PROFILES_DB', 'ROSTER_INDEX_DB'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    monkeypatch.setenv('ROSTER_PHOTO_DIR', 'off')
+    import app as app_module
+    
+    # As when playwright isn't installed (or ROSTER_RENDER_PAGES=0)
+    monkeypatch.setattr(app_module, 'renderer', None)
+    client = app_module.app.test_client()
+    for path in ('/scrape', '/jobs'):
+        response = client.post(path, json={'method': 'render', 'url': 'https://okstate.com/sports/roster'})
+        assert response.status_code == 400
+        assert 'playwright' in response.get_json()['error']
+
+def test_renders_javascript_roster(pool, site):
+    SiteHandler.requested.clear()
+    roster_data = RosterScraper(renderer=pool).scrape_rendered(site + '/roster')
+    assert [player['last_name'] for player in roster_data['players']] == ['Green', 'Hale', 'Pratt']
+    # Images were aborted in the browser, so the server never saw them
+    assert not any(path.startswith('/img/') for path in SiteHandler.requested)
+
+def test_busy_pool_fails_within_deadline(site):
+    pool = start_pool(pages=1, timeout=1, wait_timeout=1)
+    try:
+        errors = []
+        
+        def hang():
+            try:
+                pool.render(site + '/hang')
+            except Exception as e:
+                errors.append(e)
+        
+        # Both renders share the only context; neither may wait past its deadline
+        start = time.monotonic()
+        threads = [threading.Thread(target=hang) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        assert len(errors) == 2
+        assert time.monotonic() - start < 2 * (pool.timeout + pool.wait_timeout) + 5
+    finally:
+        pool.close()
+
+def test_restarts_crashed_browser(pool, site):
+    asyncio.run_coroutine_threadsafe(pool._browser.close(), pool._loop).result(10)
+    assert len(pool.render(site + '/roster')) > 0
+    assert pool._browser.is_connected()
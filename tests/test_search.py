@@ -0,0 +1,35 @@
+"""Roster index eviction: the least recently indexed teams go, people included"""
+import pytest
+
+from search import RosterIndex
+
+def roster(team_name, *last_names):
+    return {
+        'team_name': team_name,
+        'platform': 'sidearm',
+        'players': [{'first_name': 'Pat', 'last_name': name, 'number': '1'} for name in last_names],
+        'coaches': []
+    }
+
+@pytest.fixture
+def index(tmp_path):
+    return RosterIndex(str(tmp_path / 'index.sqlite3'), max_teams=2)
+
+def test_least_recently_indexed_teams_are_evicted(index):
+    index.put('https://a.edu/roster', roster('Alpha State', 'Green'))
+    index.put('https://b.edu/roster', roster('Beta State', 'Hale'))
+    # Rescraping an unchanged team still counts as use
+    index.put('https://a.edu/roster', roster('Alpha State', 'Green'))
+    index.put('https://c.edu/roster', roster('Gamma State', 'Reyes'))
+    
+    assert index.get('https://b.edu/roster') is None
+    assert [team['team_name'] for team in index.teams()] == ['Alpha State', 'Gamma State']
+    # The evicted team's athletes are gone from search, FTS included
+    assert index.search('hale') == []
+    assert [person['last_name'] for person in index.search('pat')] == ['Green', 'Reyes']
+
+def test_changed_roster_does_not_evict(index):
+    index.put('https://a.edu/roster', roster('Alpha State', 'Green'))
+    index.put('https://b.edu/roster', roster('Beta State', 'Hale'))
+    index.put('https://a.edu/roster', roster('Alpha State', 'Green', 'Lowe'))
+    assert len(index.teams()) == 2
@@ -0,0 +1,43 @@
+"""Snapshot retention: per-URL history and the least recently scraped URLs"""
+import pytest
+
+from snapshots import SnapshotStore
+
+def roster(*last_names):
+    return {
+        'team_name': 'Test State',
+        'players': [{'first_name': 'Pat', 'last_name': name} for name in last_names],
+        'coaches': []
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / 'snapshots.sqlite3'), keep=3, max_urls=2)
+
+def count(store, url=None):
+    with store._connect() as db:
+        if url is None:
+            return db.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+        return db.execute('SELECT COUNT(*) FROM snapshots WHERE url = ?', (url,)).fetchone()[0]
+
+def test_unchanged_rescrape_writes_no_snapshot(store):
+    assert store.save('https://a.edu/roster', roster('Green'))
+    assert not store.save('https://a.edu/roster', roster('Green'))
+    assert count(store) == 1
+
+def test_each_url_keeps_its_latest_snapshots(store):
+    for n in range(5):
+        store.save('https://a.edu/roster', roster(f'Player{n}'))
+    assert count(store, 'https://a.edu/roster') == 3
+    assert store.latest('https://a.edu/roster')['roster_data'] == roster('Player4')
+
+def test_least_recently_scraped_urls_are_evicted(store):
+    store.save('https://a.edu/roster', roster('Green'))
+    store.save('https://b.edu/roster', roster('Hale'))
+    # An unchanged rescrape still counts as use
+    store.save('https://a.edu/roster', roster('Green'))
+    store.save('https://c.edu/roster', roster('Reyes'))
+    
+    assert store.latest('https://b.edu/roster') is None
+    assert store.latest('https://a.edu/roster')['roster_data'] == roster('Green')
+    assert store.latest('https://c.edu/roster')['roster_data'] == roster('Reyes')
@@ -0,0 +1,77 @@
+"""Request and stage timing: streamed and buffered responses, parse-pool workers"""
+import os
+
+import pytest
+
+import metrics
+from conftest import CORPUS
+from parallel import ParsePool
+from scraper import RosterScraper
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    for name in ('ROSTER_JOBS_DB', 'ROSTER_SNAPSHOTS_DB', 'ROSTER_SITE_PROFILES_DB', 'ROSTER_INDEX_DB'):
+        monkeypatch.setenv(name, str(tmp_path / f'{name.lower()}.sqlite3'))
+    monkeypatch.setenv('ROSTER_PHOTO_DIR', 'off')
+    import app as app_module
+    return app_module.app.test_client()
+
+def series(histogram, *label_values):
+    """(sum, count) of one histogram series"""
+    values = histogram._series.get(label_values)
+    return (values[-2], values[-1]) if values else (0.0, 0)
+
+def test_streamed_export_is_timed_when_closed(client):
+    roster_data = {
+        'team_name': 'Test State',
+        'players': [
+            {'number': str(n % 100), 'first_name': f'First{n}', 'last_name': f'Last{n}', 'position': 'G'}
+            for n in range(20000)
+        ],
+        'coaches': []
+    }
+    request_sum, request_count = series(metrics.REQUEST_SECONDS, 'export_csv')
+    csv_sum, _ = series(metrics.STAGE_SECONDS, 'csv')
+    
+    response = client.post('/export/csv', json={'roster_data': roster_data}, headers={'X-Timing': '1'})
+    assert len(response.get_data()) > 0
+    # The headers went out before the CSV was written, so there's no breakdown to send
+    assert 'X-Timing' not in response.headers
+    response.close()
+    
+    new_request_sum, new_request_count = series(metrics.REQUEST_SECONDS, 'export_csv')
+    new_csv_sum, _ = series(metrics.STAGE_SECONDS, 'csv')
+    assert new_request_count == request_count + 1
+    # The request's time includes writing the CSV
+    assert new_request_sum - request_sum >= new_csv_sum - csv_sum > 0
+
+def test_buffered_response_gets_timing_header(client):
+    response = client.post(
+        '/scrape',
+        json={'method': 'html', 'html': '<html><body><table></table></body></html>'},
+        headers={'X-Timing': '1'}
+    )
+    assert response.status_code == 200
+    assert 'total=' in response.headers['X-Timing']
+
+def test_parse_pool_stages_are_recorded_in_the_parent():
+    with open(os.path.join(CORPUS, 'sidearm_nextgen_mbb.html'), 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    _, extract_count = series(metrics.STAGE_SECONDS, 'extract_sidearm')
+    pool = ParsePool(processes=1, parser='html.parser')
+    try:
+        timings, token = metrics.start_request()
+        try:
+            roster_data = RosterScraper(parser='html.parser', parse_pool=pool).scrape_from_html(
+                html_content, 'https://example.edu/roster'
+            )
+        finally:
+            metrics.end_request(token)
+    finally:
+        pool.shutdown()
+    
+    assert roster_data['players']
+    # The worker's extraction shows up in this process's histogram and the request's breakdown
+    assert series(metrics.STAGE_SECONDS, 'extract_sidearm')[1] == extract_count + 1
+    assert timings['extract_sidearm'] > 0 and timings['parse_pool'] >= timings['extract_sidearm']
+    assert timings['cards_accepted'] == len(roster_data['players']) + len(roster_data['coaches'])